@@ -42,7 +42,7 @@ class BrightIDConnectionAdmin(admin.ModelAdmin):
 
 
 class GitcoinPassportConnectionAdmin(admin.ModelAdmin):
-    list_display = ["pk", "user_profile", "user_wallet_address"]
+    list_display = ["pk", "user_profile", "user_wallet_address", "score", "scored_at"]
     search_fields = ["user_wallet_address", "user_profile__username"]
     autocomplete_fields = ["user_profile"]
 
@@ -5,13 +5,14 @@ import time
 
 import ed25519
 import pytz
-import requests
 from django.apps import apps
 from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
 from eth_account import Account
 from eth_account.messages import encode_defunct, encode_typed_data
 
+from core.request_helper import RequestHelper
+
 
 def verify_signature_eth_scheme(address, message, signature):
     try:
@@ -77,7 +78,7 @@ class BrightIDSoulboundAPIInterface:
         endpoint = f"https://aura-node.brightid.org/brightid/v5/veri\
         fications/{self.app}/{context_id}?verification={verification_type}"
         # print("endpoint: ", endpoint)
-        bright_response = requests.get(endpoint)
+        bright_response = RequestHelper().request("GET", endpoint)
         # decode response
         bright_response = bright_response.json()
         # print("bright_response: ", bright_response)
@@ -94,7 +95,7 @@ class BrightIDSoulboundAPIInterface:
         endpoint = (
             f"https://app.brightid.org/node/v5/sponsorships/{str(context_id).lower()}"
         )
-        bright_response = requests.get(endpoint)
+        bright_response = RequestHelper().request("GET", endpoint)
         bright_response = bright_response.json()
 
         try:
@@ -124,7 +125,7 @@ class BrightIDSoulboundAPIInterface:
         message = json.dumps(op, sort_keys=True, separators=(",", ":")).encode("ascii")
         sig = signing_key.sign(message)
         op["sig"] = base64.b64encode(sig).decode("ascii")
-        r = requests.post(URL, json.dumps(op))
+        r = RequestHelper().request("POST", URL, data=json.dumps(op))
         print("res: ", r.json())
         if r.status_code != 200 or "error" in r.json():
             return False
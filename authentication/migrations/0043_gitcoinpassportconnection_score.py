@@ -0,0 +1,22 @@
+# Generated by Django 5.1.2 on 2026-10-17 03:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0042_twitterconnection_twitter_id"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="gitcoinpassportconnection",
+            name="score",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="gitcoinpassportconnection",
+            name="scored_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,12 +1,14 @@
+import hashlib
 import uuid
 
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.cache import cache
 from django.core.validators import MinValueValidator, RegexValidator
-from django.db import models
+from django.db import models, transaction
 from django.db.models import UniqueConstraint
 from django.db.models.functions import Lower
-from django.db.models.signals import pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 from safedelete.models import SafeDeleteModel
@@ -22,8 +24,9 @@ from authentication.thirdpartydrivers import (
     LensDriver,
     TwitterDriver,
 )
-from core.models import NetworkTypes
+from core.models import NetworkTypes, ResolvedIdentity
 from core.thirdpartyapp import Subgraph
+from core.utils import invalidate_constraint_cache
 
 
 class ProfileManager(models.Manager):
@@ -120,17 +123,16 @@ class UserProfile(models.Model):
         return self.wallets.filter(address=wallet_address).exists()
 
     def has_unitap_pass(self):
-        sub = Subgraph()
-        addresses = Wallet.objects.filter(user_profile__pk=self.pk).values_list(
-            "address", flat=True
-        )
-        if not addresses:
-            return False, list()
-        owners = sub.get_unitap_pass_holders(addresses=addresses)
-        return (
-            bool(owners),
-            [token_id for _, token_ids in owners.items() for token_id in token_ids],
+        """
+        Passes of the Ethereum mainnet collection, the UnitapPass index only
+        follows the Base one
+        """
+        addresses = list(self.wallets.values_list("address", flat=True))
+        token_ids = sorted(
+            int(unitap_pass["tokenId"])
+            for unitap_pass in Subgraph().iter_unitap_passes(addresses=addresses)
         )
+        return bool(token_ids), token_ids
 
     def __str__(self) -> str:
         return self.username if self.username else f"User{self.pk}"
@@ -229,12 +231,58 @@ class GitcoinPassportSaveError(Exception):
 class GitcoinPassportConnection(BaseThirdPartyConnection):
     title = "GitcoinPassport"
     user_wallet_address = models.CharField(max_length=255)
+    score = models.FloatField(default=0)
+    scored_at = models.DateTimeField(null=True, blank=True)
     driver = GitcoinPassportDriver()
 
-    @property
-    def score(self):
-        _score = self.driver.submit_passport(self.user_wallet_address)
-        return _score if _score is not None else 0
+    # a user can not ask for a rescore more often than this
+    MIN_REFRESH_INTERVAL = 60
+
+    @classmethod
+    def get_stale(cls, max_age: int = None):
+        """
+        connections that were not scored in the last max_age seconds, by default
+        GITCOIN_PASSPORT_SCORE_MAX_AGE, the oldest first
+        """
+        if max_age is None:
+            max_age = settings.GITCOIN_PASSPORT_SCORE_MAX_AGE
+        scored_after = timezone.now() - timezone.timedelta(seconds=max_age)
+        return cls.objects.exclude(scored_at__gte=scored_after).order_by(
+            models.F("scored_at").asc(nulls_first=True), "pk"
+        )
+
+    @classmethod
+    def refresh_scores(cls, connections) -> int:
+        """
+        :return: number of the connections that were rescored
+        """
+        return sum(connection.refresh_score() for connection in connections)
+
+    def can_refresh(self) -> bool:
+        return (
+            self.scored_at is None
+            or (timezone.now() - self.scored_at).total_seconds()
+            >= self.MIN_REFRESH_INTERVAL
+        )
+
+    def refresh_score(self) -> bool:
+        """
+        submit the passport again so it is rescored, the stored score is kept if
+        the scorer does not respond
+        """
+        res = self.driver.submit_passport(self.user_wallet_address)
+        if res is None:
+            return False
+        score, self.scored_at = float(res), timezone.now()
+        if score == self.score:
+            # the constraint results of the user are still valid
+            GitcoinPassportConnection.objects.filter(pk=self.pk).update(
+                scored_at=self.scored_at
+            )
+        else:
+            self.score = score
+            self.save(update_fields=("score", "scored_at"))
+        return True
 
 
 @receiver(pre_save, sender=GitcoinPassportConnection)
@@ -248,6 +296,7 @@ def submit_passport(sender, instance: GitcoinPassportConnection, **kwargs):
         )
     if res == "0":
         raise GitcoinPassportSaveError("Gitcoin passport not exists.")
+    instance.score, instance.scored_at = float(res), timezone.now()
 
 
 class TwitterConnection(BaseThirdPartyConnection):
@@ -266,31 +315,75 @@ class TwitterConnection(BaseThirdPartyConnection):
     def is_connected(self):
         return bool(self.twitter_id)
 
+    def get_profile_cache_key(self) -> str:
+        # a reconnect changes the access token, so it never reads a stale profile
+        digest = hashlib.md5(str(self.access_token).encode()).hexdigest()
+        return f"twitter-profile-{self.pk}-{digest}"
+
+    def get_profile(self, refresh: bool = False) -> dict:
+        """
+        id, username, follower count and tweet count of the user, cached for
+        TWITTER_PROFILE_TTL seconds unless refresh is set
+        """
+        cache_key = self.get_profile_cache_key()
+        profile = None if refresh else cache.get(cache_key)
+        if profile is None:
+            profile = self.driver.get_profile(
+                self.access_token, self.access_token_secret
+            )
+            cache.set(cache_key, profile, settings.TWITTER_PROFILE_TTL)
+        return profile
+
+    @property
+    def user_id(self):
+        return self.twitter_id or self.get_profile()["id"]
+
     @property
     def tweet_count(self):
-        return self.driver.get_tweet_count(self.access_token, self.access_token_secret)
+        return self.get_profile()["tweet_count"]
 
     @property
     def follower_count(self):
-        return self.driver.get_follower_count(
-            self.access_token, self.access_token_secret
-        )
+        return self.get_profile()["follower_count"]
 
     @property
     def username(self):
-        return self.driver.get_username(self.access_token, self.access_token_secret)
+        return self.get_profile()["username"]
 
     def get_twitter_id(self):
-        return self.driver.get_twitter_id(self.access_token, self.access_token_secret)
+        return self.get_profile(refresh=True)["id"]
 
     def is_replied(self, self_tweet_id, target_tweet_id):
         return self.driver.get_is_replied(
-            self.access_token, self.access_token_secret, self_tweet_id, target_tweet_id
+            self.access_token,
+            self.access_token_secret,
+            self_tweet_id,
+            target_tweet_id,
+            user_id=self.user_id,
         )
 
     def is_liked(self, target_tweet_id):
         return self.driver.get_is_liked(
-            self.access_token, self.access_token_secret, target_tweet_id
+            self.access_token,
+            self.access_token_secret,
+            target_tweet_id,
+            user_id=self.user_id,
+        )
+
+    def is_retweeted(self, target_tweet_id):
+        return self.driver.get_is_retweeted(
+            self.access_token,
+            self.access_token_secret,
+            target_tweet_id,
+            user_id=self.user_id,
+        )
+
+    def is_quoted(self, target_tweet_id):
+        return self.driver.get_is_quoted(
+            self.access_token,
+            self.access_token_secret,
+            target_tweet_id,
+            user_id=self.user_id,
         )
 
 
@@ -315,6 +408,8 @@ class ENSConnection(BaseThirdPartyConnection):
 def check_ens_connection(sender, instance: ENSConnection, **kwargs):
     if instance.pk is not None:
         return
+    # a name set since the last lookup must not be hidden by the cache
+    ResolvedIdentity.forget(ResolvedIdentity.Provider.ENS, instance.user_wallet_address)
     res = instance.is_connected()
     if not res:
         raise ENSSaveError("No ENS has been found.")
@@ -341,6 +436,9 @@ class FarcasterSaveError(Exception):
 def check_farcaster_profile_existance(sender, instance: FarcasterConnection, **kwargs):
     if instance.pk is not None:
         return
+    ResolvedIdentity.forget(
+        ResolvedIdentity.Provider.FARCASTER, instance.user_wallet_address
+    )
     res = instance.fid
     if res is None:
         raise FarcasterSaveError("Farcaster profile for this wallet not found.")
@@ -367,6 +465,17 @@ class LensSaveError(Exception):
 def check_lens_profile_existance(sender, instance: LensConnection, **kwargs):
     if instance.pk is not None:
         return
+    ResolvedIdentity.forget(
+        ResolvedIdentity.Provider.LENS, instance.user_wallet_address
+    )
     res = instance.profile_id
     if res is None:
         raise LensSaveError("Lens profile for this wallet not found.")
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_user_constraints(sender, instance, **kwargs):
+    if isinstance(instance, (Wallet, BaseThirdPartyConnection)):
+        user_profile_id = instance.user_profile_id
+        transaction.on_commit(lambda: invalidate_constraint_cache(user_profile_id))
@@ -15,8 +15,7 @@ from authentication.models import (  # BaseThirdPartyConnection,
     UserProfile,
     Wallet,
 )
-from core.models import Chain
-from core.utils import NFTClient
+from core.models import NetworkTypes, UnitapPass
 
 
 class UsernameRequestSerializer(serializers.Serializer):
@@ -155,18 +154,10 @@ class ProfileSerializer(serializers.ModelSerializer):
         return token.key
 
     def get_up_balance(self, instance):
-        base_chain = Chain.objects.get(chain_id=8453)
-        nft_client = NFTClient(base_chain, "0xA27b7B65b0de0c08b002E6be828731FA865027bB")
-
-        user_addresses = [
-            nft_client.to_checksum_address(wallet.address.lower())
-            for wallet in instance.wallets.filter(wallet_type=base_chain.chain_type)
-        ]
-
-        user_balance = 0
-        for user_address in user_addresses:
-            user_balance += int(nft_client.get_number_of_tokens(user_address))
-        return user_balance
+        addresses = instance.wallets.filter(wallet_type=NetworkTypes.EVM).values_list(
+            "address", flat=True
+        )
+        return UnitapPass.count_owned_by(addresses)
 
 
 class SimpleProfilerSerializer(serializers.ModelSerializer):
@@ -205,6 +196,8 @@ class GitcoinPassportConnectionSerializer(BaseThirdPartyConnectionSerializer):
             "pk",
             "user_profile",
             "title",
+            "score",
+            "scored_at",
         ]
 
     def is_valid(self, raise_exception=False):
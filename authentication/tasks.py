@@ -0,0 +1,21 @@
+import logging
+
+from celery import shared_task
+from django.conf import settings
+
+from authentication.models import GitcoinPassportConnection
+from core.utils import memcache_lock
+
+
+@shared_task(bind=True)
+def refresh_gitcoin_passport_scores(self):
+    id_ = f"{self.name}-LOCK"
+    with memcache_lock(id_, self.app.oid, lock_expire=600) as acquired:
+        if not acquired:
+            logging.info("Could not acquire process lock")
+            return
+        connections = GitcoinPassportConnection.get_stale()[
+            : settings.GITCOIN_PASSPORT_REFRESH_BATCH_SIZE
+        ]
+        refreshed = GitcoinPassportConnection.refresh_scores(connections)
+        logging.info(f"Refreshed {refreshed} gitcoin passport scores")
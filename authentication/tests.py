@@ -3,6 +3,7 @@ import json
 from unittest.mock import patch
 
 from django.db import IntegrityError
+from django.test import override_settings
 from django.urls import reverse
 from django.utils import timezone
 from eth_account import Account
@@ -25,6 +26,8 @@ from authentication.models import (
     UserProfile,
     Wallet,
 )
+from authentication.tasks import refresh_gitcoin_passport_scores
+from core.constraints import HasMinimumHumanityScore
 from core.models import Chain, NetworkTypes, WalletAccount
 from faucet.models import ClaimReceipt
 
@@ -725,6 +728,82 @@ class TestGitcoinPassportThirdPartyConnection(APITestCase):
         self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
 
 
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class TestGitcoinPassportScore(APITestCase):
+    def setUp(self) -> None:
+        self.address = "0x05204E317D25eb172115546297b056965bE2C74d"
+        self.user_profile = create_new_user()
+        create_new_wallet(
+            user_profile=self.user_profile, _address=self.address, wallet_type="EVM"
+        )
+        with patch(
+            "authentication.thirdpartydrivers.GitcoinPassportDriver.submit_passport",
+            return_value="12.5",
+        ):
+            self.connection = GitcoinPassportConnection.objects.create(
+                user_profile=self.user_profile, user_wallet_address=self.address
+            )
+
+    def make_stale(self):
+        GitcoinPassportConnection.objects.filter(pk=self.connection.pk).update(
+            scored_at=timezone.now() - datetime.timedelta(days=2)
+        )
+
+    def test_score_is_stored_on_connect(self):
+        self.connection.refresh_from_db()
+        self.assertEqual(self.connection.score, 12.5)
+        self.assertIsNotNone(self.connection.scored_at)
+
+    @patch("authentication.thirdpartydrivers.GitcoinPassportDriver.submit_passport")
+    def test_constraint_reads_stored_score(self, submit_passport):
+        constraint = HasMinimumHumanityScore(self.user_profile)
+        constraint.param_values = {"MINIMUM": 10}
+        self.assertTrue(constraint.is_observed())
+        constraint.param_values = {"MINIMUM": 20}
+        self.assertFalse(constraint.is_observed())
+        submit_passport.assert_not_called()
+
+    @patch(
+        "authentication.thirdpartydrivers.GitcoinPassportDriver.submit_passport",
+        return_value=None,
+    )
+    def test_failed_refresh_keeps_score(self, submit_passport):
+        self.assertFalse(self.connection.refresh_score())
+        self.connection.refresh_from_db()
+        self.assertEqual(self.connection.score, 12.5)
+
+    @patch(
+        "authentication.thirdpartydrivers.GitcoinPassportDriver.submit_passport",
+        return_value="30",
+    )
+    def test_stale_scores_are_refreshed(self, submit_passport):
+        self.assertFalse(GitcoinPassportConnection.get_stale().exists())
+        self.make_stale()
+        refresh_gitcoin_passport_scores()
+        self.connection.refresh_from_db()
+        self.assertEqual(self.connection.score, 30)
+        self.assertFalse(GitcoinPassportConnection.get_stale().exists())
+
+    @patch(
+        "authentication.thirdpartydrivers.GitcoinPassportDriver.submit_passport",
+        return_value="30",
+    )
+    def test_refresh_on_request(self, submit_passport):
+        self.client.force_authenticate(user=self.user_profile.user)
+        response = self.client.post(reverse("AUTHENTICATION:refresh-gitcoin-passport"))
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(response.json()["score"], 12.5)
+        submit_passport.assert_not_called()
+
+        self.make_stale()
+        response = self.client.post(reverse("AUTHENTICATION:refresh-gitcoin-passport"))
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(response.json()["score"], 30)
+        submit_passport.assert_called_once_with(self.address)
+
+
 class TestENSThirdPartyConnection(APITestCase):
     def setUp(self) -> None:
         self.address = "0x0cE49AF5d8c5A70Edacd7115084B2b3041fE4fF6"
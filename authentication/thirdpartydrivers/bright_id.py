@@ -3,9 +3,9 @@ import json
 import time
 
 import ed25519
-import requests
 
 from authentication.thirdpartydrivers.abstract import BaseThirdPartyDriver
+from core.request_helper import RequestHelper
 
 
 class BrightIDConnectionDriver(BaseThirdPartyDriver):
@@ -29,7 +29,7 @@ class BrightIDConnectionDriver(BaseThirdPartyDriver):
     def _get_verification_status(self, context_id, verification_type):
         endpoint = f"https://aura-node.brightid.org/brightid/v5/verifications/{self.app}/{context_id}?verification={verification_type}"  # noqa E501
 
-        bright_response = requests.get(endpoint)
+        bright_response = RequestHelper().request("GET", endpoint)
         bright_response = bright_response.json()
 
         try:
@@ -44,7 +44,7 @@ class BrightIDConnectionDriver(BaseThirdPartyDriver):
         endpoint = (
             f"https://app.brightid.org/node/v5/sponsorships/{str(context_id).lower()}"
         )
-        bright_response = requests.get(endpoint)
+        bright_response = RequestHelper().request("GET", endpoint)
         bright_response = bright_response.json()
 
         try:
@@ -73,7 +73,7 @@ class BrightIDConnectionDriver(BaseThirdPartyDriver):
         message = json.dumps(op, sort_keys=True, separators=(",", ":")).encode("ascii")
         sig = signing_key.sign(message)
         op["sig"] = base64.b64encode(sig).decode("ascii")
-        r = requests.post(endpoint, json.dumps(op))
+        r = RequestHelper().request("POST", endpoint, data=json.dumps(op))
         print("res: ", r.json())
         if r.status_code != 200 or "error" in r.json():
             return False
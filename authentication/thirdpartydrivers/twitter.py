@@ -3,6 +3,10 @@ from core.thirdpartyapp import TwitterUtils
 
 
 class TwitterDriver(BaseThirdPartyDriver):
+    def get_profile(self, access_token: str, access_token_secret: str) -> dict:
+        twitter = TwitterUtils(access_token, access_token_secret)
+        return twitter.get_profile()
+
     def get_tweet_count(
         self, access_token: str, access_token_secret: str
     ) -> None | int:
@@ -21,15 +25,40 @@ class TwitterDriver(BaseThirdPartyDriver):
         access_token_secret: str,
         tweet_id: str,
         target_tweet_id: str,
+        user_id: str = None,
     ) -> None | bool:
         twitter = TwitterUtils(access_token, access_token_secret)
-        return twitter.get_is_replied(tweet_id, target_tweet_id)
+        return twitter.get_is_replied(tweet_id, target_tweet_id, user_id=user_id)
 
     def get_is_liked(
-        self, access_token: str, access_token_secret: str, target_tweet_id: str
+        self,
+        access_token: str,
+        access_token_secret: str,
+        target_tweet_id: str,
+        user_id: str = None,
+    ) -> None | bool:
+        twitter = TwitterUtils(access_token, access_token_secret)
+        return twitter.get_is_liked(target_tweet_id, user_id=user_id)
+
+    def get_is_retweeted(
+        self,
+        access_token: str,
+        access_token_secret: str,
+        target_tweet_id: str,
+        user_id: str = None,
+    ) -> None | bool:
+        twitter = TwitterUtils(access_token, access_token_secret)
+        return twitter.did_retweet_tweet(target_tweet_id, user_id=user_id)
+
+    def get_is_quoted(
+        self,
+        access_token: str,
+        access_token_secret: str,
+        target_tweet_id: str,
+        user_id: str = None,
     ) -> None | bool:
         twitter = TwitterUtils(access_token, access_token_secret)
-        return twitter.get_is_liked(target_tweet_id)
+        return twitter.did_quote_tweet(target_tweet_id, user_id=user_id)
 
     def get_username(self, access_token: str, access_token_secret: str) -> str:
         twitter = TwitterUtils(access_token, access_token_secret)
@@ -11,6 +11,7 @@ from authentication.views import (
     FarcasterDisconnectionView,
     GetProfileView,
     GitcoinPassportConnectionView,
+    GitcoinPassportRefreshView,
     LensConnectionView,
     LensDisconnectionView,
     LoginRegisterView,
@@ -81,6 +82,11 @@ urlpatterns = [
         GitcoinPassportConnectionView.as_view(),
         name="connect-gitcoin-passport",
     ),
+    path(
+        "user/connect/gitcoin-passport/refresh/",
+        GitcoinPassportRefreshView.as_view(),
+        name="refresh-gitcoin-passport",
+    ),
     path("twitter/", TwitterOAuthView.as_view(), name="twitter-oauth"),
     path(
         "twitter/callback/",
@@ -37,6 +37,7 @@ from authentication.models import (
     ENSSaveError,
     FarcasterConnection,
     FarcasterSaveError,
+    GitcoinPassportConnection,
     GitcoinPassportSaveError,
     LensConnection,
     LensSaveError,
@@ -435,6 +436,21 @@ class GitcoinPassportConnectionView(CreateAPIView):
             raise ValidationError({"address": str(e)})
 
 
+class GitcoinPassportRefreshView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        try:
+            connection = GitcoinPassportConnection.get_connection(request.user.profile)
+        except GitcoinPassportConnection.DoesNotExist:
+            raise ParseError("Gitcoin passport is not connected")
+        if connection.can_refresh() and not connection.refresh_score():
+            raise APIException("Gitcoin passport did not respond")
+        return Response(
+            GitcoinPassportConnectionSerializer(connection).data, status=HTTP_200_OK
+        )
+
+
 class ENSConnectionView(CreateAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = ENSConnectionSerializer
@@ -15,20 +15,21 @@ app = Celery("unitap")
 app.config_from_object("django.conf:settings", namespace="CELERY")
 
 app.conf.beat_schedule = {
+    # claims and batches are driven by events, these sweeps are only a safety net
     "process-pending-claims": {
         "task": "faucet.tasks.process_pending_claims",
-        "schedule": 3,
+        "schedule": 60,
     },
     "process-pending-batches": {
         "task": "faucet.tasks.process_pending_batches",
-        "schedule": 3,
+        "schedule": 60,
     },
     "update-processed-batches": {
         "task": "faucet.tasks.update_pending_batches_with_tx_hash_status",
-        "schedule": 3,
+        "schedule": 60,
     },
-    "update-needs-funding": {
-        "task": "faucet.tasks.update_needs_funding_status",
+    "refresh-chain-snapshots": {
+        "task": "faucet.tasks.refresh_chain_snapshots",
         "schedule": 120,
     },
     "reject-expired-pending-claims": {
@@ -81,6 +82,26 @@ app.conf.beat_schedule = {
         "task": "faucet.tasks.update_all_faucets_claims",
         "schedule": 600,
     },
+    "refresh-fuel-champions": {
+        "task": "faucet.tasks.refresh_fuel_champions",
+        "schedule": 600,
+    },
+    "sync-unitap-passes": {
+        "task": "core.tasks.sync_unitap_passes",
+        "schedule": 120,
+    },
+    "sync-token-transfers": {
+        "task": "core.tasks.sync_token_transfers",
+        "schedule": 120,
+    },
+    "refresh-gitcoin-passport-scores": {
+        "task": "authentication.tasks.refresh_gitcoin_passport_scores",
+        "schedule": 300,
+    },
+    "refresh-raffle-entrants-passport-scores": {
+        "task": "prizetap.tasks.refresh_raffle_entrants_passport_scores",
+        "schedule": 300,
+    },
     "update_prizetap_winning_chance_number_every_week": {
         "task": "prizetap.tasks.update_prizetap_winning_chance_number",
         "schedule": crontab(minute="0", hour="0", day_of_week="1"),
@@ -93,10 +114,6 @@ app.conf.beat_schedule = {
         "task": "prizetap.tasks.onchain_pre_enrollments",
         "schedule": 300,
     },
-    "remove_unitap_pass_used_in_each_faucet": {
-        "task": "faucet.tasks.remove_unitap_pass_used_in_each_faucet",
-        "schedule": crontab(minute="0", hour="0", day_of_week="1"),
-    },
 }
 
 # Load task modules from all registered Django apps.
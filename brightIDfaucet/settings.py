@@ -87,6 +87,53 @@ CLOUDFLARE_IMAGES_ACCOUNT_HASH = os.environ.get("CLOUDFLARE_ACCOUNT_HASH")
 CLOUDFLARE_TURNSTILE_SECRET_KEY = os.environ.get("CLOUDFLARE_TURNSTILE_SECRET_KEY")
 H_CAPTCHA_SECRET = os.environ.get("H_CAPTCHA_SECRET")
 
+# pooled web3 providers (see core.utils.Web3ProviderRegistry)
+WEB3_POOL_CONNECTIONS = int(os.environ.get("WEB3_POOL_CONNECTIONS", "10"))
+WEB3_POOL_MAXSIZE = int(os.environ.get("WEB3_POOL_MAXSIZE", "20"))
+WEB3_REQUEST_TIMEOUT = int(os.environ.get("WEB3_REQUEST_TIMEOUT", "10"))
+WEB3_HEALTH_CHECK_INTERVAL = int(os.environ.get("WEB3_HEALTH_CHECK_INTERVAL", "60"))
+# backoff between receipt checks (see core.utils.ConfirmationTracker)
+CONFIRMATION_MIN_BACKOFF = int(os.environ.get("CONFIRMATION_MIN_BACKOFF", "5"))
+CONFIRMATION_MAX_BACKOFF = int(os.environ.get("CONFIRMATION_MAX_BACKOFF", "120"))
+# constraint checks (see core.constraints.evaluator.ConstraintEvaluator)
+CONSTRAINT_EVALUATION_WORKERS = int(
+    os.environ.get("CONSTRAINT_EVALUATION_WORKERS", "8")
+)
+CONSTRAINT_EVALUATION_TIMEOUT = int(
+    os.environ.get("CONSTRAINT_EVALUATION_TIMEOUT", "10")
+)
+CONSTRAINT_EVALUATION_DEADLINE = int(
+    os.environ.get("CONSTRAINT_EVALUATION_DEADLINE", "20")
+)
+# third party http clients (see core.request_helper.RequestHelper)
+HTTP_CLIENT_TIMEOUT = int(os.environ.get("HTTP_CLIENT_TIMEOUT", "5"))
+HTTP_CLIENT_RETRIES = int(os.environ.get("HTTP_CLIENT_RETRIES", "2"))
+HTTP_CLIENT_BACKOFF_MS = int(os.environ.get("HTTP_CLIENT_BACKOFF_MS", "200"))
+HTTP_CLIENT_POOL_MAXSIZE = int(os.environ.get("HTTP_CLIENT_POOL_MAXSIZE", "20"))
+HTTP_CIRCUIT_FAILURE_THRESHOLD = int(
+    os.environ.get("HTTP_CIRCUIT_FAILURE_THRESHOLD", "5")
+)
+HTTP_CIRCUIT_RESET_TIMEOUT = int(os.environ.get("HTTP_CIRCUIT_RESET_TIMEOUT", "30"))
+# address to identity resolution (see core.models.ResolvedIdentity)
+IDENTITY_RESOLUTION_TTL = int(os.environ.get("IDENTITY_RESOLUTION_TTL", "86400"))
+IDENTITY_RESOLUTION_NEGATIVE_TTL = int(
+    os.environ.get("IDENTITY_RESOLUTION_NEGATIVE_TTL", "3600")
+)
+# twitter profile of a connection (see authentication.models.TwitterConnection)
+TWITTER_PROFILE_TTL = int(os.environ.get("TWITTER_PROFILE_TTL", "3600"))
+# users who liked, retweeted or quoted a tweet (see core.thirdpartyapp.TwitterUtils)
+TWITTER_TWEET_USERS_TTL = int(os.environ.get("TWITTER_TWEET_USERS_TTL", "900"))
+# stored gitcoin passport scores (see authentication.models.GitcoinPassportConnection)
+GITCOIN_PASSPORT_SCORE_MAX_AGE = int(
+    os.environ.get("GITCOIN_PASSPORT_SCORE_MAX_AGE", "86400")
+)
+GITCOIN_PASSPORT_RAFFLE_SCORE_MAX_AGE = int(
+    os.environ.get("GITCOIN_PASSPORT_RAFFLE_SCORE_MAX_AGE", "3600")
+)
+GITCOIN_PASSPORT_REFRESH_BATCH_SIZE = int(
+    os.environ.get("GITCOIN_PASSPORT_REFRESH_BATCH_SIZE", "100")
+)
+
 assert DEPLOYMENT_ENV in ["dev", "main"]
 
 
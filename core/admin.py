@@ -1,6 +1,19 @@
 from django.contrib import admin
 
-from .models import Chain, Sponsor, TokenPrice, WalletAccount
+from .models import (
+    AccountNonce,
+    AllowList,
+    Chain,
+    ResolvedIdentity,
+    Sponsor,
+    TokenPrice,
+    TokenTransfer,
+    TokenTransferIndex,
+    UnitapPass,
+    UnitapPassContract,
+    UnitapPassUsage,
+    WalletAccount,
+)
 
 
 class UserConstraintBaseAdmin(admin.ModelAdmin):
@@ -26,6 +39,64 @@ class ChainAdmin(admin.ModelAdmin):
     list_display = ["pk", "chain_name", "chain_id", "symbol", "chain_type"]
 
 
+class AccountNonceAdmin(admin.ModelAdmin):
+    list_display = ["pk", "chain", "address", "next_nonce", "updated_at"]
+    list_filter = ["chain"]
+
+
+class UnitapPassUsageAdmin(admin.ModelAdmin):
+    list_display = ["pk", "scope", "collection", "pass_id", "round_start", "created_at"]
+    search_fields = ["scope", "pass_id"]
+
+
+class UnitapPassContractAdmin(admin.ModelAdmin):
+    list_display = [
+        "pk",
+        "chain",
+        "address",
+        "last_indexed_block",
+        "synced_at",
+        "is_active",
+    ]
+    list_filter = ["chain", "is_active"]
+
+
+class UnitapPassAdmin(admin.ModelAdmin):
+    list_display = ["pk", "contract", "token_id", "owner", "updated_block"]
+    list_filter = ["contract"]
+    search_fields = ["owner", "token_id"]
+
+
+class TokenTransferIndexAdmin(admin.ModelAdmin):
+    list_display = [
+        "pk",
+        "chain",
+        "address",
+        "last_indexed_block",
+        "synced_at",
+        "is_active",
+    ]
+    list_filter = ["chain", "is_active"]
+    search_fields = ["address"]
+
+
+class TokenTransferAdmin(admin.ModelAdmin):
+    list_display = ["pk", "index", "block_number", "sender", "receiver", "value"]
+    list_filter = ["index"]
+    search_fields = ["tx_hash", "sender", "receiver"]
+
+
+class ResolvedIdentityAdmin(admin.ModelAdmin):
+    list_display = ["pk", "provider", "address", "identity", "resolved_at"]
+    list_filter = ["provider"]
+    search_fields = ["address", "identity"]
+
+
+class AllowListAdmin(admin.ModelAdmin):
+    list_display = ["pk", "path", "address_count", "size_bytes", "created_at"]
+    search_fields = ["path"]
+
+
 class TokenPriceAdmin(admin.ModelAdmin):
     list_display = ["symbol", "usd_price", "price_url", "datetime", "last_updated"]
     list_filter = ["symbol"]
@@ -38,5 +109,13 @@ class SponsorAdmin(admin.ModelAdmin):
 
 admin.site.register(WalletAccount, WalletAccountAdmin)
 admin.site.register(Chain, ChainAdmin)
+admin.site.register(AccountNonce, AccountNonceAdmin)
+admin.site.register(UnitapPassUsage, UnitapPassUsageAdmin)
+admin.site.register(UnitapPassContract, UnitapPassContractAdmin)
+admin.site.register(UnitapPass, UnitapPassAdmin)
+admin.site.register(TokenTransferIndex, TokenTransferIndexAdmin)
+admin.site.register(TokenTransfer, TokenTransferAdmin)
+admin.site.register(ResolvedIdentity, ResolvedIdentityAdmin)
+admin.site.register(AllowList, AllowListAdmin)
 admin.site.register(TokenPrice, TokenPriceAdmin)
 admin.site.register(Sponsor, SponsorAdmin)
@@ -57,6 +57,8 @@ class ConstraintVerification(ABC):
     app_name = ConstraintApp.GENERAL.value
     __response_text = ""
     is_cachable = True
+    # results depend on the raffle or distribution, not only on the params
+    is_campaign_scoped = False
     invalid_cache_until = 60
     valid_cache_until = 60 * 60
 
@@ -64,6 +66,15 @@ class ConstraintVerification(ABC):
         self.user_profile = user_profile
         self._param_values = {}
         self.obj = obj
+        self.evaluation = None
+
+    def plan(self, evaluation: dict):
+        """
+        Called before any constraint of an evaluation runs, with a dict shared by
+        all of them, so constraints of one app can register what they need and
+        fetch it together
+        """
+        self.evaluation = evaluation
 
     def get_info(self, *args, **kwargs):
         pass
@@ -72,6 +83,14 @@ class ConstraintVerification(ABC):
     def is_observed(self, *args, **kwargs) -> bool:
         pass
 
+    def verify(self, *args, **kwargs) -> tuple[bool, dict | None]:
+        """
+        Return the verdict and the info of the constraint from one evaluation,
+        constraints that get both from the same response override it to fetch once
+        """
+        info = self.get_info(*args, **kwargs)
+        return self.is_observed(*args, **kwargs), info
+
     @classmethod
     def param_keys(cls) -> list:
         return cls._param_keys
@@ -30,50 +30,19 @@ class BridgeEthToArb(ConstraintVerification):
             Lower("address"), flat=True
         )
 
+        where = {"txOrigin_in": list(user_wallets), "kind": 12}
         if from_time:
-            query = """
-            query GetMessageDelivereds($wallets: [String], $fromTime: String) {
-                messageDelivereds(
-                    where: {
-                        txOrigin_in: $wallets
-                        kind: 12
-                        timestamp_gt: $fromTime
-                    }
-                ) {
-                    id
-                    transactionHash
-                }
-            }
-            """
-            vars = {"wallets": list(user_wallets), "fromTime": str(from_time)}
-        else:
-            query = """
-            query GetMessageDelivereds($wallets: [String]) {
-                messageDelivereds(
-                    where: {
-                        txOrigin_in: $wallets
-                        kind: 12
-                    }
-                ) {
-                    id
-                    transactionHash
-                }
-            }
-            """
-            vars = {
-                "wallets": list(user_wallets),
-            }
-
-        res = subgraph.send_post_request(
-            subgraph.paths.get("arb_bridge_mainnet"), query=query, vars=vars
+            where["timestamp_gt"] = str(from_time)
+
+        pages = subgraph.paginate(
+            subgraph.paths["arb_bridge_mainnet"],
+            "messageDelivereds",
+            ["transactionHash"],
+            filter_type="MessageDelivered_filter",
+            where=where,
+            first=1,
         )
-        match res:
-            case None:
-                return False
-            case {"data": {"messageDelivereds": messages}} if len(messages) > 0:
-                return True
-            case _:
-                return False
+        return next(pages, None) is not None
 
 
 class DelegateArb(ConstraintVerification):
@@ -116,20 +85,22 @@ class DelegateArb(ConstraintVerification):
             chain=chain, contract=self.ARB_TOKEN_CONTRACT, abi=self.ARB_TOKEN_ABI
         )
         delegated_power = 0
+        valid_addresses = []
         for user_address in self.user_addresses:
             try:
-                address = token_client.to_checksum_address(user_address)
-                delegated_address = token_client.get_delegates_address(user_address)
-                if not delegated_address or (
-                    ConstraintParam.ADDRESS.name in self.param_keys()
-                    and delegated_address.lower()
-                    != self.param_values[ConstraintParam.ADDRESS.name].lower()
-                ):
-                    continue
-                balance = token_client.get_non_native_token_balance(address)
-                delegated_power += balance
+                valid_addresses.append(token_client.to_checksum_address(user_address))
             except InvalidAddressException:
                 pass
+        for delegated_address, balance in token_client.get_delegates_and_balances(
+            valid_addresses
+        ):
+            if not delegated_address or (
+                ConstraintParam.ADDRESS.name in self.param_keys()
+                and delegated_address.lower()
+                != self.param_values[ConstraintParam.ADDRESS.name].lower()
+            ):
+                continue
+            delegated_power += balance or 0
         if delegated_power >= int(self.param_values[ConstraintParam.MINIMUM.name]):
             return True
         return False
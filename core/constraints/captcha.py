@@ -15,6 +15,8 @@ class HasVerifiedCloudflareCaptcha(ConstraintVerification):
     _param_keys = []
     app_name = ConstraintApp.GENERAL.value
     is_cachable = True
+    # a solved captcha only vouches for the campaign it was solved for
+    is_campaign_scoped = True
     valid_cache_until = 2 * 60
     invalid_cache_until = 0
 
@@ -44,6 +46,8 @@ class HasVerifiedHCaptcha(ConstraintVerification):
     _param_keys = []
     app_name = ConstraintApp.GENERAL.value
     is_cachable = True
+    # a solved captcha only vouches for the campaign it was solved for
+    is_campaign_scoped = True
     valid_cache_until = 2 * 60
     invalid_cache_until = 0
 
@@ -0,0 +1,241 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, connection
+
+from core.constraints import ConstraintVerification, get_constraint
+from core.utils import cache_constraint_result, get_constraint_cache_version
+
+
+def _run_in_worker(func, *args):
+    close_old_connections()
+    try:
+        return func(*args)
+    finally:
+        close_old_connections()
+
+
+class ConstraintEvaluator:
+    """
+    Evaluate the constraints of a raffle or a token distribution for a user.
+
+    Results are cached per user, constraint, params and time window, so they are
+    shared between raffles and distributions, unless the constraint depends on the
+    campaign itself. Constraints mostly wait on external apis, so the ones that
+    are not cached run on a shared thread pool, each one bounded by
+    CONSTRAINT_EVALUATION_TIMEOUT from when a worker picks it up and all of them
+    by CONSTRAINT_EVALUATION_DEADLINE. A constraint that does not finish in time
+    is not verified. Results keep the order of the constraints.
+    """
+
+    TIME_WINDOW_KWARGS = ("from_time",)
+    CACHE_HITS_KEY = "constraint-cache-hits"
+    CACHE_MISSES_KEY = "constraint-cache-misses"
+    # how often constraints still queued are looked at for having started
+    POLL_INTERVAL = 0.1
+
+    _executor = None
+    _executor_lock = threading.Lock()
+
+    def __init__(
+        self,
+        user_profile,
+        obj,
+        *,
+        param_values: dict,
+        data: dict,
+        reversed_constraints: list[str],
+        request=None,
+        **kwargs,
+    ) -> None:
+        self.user_profile = user_profile
+        self.obj = obj
+        self.param_values = param_values
+        self.data = data
+        self.reversed_constraints = reversed_constraints
+        self.request = request
+        self.kwargs = kwargs
+        self.cache_version = None
+
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=settings.CONSTRAINT_EVALUATION_WORKERS,
+                    thread_name_prefix="constraints",
+                )
+        return cls._executor
+
+    @staticmethod
+    def is_concurrent(pending_count) -> bool:
+        # workers use their own db connections and could not see the rows of an
+        # open transaction
+        return (
+            pending_count > 1
+            and settings.CONSTRAINT_EVALUATION_WORKERS > 1
+            and not connection.in_atomic_block
+        )
+
+    def get_cache_key(self, c, constraint: ConstraintVerification) -> str:
+        scope = {
+            "params": constraint.param_values,
+            "data": self.data.get(str(c.pk), dict()),
+            "window": {
+                key: self.kwargs[key]
+                for key in self.TIME_WINDOW_KWARGS
+                if key in self.kwargs
+            },
+        }
+        if constraint.is_campaign_scoped:
+            scope["obj"] = f"{self.obj._meta.label_lower}:{self.obj.pk}"
+        digest = hashlib.md5(
+            json.dumps(scope, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        if self.cache_version is None:
+            self.cache_version = get_constraint_cache_version(self.user_profile.pk)
+        return (
+            f"constraint-{c.name}-{self.user_profile.pk}-{self.cache_version}-{digest}"
+        )
+
+    @classmethod
+    def record_cache_stats(cls, hits, misses):
+        for key, count in ((cls.CACHE_HITS_KEY, hits), (cls.CACHE_MISSES_KEY, misses)):
+            if not count:
+                continue
+            cache.add(key, 0, None)
+            try:
+                cache.incr(key, count)
+            except ValueError:
+                # evicted between add and incr
+                pass
+
+    @classmethod
+    def get_cache_stats(cls) -> dict:
+        stats = cache.get_many([cls.CACHE_HITS_KEY, cls.CACHE_MISSES_KEY])
+        hits = stats.get(cls.CACHE_HITS_KEY, 0)
+        misses = stats.get(cls.CACHE_MISSES_KEY, 0)
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total else None,
+        }
+
+    def get_verification(self, c) -> ConstraintVerification:
+        constraint: ConstraintVerification = get_constraint(c.name)(
+            self.user_profile, obj=self.obj
+        )
+        constraint.response = c.response
+        try:
+            constraint.param_values = self.param_values[c.name]
+        except KeyError:
+            pass
+        return constraint
+
+    def check(self, c, constraint: ConstraintVerification) -> dict:
+        cdata = self.data.get(str(c.pk), dict())
+        if str(c.pk) in self.reversed_constraints:
+            is_observed, info = constraint.verify(**cdata, **self.kwargs)
+        else:
+            is_observed, info = constraint.verify(
+                **cdata, **self.kwargs, context={"request": self.request}
+            )
+        is_observed = bool(is_observed)
+
+        if constraint.is_cachable:
+            return cache_constraint_result(
+                self.get_cache_key(c, constraint), is_observed, constraint, info
+            )
+        return {"is_observed": is_observed, "info": info}
+
+    def to_constraint_data(self, c, observed_data: dict) -> dict:
+        is_reversed = str(c.pk) in self.reversed_constraints
+        return {
+            "is_verified": observed_data["is_observed"] != is_reversed,
+            **{
+                key: value
+                for key, value in observed_data.items()
+                if key != "is_observed"
+            },
+        }
+
+    def evaluate(self, constraints) -> tuple[dict, dict]:
+        """
+        :return: ({constraint_pk: constraint_data}, {constraint_title: response})
+        """
+        constraints = list(constraints)
+        verifications = {c.pk: self.get_verification(c) for c in constraints}
+        cache_keys = {
+            c.pk: self.get_cache_key(c, verifications[c.pk]) for c in constraints
+        }
+        cached = cache.get_many(list(cache_keys.values()))
+        observed = {c.pk: cached.get(cache_keys[c.pk]) for c in constraints}
+        pending = [c for c in constraints if observed[c.pk] is None]
+        self.record_cache_stats(len(constraints) - len(pending), len(pending))
+        evaluation = {}
+        for c in pending:
+            verifications[c.pk].plan(evaluation)
+
+        if self.is_concurrent(len(pending)):
+            observed.update(self.evaluate_concurrently(pending, verifications))
+        else:
+            for c in pending:
+                observed[c.pk] = self.check(c, verifications[c.pk])
+
+        result = {c.pk: self.to_constraint_data(c, observed[c.pk]) for c in constraints}
+        error_messages = {
+            c.title: verifications[c.pk].response
+            for c in constraints
+            if not result[c.pk].get("is_verified")
+        }
+        return result, error_messages
+
+    def evaluate_concurrently(self, constraints, verifications) -> dict:
+        executor = self.get_executor()
+        deadline = time.monotonic() + settings.CONSTRAINT_EVALUATION_DEADLINE
+        started_at = {}
+
+        def run(c):
+            started_at[c.pk] = time.monotonic()
+            return _run_in_worker(self.check, c, verifications[c.pk])
+
+        futures = {executor.submit(run, c): c for c in constraints}
+
+        def expires_at(future):
+            # a constraint still queued only waits for the deadline
+            start = started_at.get(futures[future].pk)
+            if start is None:
+                return deadline
+            return min(start + settings.CONSTRAINT_EVALUATION_TIMEOUT, deadline)
+
+        result = {}
+        pending = set(futures)
+        while pending:
+            now = time.monotonic()
+            wake_at = min(map(expires_at, pending))
+            if any(futures[future].pk not in started_at for future in pending):
+                wake_at = min(wake_at, now + self.POLL_INTERVAL)
+            done, pending = wait(
+                pending, timeout=max(wake_at - now, 0), return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                result[futures[future].pk] = future.result()
+            now = time.monotonic()
+            for future in [future for future in pending if expires_at(future) <= now]:
+                c = futures[future]
+                future.cancel()
+                pending.remove(future)
+                logging.warning(f"Constraint {c.name} timed out")
+                # a reversed constraint that timed out is not verified either
+                result[c.pk] = {
+                    "is_observed": str(c.pk) in self.reversed_constraints,
+                    "info": None,
+                }
+        return {c.pk: result[c.pk] for c in constraints}
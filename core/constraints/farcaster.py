@@ -5,7 +5,41 @@ from core.constraints.abstract import (
     ConstraintParam,
     ConstraintVerification,
 )
-from core.thirdpartyapp import FarcasterUtil
+from core.thirdpartyapp import FarcasterViewer
+
+
+class FarcasterVerification(ConstraintVerification):
+    """
+    Base of the constraints that read the farcaster state of the user, all of
+    them share one FarcasterViewer per evaluation
+    """
+
+    app_name = ConstraintApp.FARCASTER.value
+    VIEWER_KEY = "farcaster_viewer"
+
+    def plan(self, evaluation: dict):
+        super().plan(evaluation)
+        viewer = self.get_viewer()
+        if viewer is not None:
+            self.plan_checks(viewer)
+
+    def plan_checks(self, viewer: FarcasterViewer):
+        pass
+
+    def get_viewer(self) -> None | FarcasterViewer:
+        from authentication.models import FarcasterConnection
+
+        if self.evaluation is None:
+            self.evaluation = {}
+        if self.VIEWER_KEY not in self.evaluation:
+            try:
+                fa_connection = FarcasterConnection.get_connection(self.user_profile)
+                viewer = FarcasterViewer(fa_connection.user_wallet_address)
+            except FarcasterConnection.DoesNotExist:
+                logging.error("Farcaster connection not found.")
+                viewer = None
+            self.evaluation.setdefault(self.VIEWER_KEY, viewer)
+        return self.evaluation[self.VIEWER_KEY]
 
 
 class HasFarcasterProfile(ConstraintVerification):
@@ -23,154 +57,95 @@ class HasFarcasterProfile(ConstraintVerification):
         return fa_connection.is_connected()
 
 
-class IsFollowingFarcasterUser(ConstraintVerification):
+class IsFollowingFarcasterUser(FarcasterVerification):
     _param_keys = [ConstraintParam.FARCASTER_FID]
-    app_name = ConstraintApp.FARCASTER.value
 
-    def is_observed(self, *args, **kwargs) -> bool:
-        from authentication.models import FarcasterConnection
+    def plan_checks(self, viewer: FarcasterViewer):
+        viewer.add_fids([self.param_values[ConstraintParam.FARCASTER_FID.name]])
 
+    def is_observed(self, *args, **kwargs) -> bool:
         farcaster_fid = self.param_values[ConstraintParam.FARCASTER_FID.name]
-        farcaster_util = FarcasterUtil()
-        try:
-            fa_connection = FarcasterConnection.get_connection(self.user_profile)
-        except FarcasterConnection.DoesNotExist:
-            logging.error("Farcaster connection not found.")
-            return False
-        return farcaster_util.is_following(
-            farcaster_fid, fa_connection.user_wallet_address
-        )
+        viewer = self.get_viewer()
+        return viewer is not None and viewer.is_following(farcaster_fid)
 
 
-class BeFollowedByFarcasterUser(ConstraintVerification):
+class BeFollowedByFarcasterUser(FarcasterVerification):
     _param_keys = [ConstraintParam.FARCASTER_FID]
-    app_name = ConstraintApp.FARCASTER.value
 
-    def __init__(self, user_profile) -> None:
-        super().__init__(user_profile)
+    def plan_checks(self, viewer: FarcasterViewer):
+        viewer.add_fids([self.param_values[ConstraintParam.FARCASTER_FID.name]])
 
     def is_observed(self, *args, **kwargs) -> bool:
-        from authentication.models import FarcasterConnection
-
         farcaster_fid = self.param_values[ConstraintParam.FARCASTER_FID.name]
-        farcaster_util = FarcasterUtil()
-        try:
-            fa_connection = FarcasterConnection.get_connection(self.user_profile)
-        except FarcasterConnection.DoesNotExist:
-            logging.error("Farcaster connection not found.")
-            return False
-        return farcaster_util.be_followed_by(
-            farcaster_fid, fa_connection.user_wallet_address
-        )
+        viewer = self.get_viewer()
+        return viewer is not None and viewer.is_followed_by(farcaster_fid)
 
 
-class DidLikedFarcasterCast(ConstraintVerification):
+class DidLikedFarcasterCast(FarcasterVerification):
     _param_keys = [ConstraintParam.FARCASTER_CAST_HASH]
-    app_name = ConstraintApp.FARCASTER.value
 
     def is_observed(self, *args, **kwargs) -> bool:
-        from authentication.models import FarcasterConnection
-
-        farcaster_util = FarcasterUtil()
-        try:
-            fa_connection = FarcasterConnection.get_connection(self.user_profile)
-        except FarcasterConnection.DoesNotExist:
-            logging.error("Farcaster connection not found.")
-            return False
-        return farcaster_util.did_liked_cast(
-            cast_hash=self.param_values[ConstraintParam.FARCASTER_CAST_HASH.name],
-            addresses=[
-                fa_connection.user_wallet_address,
-            ],
+        viewer = self.get_viewer()
+        return viewer is not None and viewer.did_react(
+            self.param_values[ConstraintParam.FARCASTER_CAST_HASH.name], "likes"
         )
 
 
-class DidRecastFarcasterCast(ConstraintVerification):
+class DidRecastFarcasterCast(FarcasterVerification):
     _param_keys = [ConstraintParam.FARCASTER_CAST_HASH]
-    app_name = ConstraintApp.FARCASTER.value
 
     def is_observed(self, *args, **kwargs) -> bool:
-        from authentication.models import FarcasterConnection
-
-        farcaster_util = FarcasterUtil()
-        try:
-            fa_connection = FarcasterConnection.get_connection(self.user_profile)
-        except FarcasterConnection.DoesNotExist:
-            logging.error("Farcaster connection not found.")
-            return False
-        return farcaster_util.did_recast_cast(
-            cast_hash=self.param_values[ConstraintParam.FARCASTER_CAST_HASH.name],
-            addresses=[
-                fa_connection.user_wallet_address,
-            ],
+        viewer = self.get_viewer()
+        return viewer is not None and viewer.did_react(
+            self.param_values[ConstraintParam.FARCASTER_CAST_HASH.name], "recasts"
         )
 
 
-class HasMinimumFarcasterFollower(ConstraintVerification):
+class HasMinimumFarcasterFollower(FarcasterVerification):
     _param_keys = [ConstraintParam.MINIMUM]
-    app_name = ConstraintApp.FARCASTER.value
 
     def is_observed(self, *args, **kwargs) -> bool:
-        from authentication.models import FarcasterConnection
-
-        farcaster_util = FarcasterUtil()
-        try:
-            fa_connection = FarcasterConnection.get_connection(self.user_profile)
-        except FarcasterConnection.DoesNotExist:
-            logging("Farcaster connection not found.")
+        viewer = self.get_viewer()
+        if viewer is None:
             return False
         minimum = self.param_values[ConstraintParam.MINIMUM.name]
         try:
-            return farcaster_util.get_follower_number(
-                fa_connection.user_wallet_address
-            ) >= int(minimum)
+            return viewer.get_follower_count() >= int(minimum)
         except TypeError as e:
             logging.error(f"Can not compare two value: {str(e)}")
             return False
 
 
-class IsFollowingFarcasterChannel(ConstraintVerification):
+class IsFollowingFarcasterChannel(FarcasterVerification):
     _param_keys = [ConstraintParam.FARCASTER_CHANNEL_ID]
-    app_name = ConstraintApp.FARCASTER.value
 
-    def is_observed(self, *args, **kwargs) -> bool:
-        from authentication.models import FarcasterConnection
+    def plan_checks(self, viewer: FarcasterViewer):
+        viewer.add_channels(
+            [self.param_values[ConstraintParam.FARCASTER_CHANNEL_ID.name]]
+        )
 
-        farcaster_util = FarcasterUtil()
-        try:
-            fa_connection = FarcasterConnection.get_connection(self.user_profile)
-        except FarcasterConnection.DoesNotExist:
-            logging.error("Farcaster connection not found.")
-            return False
+    def is_observed(self, *args, **kwargs) -> bool:
+        viewer = self.get_viewer()
         channel_id = self.param_values[ConstraintParam.FARCASTER_CHANNEL_ID.name]
-        return farcaster_util.is_following_channel(
-            channel_id=channel_id,
-            addresses=[
-                fa_connection.user_wallet_address,
-            ],
-        )
+        return viewer is not None and viewer.is_following_channel(channel_id)
 
 
-class IsFollowingFarcasterBatch(ConstraintVerification):
+class IsFollowingFarcasterBatch(FarcasterVerification):
     _param_keys = [ConstraintParam.FARCASTER_FIDS]
-    app_name = ConstraintApp.FARCASTER.value
 
-    def get_info(self, *args, **kwargs) -> dict:
-        from authentication.models import FarcasterConnection
+    def plan_checks(self, viewer: FarcasterViewer):
+        viewer.add_fids(self.param_values[ConstraintParam.FARCASTER_FIDS.name])
 
-        farcaster_util = FarcasterUtil()
-        try:
-            fa_connection = FarcasterConnection.get_connection(self.user_profile)
-        except FarcasterConnection.DoesNotExist:
-            logging.error("Farcaster connection not found.")
+    def get_info(self, *args, **kwargs) -> dict:
+        viewer = self.get_viewer()
+        if viewer is None:
             return None
         fids = self.param_values[ConstraintParam.FARCASTER_FIDS.name]
-        return farcaster_util.is_following_batch(
-            fids=fids, address=fa_connection.user_wallet_address
-        )
+        return viewer.get_following_statuses(fids)
 
-    def is_observed(self, *args, **kwargs) -> bool:
+    def verify(self, *args, **kwargs) -> tuple[bool, dict | None]:
         res = self.get_info(*args, **kwargs)
-        if res is None:
-            return False
-        return all(res.values())
+        return res is not None and all(res.values()), res
+
+    def is_observed(self, *args, **kwargs) -> bool:
+        return self.verify(*args, **kwargs)[0]
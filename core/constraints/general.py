@@ -1,8 +1,6 @@
-import csv
 from abc import ABC, abstractmethod
 
 import rest_framework.exceptions
-from django.db.models.functions import Lower
 
 from core.constraints.abstract import ConstraintParam, ConstraintVerification
 from core.utils import InvalidAddressException, NFTClient, TokenClient
@@ -27,12 +25,15 @@ class HasNFTVerification(ConstraintVerification):
 
         user_wallets = self.user_profile.wallets.filter(wallet_type=chain.chain_type)
 
-        token_count = 0
         try:
-            for wallet in user_wallets:
-                token_count += nft_client.get_number_of_tokens(
-                    nft_client.to_checksum_address(wallet.address)
+            token_count = sum(
+                nft_client.get_numbers_of_tokens(
+                    [
+                        nft_client.to_checksum_address(wallet.address)
+                        for wallet in user_wallets
+                    ]
                 )
+            )
         except InvalidAddressException as e:
             raise rest_framework.exceptions.ValidationError(e)
 
@@ -52,6 +53,14 @@ class ABCTokenVerification(ConstraintVerification, ABC):
     ) -> int:
         raise NotImplementedError("you must implement this function")
 
+    def get_total_amount(
+        self, user_addresses: list[str], token_address: str, token_client: TokenClient
+    ) -> int:
+        return sum(
+            self.get_amount(user_address, token_address, token_client)
+            for user_address in user_addresses
+        )
+
     def is_observed(self, *args, **kwargs):
         from core.models import Chain
 
@@ -68,13 +77,10 @@ class ABCTokenVerification(ConstraintVerification, ABC):
 
         token_client = TokenClient(chain=chain, contract=token_address)
 
-        token_count = 0
-
         try:
-            for wallet in user_wallets:
-                token_count += self.get_amount(
-                    wallet.address, token_address, token_client
-                )
+            token_count = self.get_total_amount(
+                [wallet.address for wallet in user_wallets], token_address, token_client
+            )
         except InvalidAddressException as e:
             raise rest_framework.exceptions.ValidationError(e)
 
@@ -89,6 +95,13 @@ class HasTokenVerification(ABCTokenVerification):
             return token_client.get_native_token_balance(user_address)
         return token_client.get_non_native_token_balance(user_address)
 
+    def get_total_amount(
+        self, user_addresses: list[str], token_address: str, token_client: TokenClient
+    ) -> int:
+        if token_address is None:
+            return sum(token_client.get_native_token_balances(user_addresses))
+        return sum(token_client.get_non_native_token_balances(user_addresses))
+
 
 class HasTokenTransferVerification(ABCTokenVerification):
     _param_keys = [
@@ -104,21 +117,32 @@ class HasTokenTransferVerification(ABCTokenVerification):
             return 0
         return token_client.get_non_native_token_transfer_amount(user_address)
 
+    def get_total_amount(
+        self, user_addresses: list[str], token_address: str, token_client: TokenClient
+    ) -> int:
+        from core.models import TokenTransferIndex
+
+        if token_address is None:
+            return 0
+        index = TokenTransferIndex.register(token_client.chain, token_address)
+        if index.synced_at is None:
+            # the index has not caught up with the chain yet
+            return super().get_total_amount(user_addresses, token_address, token_client)
+        # only the blocks after the cursor are read from the chain
+        return index.get_transferred_amount(senders=user_addresses) + sum(
+            token_client.get_non_native_token_transfer_amount(
+                user_address, from_block=index.last_indexed_block + 1
+            )
+            for user_address in user_addresses
+        )
+
 
 class AllowListVerification(ConstraintVerification):
     _param_keys = [ConstraintParam.CSV_FILE]
 
     def is_observed(self, *args, **kwargs):
+        from core.models import AllowList
+
         file_path = self.param_values[ConstraintParam.CSV_FILE.name]
-        self.allow_list = []
-        with open(file_path, newline="") as f:
-            reader = csv.reader(f)
-            data = list(reader)
-            self.allow_list = [a[0].lower() for a in data]
-            user_wallets = self.user_profile.wallets.values_list(
-                Lower("address"), flat=True
-            )
-            for wallet in user_wallets:
-                if wallet in self.allow_list:
-                    return True
-            return False
+        user_wallets = self.user_profile.wallets.values_list("address", flat=True)
+        return AllowList.contains_any(file_path, user_wallets)
@@ -44,6 +44,9 @@ class HasMinimumHumanityScore(ConstraintVerification):
             )
         except GitcoinPassportConnection.DoesNotExist:
             return False
+        if gitcoint_passport.scored_at is None:
+            # connected before the scores were stored
+            gitcoint_passport.refresh_score()
         if float(gitcoint_passport.score) >= float(
             self.param_values[ConstraintParam.MINIMUM.name]
         ):
@@ -1,7 +1,7 @@
 from django.db.models.functions import Lower
 
 from core.constraints.abstract import ConstraintApp, ConstraintVerification
-from core.utils import Web3Utils
+from core.utils import MulticallClient, Web3Utils
 
 MUON_NODE_MANAGER_ABI = [
     {
@@ -71,12 +71,12 @@ class HasMuonNode(ConstraintVerification):
             Lower("address"), flat=True
         )
 
-        for wallet in user_wallets:
-            func = self.web3_utils.contract.functions.stakerAddressInfo(
-                self.web3_utils.to_checksum_address(wallet)
-            )
-            node = self.web3_utils.contract_call(func)
-            if node and node[0] != 0 and node[4]:
-                return True
-
-        return False
+        nodes = MulticallClient(self.web3_utils).call(
+            [
+                self.web3_utils.contract.functions.stakerAddressInfo(
+                    self.web3_utils.to_checksum_address(wallet)
+                )
+                for wallet in user_wallets
+            ]
+        )
+        return any(node and node[0] != 0 and node[4] for node in nodes)
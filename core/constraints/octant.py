@@ -6,7 +6,7 @@ from core.constraints.abstract import (
     ConstraintParam,
     ConstraintVerification,
 )
-from core.utils import InvalidAddressException, Web3Utils
+from core.utils import InvalidAddressException, MulticallClient, Web3Utils
 
 
 class GLMStakingVerification(ConstraintVerification):
@@ -24,18 +24,18 @@ class GLMStakingVerification(ConstraintVerification):
 
         chain = Chain.objects.get(chain_id="1")
         web3_utils = Web3Utils(chain.rpc_url_private, chain.poa)
+        web3_utils.set_contract(self.GLM_CONTRACT_ADDRESS, GLM_ABI)
 
-        staked_amount = 0
         try:
-            for wallet in self.user_addresses:
-                staked_amount += self.get_staked_amount(wallet, web3_utils)
-
+            staked_amounts = MulticallClient(web3_utils).call(
+                [
+                    web3_utils.contract.functions.deposits(
+                        web3_utils.to_checksum_address(wallet)
+                    )
+                    for wallet in self.user_addresses
+                ]
+            )
         except InvalidAddressException as e:
             raise ValidationError({"address": str(e)})
 
-        return int(staked_amount) >= int(minimum)
-
-    def get_staked_amount(self, user_address: str, web3_utils: Web3Utils) -> int:
-        web3_utils.set_contract(self.GLM_CONTRACT_ADDRESS, GLM_ABI)
-        deposits_function = web3_utils.contract.functions.deposits(user_address)
-        return web3_utils.contract_call(deposits_function)
+        return sum(amount or 0 for amount in staked_amounts) >= int(minimum)
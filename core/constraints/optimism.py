@@ -47,20 +47,22 @@ class DelegateOP(ConstraintVerification):
             chain=chain, contract=self.OP_TOKEN_CONTRACT, abi=self.OP_TOKEN_ABI
         )
         delegated_power = 0
+        valid_addresses = []
         for user_address in self.user_addresses:
             try:
-                address = token_client.to_checksum_address(user_address)
-                delegated_address = token_client.get_delegates_address(user_address)
-                if not delegated_address or (
-                    ConstraintParam.ADDRESS.name in self.param_keys()
-                    and delegated_address.lower()
-                    != self.param_values[ConstraintParam.ADDRESS.name].lower()
-                ):
-                    continue
-                balance = token_client.get_non_native_token_balance(address)
-                delegated_power += balance
+                valid_addresses.append(token_client.to_checksum_address(user_address))
             except InvalidAddressException:
                 pass
+        for delegated_address, balance in token_client.get_delegates_and_balances(
+            valid_addresses
+        ):
+            if not delegated_address or (
+                ConstraintParam.ADDRESS.name in self.param_keys()
+                and delegated_address.lower()
+                != self.param_values[ConstraintParam.ADDRESS.name].lower()
+            ):
+                continue
+            delegated_power += balance or 0
         if delegated_power >= int(self.param_values[ConstraintParam.MINIMUM.name]):
             return True
         return False
@@ -5,7 +5,7 @@ from core.constraints.abstract import (
     ConstraintParam,
     ConstraintVerification,
 )
-from core.thirdpartyapp import RapidTwitter, TwitterUtils
+from core.thirdpartyapp import RapidTwitter
 
 
 class HasTwitter(ConstraintVerification):
@@ -176,9 +176,8 @@ class DidRetweetTweet(ConstraintVerification):
         except TwitterConnection.DoesNotExist:
             return False
         tweet_id = self.param_values[ConstraintParam.TWEET_ID.name]
-        twitter_util = TwitterUtils(twitter.access_token, twitter.access_token_secret)
         try:
-            return twitter_util.did_retweet_tweet(tweet_id=tweet_id)
+            return twitter.is_retweeted(tweet_id)
         except Exception as e:
             logging.error(f"Error in DidRetweetTweet: {e}")
 
@@ -195,9 +194,8 @@ class DidQuoteTweet(ConstraintVerification):
         except TwitterConnection.DoesNotExist:
             return False
         tweet_id = self.param_values[ConstraintParam.TWEET_ID.name]
-        twitter_util = TwitterUtils(twitter.access_token, twitter.access_token_secret)
         try:
-            return twitter_util.did_quote_tweet(tweet_id=tweet_id)
+            return twitter.is_quoted(tweet_id)
         except Exception as e:
             logging.error(f"Error in DidQuoteTweet: {e}")
 
@@ -215,7 +213,9 @@ class IsFollowingTwitterBatch(ConstraintVerification):
             return None
 
         twitter_username = twitter.username
-        target_ids_list = list(map(str, self.param_values[ConstraintParam.TWITTER_IDS.name]))
+        target_ids_list = list(
+            map(str, self.param_values[ConstraintParam.TWITTER_IDS.name])
+        )
 
         rapid_twitter = RapidTwitter()
         res = rapid_twitter.is_following_batch_with_cache(
@@ -223,8 +223,9 @@ class IsFollowingTwitterBatch(ConstraintVerification):
         )
         return res
 
-    def is_observed(self, *args, **kwargs) -> bool:
+    def verify(self, *args, **kwargs) -> tuple[bool, dict | None]:
         res = self.get_info(*args, **kwargs)
-        if res is None:
-            return False
-        return all(res.values())
+        return res is not None and all(res.values()), res
+
+    def is_observed(self, *args, **kwargs) -> bool:
+        return self.verify(*args, **kwargs)[0]
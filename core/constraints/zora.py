@@ -11,6 +11,7 @@ from core.thirdpartyapp import ZoraUtil
 class DidMintZoraNFT(ConstraintVerification):
     app_name = ConstraintApp.ZORA.value
     _param_keys = [ConstraintParam.ADDRESS]
+    is_campaign_scoped = True
 
     def __init__(self, user_profile, *, obj=None) -> None:
         super().__init__(user_profile, obj=obj)
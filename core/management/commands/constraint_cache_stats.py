@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.constraints.evaluator import ConstraintEvaluator
+
+
+class Command(BaseCommand):
+    help = "Show the hit rate of the constraint result cache"
+
+    def handle(self, *args, **options):
+        stats = ConstraintEvaluator.get_cache_stats()
+        hit_rate = stats["hit_rate"]
+        self.stdout.write(
+            f"hits: {stats['hits']}, misses: {stats['misses']}, hit rate: "
+            + ("-" if hit_rate is None else f"{hit_rate:.2%}")
+        )
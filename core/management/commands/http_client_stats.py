@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core.request_helper import HostMetrics
+
+
+class Command(BaseCommand):
+    help = "Show the request count, error rate and latency of third party hosts"
+
+    def handle(self, *args, **options):
+        for host, stats in HostMetrics.get_stats().items():
+            error_rate = stats["error_rate"]
+            latency = stats["avg_latency_ms"]
+            self.stdout.write(
+                f"{host} - requests: {stats['requests']}, errors: {stats['errors']}, "
+                + "error rate: "
+                + ("-" if error_rate is None else f"{error_rate:.2%}")
+                + ", avg latency: "
+                + ("-" if latency is None else f"{latency:.0f}ms")
+            )
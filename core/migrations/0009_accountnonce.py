@@ -0,0 +1,41 @@
+# Generated by Django 5.1.2 on 2026-10-17 02:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0008_alter_chain_chain_type_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AccountNonce",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("address", models.CharField(max_length=255)),
+                ("next_nonce", models.BigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "chain",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="nonces",
+                        to="core.chain",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("chain", "address")},
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.2 on 2026-10-17 02:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0009_accountnonce"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chain",
+            name="confirmations",
+            field=models.PositiveSmallIntegerField(
+                default=1, help_text="blocks a transaction needs before it is final"
+            ),
+        ),
+    ]
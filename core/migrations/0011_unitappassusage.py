@@ -0,0 +1,44 @@
+# Generated by Django 5.1.2 on 2026-10-17 03:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0010_chain_confirmations"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UnitapPassUsage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("scope", models.CharField(max_length=255)),
+                ("pass_id", models.PositiveIntegerField()),
+                ("round_start", models.DateTimeField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        condition=models.Q(("round_start__isnull", False)),
+                        fields=("scope", "pass_id", "round_start"),
+                        name="unique_round_unitap_pass_usage",
+                    ),
+                    models.UniqueConstraint(
+                        condition=models.Q(("round_start__isnull", True)),
+                        fields=("scope", "pass_id"),
+                        name="unique_unitap_pass_usage",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.1.2 on 2026-10-17 03:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0011_unitappassusage"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UnitapPassContract",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("address", models.CharField(max_length=255)),
+                ("last_indexed_block", models.BigIntegerField(default=0)),
+                ("is_active", models.BooleanField(default=True)),
+                (
+                    "chain",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="unitap_pass_contracts",
+                        to="core.chain",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("chain", "address")},
+            },
+        ),
+        migrations.CreateModel(
+            name="UnitapPass",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("token_id", models.PositiveBigIntegerField()),
+                ("owner", models.CharField(db_index=True, max_length=42)),
+                ("updated_block", models.BigIntegerField()),
+                (
+                    "contract",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="passes",
+                        to="core.unitappasscontract",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("contract", "token_id")},
+            },
+        ),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 5.1.2 on 2026-10-17 03:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0013_allowlist"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="unitappasscontract",
+            name="synced_at",
+            field=models.DateTimeField(
+                blank=True, help_text="last time the index reached the head", null=True
+            ),
+        ),
+        migrations.CreateModel(
+            name="TokenTransferIndex",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("address", models.CharField(max_length=255)),
+                ("last_indexed_block", models.BigIntegerField(default=0)),
+                (
+                    "synced_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="last time the index reached the head",
+                        null=True,
+                    ),
+                ),
+                ("is_active", models.BooleanField(default=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "chain",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="token_transfer_indexes",
+                        to="core.chain",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("chain", "address")},
+            },
+        ),
+        migrations.CreateModel(
+            name="TokenTransfer",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("block_number", models.BigIntegerField()),
+                ("block_timestamp", models.DateTimeField()),
+                ("log_index", models.PositiveIntegerField()),
+                ("tx_hash", models.CharField(max_length=66)),
+                ("sender", models.CharField(max_length=42)),
+                ("receiver", models.CharField(max_length=42)),
+                ("value", models.DecimalField(decimal_places=0, max_digits=78)),
+                (
+                    "index",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="transfers",
+                        to="core.tokentransferindex",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["index", "sender", "block_number"],
+                        name="core_tokent_index_i_309f62_idx",
+                    ),
+                    models.Index(
+                        fields=["index", "receiver", "block_number"],
+                        name="core_tokent_index_i_e0e354_idx",
+                    ),
+                ],
+                "unique_together": {("index", "block_number", "log_index")},
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.2 on 2026-10-17 03:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0014_tokentransferindex"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResolvedIdentity",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "provider",
+                    models.CharField(
+                        choices=[
+                            ("farcaster", "Farcaster"),
+                            ("lens", "Lens"),
+                            ("ens", "ENS"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("address", models.CharField(max_length=255)),
+                ("identity", models.CharField(blank=True, max_length=255, null=True)),
+                ("resolved_at", models.DateTimeField()),
+            ],
+            options={
+                "unique_together": {("provider", "address")},
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.2 on 2026-10-17 05:40
+
+from django.db import migrations
+
+BASE_CHAIN_ID = "8453"
+UNITAP_PASS_ADDRESS = "0xA27b7B65b0de0c08b002E6be828731FA865027bB"
+
+
+def register_unitap_pass_contract(apps, schema_editor):
+    Chain = apps.get_model("core", "Chain")
+    UnitapPassContract = apps.get_model("core", "UnitapPassContract")
+    chain = Chain.objects.filter(chain_id=BASE_CHAIN_ID).first()
+    if chain is None:
+        return
+    # the deployment block is looked up by the first sync
+    UnitapPassContract.objects.get_or_create(chain=chain, address=UNITAP_PASS_ADDRESS)
+
+
+def unregister_unitap_pass_contract(apps, schema_editor):
+    UnitapPassContract = apps.get_model("core", "UnitapPassContract")
+    UnitapPassContract.objects.filter(
+        chain__chain_id=BASE_CHAIN_ID, address=UNITAP_PASS_ADDRESS
+    ).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0015_resolvedidentity"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            register_unitap_pass_contract, unregister_unitap_pass_contract
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.2 on 2026-10-17 04:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0016_register_unitap_pass_contract"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tokentransferindex",
+            name="start_block",
+            field=models.BigIntegerField(
+                blank=True,
+                help_text="block to start from when the deployment lookup fails",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="unitappasscontract",
+            name="start_block",
+            field=models.BigIntegerField(
+                blank=True,
+                help_text="block to start from when the deployment lookup fails",
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.2 on 2026-10-17 05:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0017_contract_index_start_block"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="unitappassusage",
+            name="unique_round_unitap_pass_usage",
+        ),
+        migrations.RemoveConstraint(
+            model_name="unitappassusage",
+            name="unique_unitap_pass_usage",
+        ),
+        migrations.AddField(
+            model_name="unitappassusage",
+            name="collection",
+            field=models.CharField(
+                default="unitap-pass-eth",
+                help_text="collection the pass id belongs to",
+                max_length=255,
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="unitappassusage",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("round_start__isnull", False)),
+                fields=("scope", "collection", "pass_id", "round_start"),
+                name="unique_round_unitap_pass_usage",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="unitappassusage",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("round_start__isnull", True)),
+                fields=("scope", "collection", "pass_id"),
+                name="unique_unitap_pass_usage",
+            ),
+        ),
+    ]
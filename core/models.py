@@ -1,15 +1,25 @@
 import binascii
+import csv
+import datetime
+import functools
 import inspect
 import logging
+import time
 
 from bip_utils import Bip44, Bip44Coins
+from django.conf import settings
 from django.contrib.postgres.fields import ArrayField
-from django.db import models
+from django.core.cache import cache
+from django.db import connection, models, transaction
+from django.db.models import Sum
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from encrypted_model_fields.fields import EncryptedCharField
+from hexbytes import HexBytes
 from rest_framework.exceptions import ValidationError
 from solders.keypair import Keypair
 from solders.pubkey import Pubkey
+from web3 import Web3
 
 from core.constraints.captcha import HasVerifiedCloudflareCaptcha, HasVerifiedHCaptcha
 
@@ -56,7 +66,7 @@ from .constraints import (
     IsFollowingTwitterUser,
     HasTelegramConnection,
 )
-from .utils import SolanaWeb3Utils, Web3Utils
+from .utils import NFTClient, SolanaWeb3Utils, Web3ProviderRegistry, Web3Utils
 
 
 class NetworkTypes:
@@ -275,6 +285,9 @@ class Chain(models.Model):
     )
 
     is_active = models.BooleanField(default=True)
+    confirmations = models.PositiveSmallIntegerField(
+        default=1, help_text="blocks a transaction needs before it is final"
+    )
 
     def __str__(self):
         return f"{self.chain_name} - {self.pk} - {self.symbol}:{self.chain_id}"
@@ -323,6 +336,729 @@ class Chain(models.Model):
             logging.exception(f"Error getting gas price for {self.chain_name}")
             return self.max_gas_price + 1
 
+    @property
+    def block_gas_limit(self):
+        if (
+            not self.is_active
+            or not self.rpc_url_private
+            or self.chain_type not in (NetworkTypes.EVM, NetworkTypes.NONEVMXDC)
+        ):
+            return None
+
+        try:
+            return Web3Utils(self.rpc_url_private, self.poa).get_block_gas_limit()
+        except:  # noqa: E722
+            logging.exception(f"Error getting block gas limit for {self.chain_name}")
+            return None
+
+
+class AccountNonce(models.Model):
+    """
+    Next nonce of a wallet on a chain, handed out locally so several transactions
+    can be signed and broadcast back-to-back without waiting for confirmations
+    """
+
+    chain = models.ForeignKey(Chain, related_name="nonces", on_delete=models.CASCADE)
+    address = models.CharField(max_length=255)
+    next_nonce = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("chain", "address")
+
+    def __str__(self):
+        return f"{self.chain.chain_name} - {self.address}: {self.next_nonce}"
+
+    @classmethod
+    def allocate(cls, chain: Chain, address: str, network_nonce: int) -> int:
+        """
+        Reserve the next nonce of the wallet. network_nonce is the pending
+        transaction count reported by the rpc, it wins over the local counter
+        when transactions were sent from the same wallet outside the allocator.
+        """
+        with transaction.atomic():
+            account_nonce = cls._get_locked(chain, address)
+            nonce = max(account_nonce.next_nonce, network_nonce)
+            account_nonce.next_nonce = nonce + 1
+            account_nonce.save(update_fields=["next_nonce", "updated_at"])
+        return nonce
+
+    @classmethod
+    def reset(
+        cls, chain: Chain, address: str, network_nonce: int, idle_for: int = 0
+    ) -> bool:
+        """
+        Pull the counter back to the network nonce when it got ahead of it, e.g. a
+        nonce that was allocated but neither broadcast nor cancelled. Nothing is
+        done if a nonce was allocated in the last idle_for seconds, since it may
+        not be saved on its batch yet.
+        """
+        with transaction.atomic():
+            account_nonce = cls._get_locked(chain, address)
+            if network_nonce >= account_nonce.next_nonce:
+                return False
+            idle = timezone.now() - account_nonce.updated_at
+            if idle < datetime.timedelta(seconds=idle_for):
+                return False
+            account_nonce.next_nonce = network_nonce
+            account_nonce.save(update_fields=["next_nonce", "updated_at"])
+        return True
+
+    @classmethod
+    def _get_locked(cls, chain: Chain, address: str):
+        cls.objects.get_or_create(chain=chain, address=address)
+        return cls.objects.select_for_update().get(chain=chain, address=address)
+
+
+class UnitapPassUsage(models.Model):
+    """
+    A Unitap Pass used in a scope, e.g. a faucet or a token distribution. Passes
+    are used once per round, or once for good when round_start is null. Pass ids
+    are only unique within their collection.
+    """
+
+    # the collection of the passes returned by UserProfile.has_unitap_pass
+    ETHEREUM_COLLECTION = "unitap-pass-eth"
+
+    scope = models.CharField(max_length=255)
+    collection = models.CharField(
+        max_length=255,
+        default=ETHEREUM_COLLECTION,
+        help_text="collection the pass id belongs to",
+    )
+    pass_id = models.PositiveIntegerField()
+    round_start = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["scope", "collection", "pass_id", "round_start"],
+                name="unique_round_unitap_pass_usage",
+                condition=models.Q(round_start__isnull=False),
+            ),
+            models.UniqueConstraint(
+                fields=["scope", "collection", "pass_id"],
+                name="unique_unitap_pass_usage",
+                condition=models.Q(round_start__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} - {self.pass_id}"
+
+    @staticmethod
+    def get_scope(obj: models.Model) -> str:
+        return f"{obj._meta.label_lower}:{obj.pk}"
+
+    @classmethod
+    def get_unused(
+        cls, scope, pass_ids, round_start=None, collection=ETHEREUM_COLLECTION
+    ) -> list[int]:
+        used = cls.objects.filter(
+            scope=scope,
+            collection=collection,
+            round_start=round_start,
+            pass_id__in=pass_ids,
+        ).values_list("pass_id", flat=True)
+        return sorted(set(pass_ids) - set(used))
+
+    @classmethod
+    def reserve(
+        cls, scope, pass_ids, round_start=None, collection=ETHEREUM_COLLECTION
+    ) -> list[int]:
+        """
+        Mark the passes as used in one insert, returns the ones that were not
+        used already
+        """
+        if not pass_ids:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {cls._meta.db_table} "
+                "(scope, collection, pass_id, round_start, created_at) "
+                "SELECT %s, %s, unnest(%s::integer[]), %s, now() "
+                "ON CONFLICT DO NOTHING RETURNING pass_id",
+                [scope, collection, sorted(set(pass_ids)), round_start],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class ContractLogIndex(models.Model):
+    """
+    Base of the tables fed by the logs of one contract, last_indexed_block is the
+    cursor the next sync starts after. The last REORG_DEPTH blocks are read again
+    on every sync, so ingest must be idempotent over a block range. A range the
+    provider refuses for returning too many logs is halved and read again.
+    """
+
+    BLOCK_RANGE = 2000
+    CONFIRMATIONS = 0
+    REORG_DEPTH = 0
+    # parts of the errors providers answer with when a range has too many logs
+    RESULT_LIMIT_ERRORS = (
+        "-32005",
+        "more than",
+        "too many",
+        "too large",
+        "limit exceeded",
+        "size exceeded",
+    )
+
+    address = models.CharField(max_length=255)
+    last_indexed_block = models.BigIntegerField(default=0)
+    start_block = models.BigIntegerField(
+        null=True,
+        blank=True,
+        help_text="block to start from when the deployment lookup fails",
+    )
+    synced_at = models.DateTimeField(
+        null=True, blank=True, help_text="last time the index reached the head"
+    )
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f"{self.chain} - {self.address}"
+
+    def get_topics(self) -> list:
+        raise NotImplementedError("you must implement this function")
+
+    def ingest(self, w3, logs, from_block, to_block) -> int:
+        raise NotImplementedError("you must implement this function")
+
+    @classmethod
+    def is_result_limit_error(cls, e: ValueError) -> bool:
+        message = str(e).lower()
+        return any(part in message for part in cls.RESULT_LIMIT_ERRORS)
+
+    def get_start_block(self, w3, head) -> int:
+        try:
+            return self.find_deployment_block(w3, head)
+        except ValueError as e:
+            # get_code of old blocks needs an archive node
+            if self.start_block is None:
+                raise
+            logging.warning(
+                f"Could not find the deployment block of {self}, "
+                f"starting at {self.start_block}: {e}"
+            )
+            return self.start_block
+
+    def find_deployment_block(self, w3, head) -> int:
+        address = Web3.to_checksum_address(self.address)
+        low, high = 0, head
+        while low < high:
+            middle = (low + high) // 2
+            if w3.eth.get_code(address, block_identifier=middle):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def sync(self, max_ranges=50) -> int:
+        """
+        Ingest the logs after the cursor, at most max_ranges block ranges per
+        call, returns what ingest reports for the ranges
+        """
+        w3 = Web3ProviderRegistry.get_healthy_w3(
+            self.chain.rpc_url_private, self.chain.poa
+        )
+        head = w3.eth.block_number - self.CONFIRMATIONS
+        if self.last_indexed_block:
+            from_block = max(self.last_indexed_block + 1 - self.REORG_DEPTH, 0)
+        else:
+            # nothing to read before the contract existed
+            from_block = self.get_start_block(w3, head)
+        block_range = self.BLOCK_RANGE
+        updated = 0
+        for _range in range(max_ranges):
+            if from_block > head:
+                break
+            to_block = min(head, from_block + block_range - 1)
+            try:
+                logs = w3.eth.get_logs(
+                    {
+                        "address": Web3.to_checksum_address(self.address),
+                        "topics": self.get_topics(),
+                        "fromBlock": from_block,
+                        "toBlock": to_block,
+                    }
+                )
+            except ValueError as e:
+                if from_block == to_block or not self.is_result_limit_error(e):
+                    raise
+                block_range = (to_block - from_block + 1) // 2
+                continue
+            updated += self.ingest(w3, logs, from_block, to_block)
+            from_block = to_block + 1
+        if self.last_indexed_block >= head:
+            self.synced_at = timezone.now()
+            self.save(update_fields=["synced_at"])
+        return updated
+
+
+class UnitapPassContract(ContractLogIndex):
+    """
+    A Unitap Pass collection whose Transfer events are indexed into UnitapPass
+    """
+
+    TRANSFER_TOPIC = Web3.to_hex(Web3.keccak(text="Transfer(address,address,uint256)"))
+    CONFIRMATIONS = 5
+
+    chain = models.ForeignKey(
+        Chain, on_delete=models.PROTECT, related_name="unitap_pass_contracts"
+    )
+
+    class Meta:
+        unique_together = ("chain", "address")
+
+    def get_topics(self) -> list:
+        return [self.TRANSFER_TOPIC]
+
+    @transaction.atomic
+    def ingest(self, w3, logs, from_block, to_block) -> int:
+        owners = {}
+        for log in sorted(logs, key=lambda log: (log["blockNumber"], log["logIndex"])):
+            # erc20 transfers share the topic but do not index the value
+            if len(log["topics"]) != 4:
+                continue
+            token_id = int.from_bytes(log["topics"][3], "big")
+            owner = "0x" + bytes(log["topics"][2][-20:]).hex()
+            owners[token_id] = (owner, log["blockNumber"])
+        UnitapPass.objects.bulk_create(
+            [
+                UnitapPass(
+                    contract=self,
+                    token_id=token_id,
+                    owner=owner,
+                    updated_block=block_number,
+                )
+                for token_id, (owner, block_number) in owners.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["contract", "token_id"],
+            update_fields=["owner", "updated_block"],
+        )
+        self.last_indexed_block = to_block
+        self.save(update_fields=["last_indexed_block"])
+        return len(owners)
+
+
+class UnitapPass(models.Model):
+    """
+    Current owner of a Unitap Pass, owner is the lowercased address and is the
+    zero address once the pass is burnt.
+    """
+
+    ZERO_ADDRESS = "0x" + "0" * 40
+    # read on chain until the index of every contract has reached the head
+    FALLBACK_CHAIN_ID = "8453"
+    FALLBACK_CONTRACT = "0xA27b7B65b0de0c08b002E6be828731FA865027bB"
+
+    contract = models.ForeignKey(
+        UnitapPassContract, on_delete=models.CASCADE, related_name="passes"
+    )
+    token_id = models.PositiveBigIntegerField()
+    owner = models.CharField(max_length=42, db_index=True)
+    updated_block = models.BigIntegerField()
+
+    class Meta:
+        unique_together = ("contract", "token_id")
+
+    def __str__(self):
+        return f"{self.token_id} - {self.owner}"
+
+    @classmethod
+    def owned_by(cls, addresses) -> models.QuerySet:
+        return cls.objects.filter(owner__in=[address.lower() for address in addresses])
+
+    @staticmethod
+    def is_indexed() -> bool:
+        contracts = UnitapPassContract.objects.filter(is_active=True)
+        return contracts.exists() and not contracts.filter(synced_at=None).exists()
+
+    @classmethod
+    def count_owned_by(cls, addresses) -> int:
+        if cls.is_indexed():
+            return cls.owned_by(addresses).count()
+        addresses = list(addresses)
+        if not addresses:
+            return 0
+        nft_client = NFTClient(
+            Chain.objects.get(chain_id=cls.FALLBACK_CHAIN_ID), cls.FALLBACK_CONTRACT
+        )
+        return sum(
+            nft_client.get_numbers_of_tokens(
+                [
+                    nft_client.to_checksum_address(address.lower())
+                    for address in addresses
+                ]
+            )
+        )
+
+
+class TokenTransferIndex(ContractLogIndex):
+    """
+    ERC-20 Transfer events of a token, indexed into TokenTransfer so transferred
+    amounts are summed from the table instead of scanning the chain history.
+    address is lowercased.
+    """
+
+    TRANSFER_TOPIC = UnitapPassContract.TRANSFER_TOPIC
+    REORG_DEPTH = 64
+
+    chain = models.ForeignKey(
+        Chain, on_delete=models.PROTECT, related_name="token_transfer_indexes"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("chain", "address")
+
+    @classmethod
+    def register(cls, chain, address) -> "TokenTransferIndex":
+        index, _ = cls.objects.get_or_create(chain=chain, address=address.lower())
+        return index
+
+    def get_topics(self) -> list:
+        return [self.TRANSFER_TOPIC]
+
+    @staticmethod
+    def get_block_timestamps(w3, block_numbers) -> dict:
+        block_numbers = sorted(block_numbers)
+        if not block_numbers:
+            return {}
+        try:
+            blocks = w3.provider.make_batch_request(
+                [
+                    ("eth_getBlockByNumber", [hex(number), False])
+                    for number in block_numbers
+                ]
+            )
+            timestamps = [int(block["timestamp"], 16) for block in blocks]
+        except Exception as e:
+            logging.warning(f"Batch block lookup failed, reading one by one: {e}")
+            timestamps = [
+                w3.eth.get_block(number)["timestamp"] for number in block_numbers
+            ]
+        return {
+            number: datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc)
+            for number, timestamp in zip(block_numbers, timestamps)
+        }
+
+    @transaction.atomic
+    def ingest(self, w3, logs, from_block, to_block) -> int:
+        # erc721 transfers share the topic but index the token id as well
+        logs = [log for log in logs if len(log["topics"]) == 3]
+        timestamps = self.get_block_timestamps(w3, {log["blockNumber"] for log in logs})
+        # a range is read again while it is within the reorg depth
+        self.transfers.filter(block_number__range=(from_block, to_block)).delete()
+        TokenTransfer.objects.bulk_create(
+            [
+                TokenTransfer(
+                    index=self,
+                    block_number=log["blockNumber"],
+                    block_timestamp=timestamps[log["blockNumber"]],
+                    log_index=log["logIndex"],
+                    tx_hash=Web3.to_hex(HexBytes(log["transactionHash"])),
+                    sender="0x" + bytes(log["topics"][1][-20:]).hex(),
+                    receiver="0x" + bytes(log["topics"][2][-20:]).hex(),
+                    value=int.from_bytes(HexBytes(log["data"]), "big"),
+                )
+                for log in logs
+            ],
+            batch_size=1000,
+        )
+        self.last_indexed_block = to_block
+        self.save(update_fields=["last_indexed_block"])
+        return len(logs)
+
+    def get_transferred_amount(
+        self, *, senders=None, receivers=None, since_block=None, since=None
+    ) -> int:
+        """
+        Total value transferred from any of senders and/or to any of receivers,
+        up to last_indexed_block
+        """
+        transfers = self.transfers.all()
+        if senders is not None:
+            transfers = transfers.filter(
+                sender__in=[address.lower() for address in senders]
+            )
+        if receivers is not None:
+            transfers = transfers.filter(
+                receiver__in=[address.lower() for address in receivers]
+            )
+        if since_block is not None:
+            transfers = transfers.filter(block_number__gte=since_block)
+        if since is not None:
+            transfers = transfers.filter(block_timestamp__gte=since)
+        return int(transfers.aggregate(total=Sum("value", default=0))["total"])
+
+
+class TokenTransfer(models.Model):
+    """
+    One Transfer event of an indexed token, addresses are lowercased
+    """
+
+    index = models.ForeignKey(
+        TokenTransferIndex, on_delete=models.CASCADE, related_name="transfers"
+    )
+    block_number = models.BigIntegerField()
+    block_timestamp = models.DateTimeField()
+    log_index = models.PositiveIntegerField()
+    tx_hash = models.CharField(max_length=66)
+    sender = models.CharField(max_length=42)
+    receiver = models.CharField(max_length=42)
+    value = models.DecimalField(max_digits=78, decimal_places=0)
+
+    class Meta:
+        unique_together = ("index", "block_number", "log_index")
+        indexes = [
+            models.Index(fields=["index", "sender", "block_number"]),
+            models.Index(fields=["index", "receiver", "block_number"]),
+        ]
+
+    def __str__(self):
+        return f"{self.tx_hash} - {self.sender} -> {self.receiver}"
+
+
+class ResolvedIdentity(models.Model):
+    """
+    Identity of a wallet address on a social provider (farcaster fid, lens
+    profile id or ens name), identity is null when the address has none.
+    Rows older than their ttl are resolved again, recent ones are also kept in
+    the cache so most lookups do not reach the database.
+    """
+
+    class Provider(models.TextChoices):
+        FARCASTER = "farcaster", _("Farcaster")
+        LENS = "lens", _("Lens")
+        ENS = "ens", _("ENS")
+
+    # an address is resolved by one caller at a time, the others wait for it
+    RESOLVING_TIMEOUT = 30  # seconds
+    RESOLVING_POLL_INTERVAL = 0.1  # seconds
+
+    provider = models.CharField(max_length=20, choices=Provider.choices)
+    address = models.CharField(max_length=255)
+    identity = models.CharField(max_length=255, null=True, blank=True)
+    resolved_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("provider", "address")
+
+    def __str__(self):
+        return f"{self.provider} - {self.address} - {self.identity}"
+
+    @staticmethod
+    def get_ttl(identity) -> int:
+        if identity is None:
+            return settings.IDENTITY_RESOLUTION_NEGATIVE_TTL
+        return settings.IDENTITY_RESOLUTION_TTL
+
+    @staticmethod
+    def get_cache_key(provider, address) -> str:
+        return f"identity-{provider}-{address}"
+
+    @staticmethod
+    def get_resolving_key(provider, address) -> str:
+        return f"identity-resolving-{provider}-{address}"
+
+    @classmethod
+    def claim_resolving(cls, provider, address) -> bool:
+        key = cls.get_resolving_key(provider, address)
+        # when the cache is unreachable add fails too, nobody else can hold it
+        return cache.add(key, 1, cls.RESOLVING_TIMEOUT) or cache.get(key) is None
+
+    @property
+    def is_fresh(self) -> bool:
+        age = timezone.now() - self.resolved_at
+        return age.total_seconds() < self.get_ttl(self.identity)
+
+    @classmethod
+    def cache_identities(cls, provider, identities: dict):
+        values_by_ttl = {}
+        for address, identity in identities.items():
+            values_by_ttl.setdefault(cls.get_ttl(identity), {})[
+                cls.get_cache_key(provider, address)
+            ] = {"identity": identity}
+        for ttl, values in values_by_ttl.items():
+            cache.set_many(values, ttl)
+
+    @classmethod
+    def get_stored(cls, provider, addresses) -> dict:
+        cached = cache.get_many(
+            [cls.get_cache_key(provider, address) for address in addresses]
+        )
+        identities = {
+            address: cached[key]["identity"]
+            for address in addresses
+            if (key := cls.get_cache_key(provider, address)) in cached
+        }
+        stored = {
+            row.address: row.identity
+            for row in cls.objects.filter(
+                provider=provider,
+                address__in=[
+                    address for address in addresses if address not in identities
+                ],
+            )
+            if row.is_fresh
+        }
+        cls.cache_identities(provider, stored)
+        return {**identities, **stored}
+
+    @classmethod
+    def forget(cls, provider, address):
+        address = address.lower()
+        cls.objects.filter(provider=provider, address=address).delete()
+        cache.delete(cls.get_cache_key(provider, address))
+
+    @classmethod
+    def resolve_many(cls, provider, addresses, resolve) -> dict:
+        """
+        {address: identity} of the lowercased addresses. resolve is called with
+        the addresses that are not stored yet and returns {address: identity}
+        of the ones that have an identity.
+        """
+        addresses = list(dict.fromkeys(address.lower() for address in addresses))
+        identities = cls.get_stored(provider, addresses)
+        missing = [address for address in addresses if address not in identities]
+        if not missing:
+            return identities
+
+        # concurrent constraint checks of a user resolve an address once, the
+        # address is marked in flight so no lock is held during the network call
+        deadline = time.monotonic() + cls.RESOLVING_TIMEOUT
+        while missing:
+            claimed = [
+                address
+                for address in missing
+                if time.monotonic() > deadline or cls.claim_resolving(provider, address)
+            ]
+            if claimed:
+                try:
+                    identities.update(cls._resolve(provider, claimed, resolve))
+                finally:
+                    cache.delete_many(
+                        [
+                            cls.get_resolving_key(provider, address)
+                            for address in claimed
+                        ]
+                    )
+                missing = [address for address in missing if address not in identities]
+            if missing:
+                time.sleep(cls.RESOLVING_POLL_INTERVAL)
+                identities.update(cls.get_stored(provider, missing))
+                missing = [address for address in missing if address not in identities]
+        return identities
+
+    @classmethod
+    def _resolve(cls, provider, addresses, resolve) -> dict:
+        resolved = {
+            address.lower(): str(identity)
+            for address, identity in resolve(addresses).items()
+            if identity is not None
+        }
+        resolved = {address: resolved.get(address) for address in addresses}
+        now = timezone.now()
+        cls.objects.bulk_create(
+            [
+                cls(
+                    provider=provider,
+                    address=address,
+                    identity=identity,
+                    resolved_at=now,
+                )
+                for address, identity in resolved.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["provider", "address"],
+            update_fields=["identity", "resolved_at"],
+        )
+        cls.cache_identities(provider, resolved)
+        return resolved
+
+
+class AllowList(models.Model):
+    """
+    Addresses of an uploaded allow-list csv, ingested once so membership checks
+    are index lookups instead of csv scans. path is the CSV_FILE param value.
+    """
+
+    INGEST_BATCH_SIZE = 5000
+
+    path = models.CharField(max_length=255, unique=True)
+    address_count = models.PositiveIntegerField(default=0)
+    size_bytes = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.path
+
+    @staticmethod
+    def parse(lines) -> set[str]:
+        return {row[0].strip().lower() for row in csv.reader(lines) if row and row[0]}
+
+    @classmethod
+    @transaction.atomic
+    def ingest(cls, path, lines) -> "AllowList":
+        addresses = cls.parse(lines)
+        allow_list, _ = cls.objects.update_or_create(
+            path=path,
+            defaults={
+                "address_count": len(addresses),
+                "size_bytes": sum(len(address) for address in addresses),
+            },
+        )
+        allow_list.entries.all().delete()
+        AllowListEntry.objects.bulk_create(
+            (
+                AllowListEntry(allow_list=allow_list, address=address)
+                for address in addresses
+            ),
+            batch_size=cls.INGEST_BATCH_SIZE,
+        )
+        return allow_list
+
+    @classmethod
+    def get_or_ingest(cls, path) -> "AllowList":
+        # lists uploaded before the store existed are ingested on first use
+        try:
+            return cls.objects.get(path=path)
+        except cls.DoesNotExist:
+            with open(path, newline="") as f:
+                return cls.ingest(path, f)
+
+    @classmethod
+    def contains_any(cls, path, addresses) -> bool:
+        return any(_allow_list_contains(path, address.lower()) for address in addresses)
+
+
+@functools.lru_cache(maxsize=100_000)
+def _allow_list_contains(path, address) -> bool:
+    # uploaded lists never change, so membership is memoised per process
+    return AllowListEntry.objects.filter(
+        allow_list=AllowList.get_or_ingest(path), address=address
+    ).exists()
+
+
+class AllowListEntry(models.Model):
+    allow_list = models.ForeignKey(
+        AllowList, on_delete=models.CASCADE, related_name="entries"
+    )
+    address = models.CharField(max_length=255)
+
+    class Meta:
+        unique_together = ("allow_list", "address")
+
+    def __str__(self):
+        return f"{self.allow_list} - {self.address}"
+
 
 class AbstractGlobalSettings(models.Model):
     class Meta:
@@ -1,38 +1,257 @@
+import random
+import threading
+import time
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlsplit
+
 import requests
+from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
 
 
 class RequestException(requests.HTTPError):
     pass
 
 
+class CircuitOpenException(RequestException):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures of a host, requests then
+    fail fast for reset_timeout seconds, after which a single trial request
+    decides whether the circuit closes again
+    """
+
+    def __init__(self, failure_threshold, reset_timeout) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if (
+                self.trial_running
+                or time.monotonic() - self.opened_at < self.reset_timeout
+            ):
+                return False
+            self.trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.trial_running or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.trial_running = False
+
+    def release_trial(self):
+        """let another trial through, the outcome of the running one is unknown"""
+        with self._lock:
+            self.trial_running = False
+
+
+class HostMetrics:
+    """
+    Request count, error count and total latency per host, kept in the cache so
+    they add up over all workers
+    """
+
+    HOSTS_KEY = "http-client-hosts"
+    FIELDS = ("requests", "errors", "latency-ms")
+
+    _known_hosts = set()
+
+    @staticmethod
+    def get_key(host, field) -> str:
+        return f"http-client-{host}-{field}"
+
+    @classmethod
+    def record(cls, host, latency, is_error):
+        if host not in cls._known_hosts:
+            hosts = cache.get(cls.HOSTS_KEY) or []
+            if host not in hosts:
+                cache.set(cls.HOSTS_KEY, sorted({*hosts, host}), None)
+            cls._known_hosts.add(host)
+        counts = (1, int(is_error), int(latency * 1000))
+        for field, count in zip(cls.FIELDS, counts):
+            if not count:
+                continue
+            key = cls.get_key(host, field)
+            try:
+                cache.incr(key, count)
+            except ValueError:
+                cache.add(key, count, None)
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        hosts = cache.get(cls.HOSTS_KEY) or []
+        values = cache.get_many(
+            [cls.get_key(host, field) for host in hosts for field in cls.FIELDS]
+        )
+        stats = {}
+        for host in hosts:
+            count, errors, latency = (
+                values.get(cls.get_key(host, field), 0) for field in cls.FIELDS
+            )
+            stats[host] = {
+                "requests": count,
+                "errors": errors,
+                "error_rate": errors / count if count else None,
+                "avg_latency_ms": latency / count if count else None,
+            }
+        return stats
+
+
 class RequestHelper:
+    """
+    Client of a third party api, or of any url when there is no base_url.
+
+    Requests share one keep-alive session per host and always have a timeout.
+    Request errors such as connection errors and timeouts, 429 and 5xx responses
+    are retried with jittered backoff, posts only with retry_post since they may
+    not be idempotent. Every host has a circuit breaker, while it is open
+    requests fail fast with CircuitOpenException. Latency and errors are recorded
+    in HostMetrics.
+    """
+
+    RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
     _sessions = {}
+    _breakers = {}
+    _lock = threading.Lock()
 
-    def __init__(self, base_url: None | str = None):
+    def __init__(self, base_url: None | str = None, *, retry_post: bool = False):
         self.base_url = base_url
+        self.retry_post = retry_post
 
     def _get_url(self, path: None | str) -> str:
         if not path:
             return self.base_url
         return f"{self.base_url}/{path}" if self.base_url else path
 
+    @staticmethod
+    def build_session() -> requests.Session:
+        session = requests.Session()
+        # the session is shared by all users, so it keeps no cookies
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=settings.HTTP_CLIENT_POOL_MAXSIZE
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    @classmethod
+    def get_session(cls, origin) -> requests.Session:
+        session = cls._sessions.get(origin)
+        if session is None:
+            with cls._lock:
+                session = cls._sessions.setdefault(origin, cls.build_session())
+        return session
+
+    @classmethod
+    def get_breaker(cls, host) -> CircuitBreaker:
+        breaker = cls._breakers.get(host)
+        if breaker is None:
+            with cls._lock:
+                breaker = cls._breakers.setdefault(
+                    host,
+                    CircuitBreaker(
+                        settings.HTTP_CIRCUIT_FAILURE_THRESHOLD,
+                        settings.HTTP_CIRCUIT_RESET_TIMEOUT,
+                    ),
+                )
+        return breaker
+
+    def request(
+        self,
+        method: str,
+        path: None | str = None,
+        *,
+        timeout: None | int = None,
+        retries: None | int = None,
+        **kwargs,
+    ) -> requests.Response:
+        """
+        Send the request, the last response is returned once the retries are
+        used up, even if it is an error response
+        """
+        url = self._get_url(path)
+        split_url = urlsplit(url)
+        host = split_url.netloc
+        session = self.get_session(f"{split_url.scheme}://{host}")
+        breaker = self.get_breaker(host)
+        if retries is None:
+            is_retriable = method.upper() == "GET" or self.retry_post
+            retries = settings.HTTP_CLIENT_RETRIES if is_retriable else 0
+
+        for attempt in range(retries + 1):
+            if not breaker.allow():
+                raise CircuitOpenException(f"Circuit of {host} is open")
+            started_at = time.monotonic()
+            error = response = None
+            try:
+                response = session.request(
+                    method,
+                    url,
+                    timeout=timeout or settings.HTTP_CLIENT_TIMEOUT,
+                    **kwargs,
+                )
+            except requests.RequestException as e:
+                error = e
+            except BaseException:
+                breaker.release_trial()
+                raise
+            is_failure = (
+                response is None or response.status_code in self.RETRY_STATUS_CODES
+            )
+            HostMetrics.record(host, time.monotonic() - started_at, is_failure)
+            if not is_failure:
+                breaker.record_success()
+                return response
+            breaker.record_failure()
+            if attempt < retries:
+                backoff = settings.HTTP_CLIENT_BACKOFF_MS / 1000 * 2**attempt
+                time.sleep(random.uniform(0, backoff))
+
+        if response is None:
+            raise RequestException(error)
+        return response
+
     def get(
         self,
         path: str,
         *,
         params: None | tuple | dict = None,
         headers: None | dict = None,
-        timeout: None | int = 5,
-        session: None | requests.Session = None,
+        timeout: None | int = None,
     ) -> dict:
         try:
-            url = self._get_url(path)
-            request = session or requests
-            res = request.get(url=url, params=params, headers=headers, timeout=timeout)
+            res = self.request(
+                "GET", path, params=params, headers=headers, timeout=timeout
+            )
             res.raise_for_status()
             return res.json()
         except requests.RequestException as e:
-            raise RequestException(e)
+            raise RequestException(e, response=e.response)
 
     def post(
         self,
@@ -40,16 +259,14 @@ class RequestHelper:
         *,
         params: None | tuple = None,
         headers: None | dict = None,
-        timeout: None | int = 5,
+        timeout: None | int = None,
         data: None | dict = None,
         json: None | dict = None,
-        session: None | requests.Session = None,
     ) -> dict:
         try:
-            url = self._get_url(path)
-            request = session or requests
-            res = request.post(
-                url=url,
+            res = self.request(
+                "POST",
+                path,
                 params=params,
                 headers=headers,
                 data=data,
@@ -59,8 +276,4 @@ class RequestHelper:
             res.raise_for_status()
             return res.json()
         except requests.RequestException as e:
-            raise RequestException(e)
-
-    def get_session(self):
-        session = requests.Session()
-        return session
+            raise RequestException(e, response=e.response)
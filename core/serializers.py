@@ -6,7 +6,7 @@ from rest_framework import serializers
 
 from core.constraints import ConstraintVerification, get_constraint
 
-from .models import Chain, Sponsor, UserConstraint
+from .models import AllowList, Chain, Sponsor, UserConstraint
 from .utils import UploadFileStorage
 
 
@@ -136,6 +136,7 @@ class ConstraintProviderSerializer(serializers.Serializer):
                 for file in constraint_files:
                     if constraint["CSV_FILE"] == file.name:
                         path = file_storage.save(file)
+                        self.ingest_allow_list(path, file)
                         constraint["CSV_FILE"] = path
                         file_exist = True
                         break
@@ -150,6 +151,17 @@ class ConstraintProviderSerializer(serializers.Serializer):
             validated_data["constraint_params"] = json.dumps(constraint_params)
         return validated_data
 
+    @staticmethod
+    def ingest_allow_list(path, file):
+        file.seek(0)
+        try:
+            lines = file.read().decode("utf-8-sig").splitlines()
+        except UnicodeDecodeError:
+            raise serializers.ValidationError(
+                {"constraint_files": f"File {file.name} is not utf-8 encoded"}
+            )
+        AllowList.ingest(path, lines)
+
 
 class SponsorSerializer(serializers.ModelSerializer):
     class Meta:
@@ -0,0 +1,40 @@
+import logging
+
+from celery import shared_task
+
+from core.models import TokenTransferIndex, UnitapPassContract
+from core.utils import memcache_lock
+
+
+@shared_task(bind=True)
+def sync_unitap_passes(self):
+    id_ = f"{self.name}-LOCK"
+    with memcache_lock(id_, self.app.oid, lock_expire=600) as acquired:
+        if not acquired:
+            logging.info("Could not acquire process lock")
+            return
+        for contract in UnitapPassContract.objects.filter(
+            is_active=True
+        ).select_related("chain"):
+            try:
+                updated = contract.sync()
+                logging.info(f"Synced {updated} unitap passes of {contract}")
+            except Exception as e:
+                logging.exception(f"Could not sync unitap passes of {contract}: {e}")
+
+
+@shared_task(bind=True)
+def sync_token_transfers(self):
+    id_ = f"{self.name}-LOCK"
+    with memcache_lock(id_, self.app.oid, lock_expire=600) as acquired:
+        if not acquired:
+            logging.info("Could not acquire process lock")
+            return
+        for index in TokenTransferIndex.objects.filter(is_active=True).select_related(
+            "chain"
+        ):
+            try:
+                ingested = index.sync()
+                logging.info(f"Ingested {ingested} token transfers of {index}")
+            except Exception as e:
+                logging.exception(f"Could not sync token transfers of {index}: {e}")
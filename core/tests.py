@@ -1,7 +1,17 @@
-from unittest.mock import PropertyMock, patch
+import datetime
+import tempfile
+import time
+from unittest.mock import Mock, PropertyMock, patch
 
+import requests
+import tweepy
 from django.contrib.auth.models import User
-from rest_framework.test import APITestCase
+from django.core.cache import cache
+from django.test import override_settings
+from django.utils import timezone
+from eth_abi import encode
+from rest_framework.test import APITestCase, APITransactionTestCase
+from web3 import Web3
 
 from authentication.models import (
     GitcoinPassportConnection,
@@ -9,10 +19,45 @@ from authentication.models import (
     UserProfile,
     Wallet,
 )
-from core.models import Chain, NetworkTypes, WalletAccount
-from core.thirdpartyapp.twitter import TwitterUtils
+from core.constants import ERC20_METHODS
+from core.constraints import (
+    ConstraintVerification,
+    HasVerifiedCloudflareCaptcha,
+    HasVerifiedHCaptcha,
+)
+from core.constraints.evaluator import ConstraintEvaluator
+from core.models import (
+    AccountNonce,
+    AllowList,
+    Chain,
+    NetworkTypes,
+    ResolvedIdentity,
+    TokenTransfer,
+    TokenTransferIndex,
+    UnitapPass,
+    UnitapPassContract,
+    WalletAccount,
+    _allow_list_contains,
+)
+from core.request_helper import (
+    CircuitOpenException,
+    HostMetrics,
+    RequestException,
+    RequestHelper,
+)
+from core.thirdpartyapp import FarcasterUtil, Subgraph
+from core.thirdpartyapp.twitter import TwitterUtils, TwitterUtilsError
+from core.utils import (
+    ConfirmationTracker,
+    MulticallClient,
+    Web3ProviderRegistry,
+    Web3Utils,
+)
+from prizetap.constraints import HaveUnitapPass
+from prizetap.tasks import update_prizetap_winning_chance_number
 
 from .constraints import (
+    AllowListVerification,
     Attest,
     BeAttestedBy,
     BrightIDAuraVerification,
@@ -24,6 +69,7 @@ from .constraints import (
     HasMinimumTweetCount,
     HasMinimumTwitterFollowerCount,
     HasNFTVerification,
+    HasTokenTransferVerification,
     HasTokenVerification,
     HasTwitter,
     HasVoteOnATweet,
@@ -106,8 +152,8 @@ class TestNFTConstraint(BaseTestCase):
         )
 
     @patch(
-        "core.utils.NFTClient.get_number_of_tokens",
-        lambda a, b: 1,
+        "core.utils.NFTClient.get_numbers_of_tokens",
+        lambda a, b: [1] * len(b),
     )
     def test_nft_constraint_true(self):
         constraint = HasNFTVerification(self.user_profile)
@@ -121,8 +167,8 @@ class TestNFTConstraint(BaseTestCase):
         self.assertEqual(constraint.is_observed(), True)
 
     @patch(
-        "core.utils.NFTClient.get_number_of_tokens",
-        lambda a, b: 0,
+        "core.utils.NFTClient.get_numbers_of_tokens",
+        lambda a, b: [0] * len(b),
     )
     def test_nft_constraint_false(self):
         constraint = HasNFTVerification(self.user_profile)
@@ -167,8 +213,8 @@ class TestNonNativeTokenConstraint(BaseTestCase):
         )
 
     @patch(
-        "core.utils.TokenClient.get_non_native_token_balance",
-        lambda a, b: 1000000,
+        "core.utils.TokenClient.get_non_native_token_balances",
+        lambda a, b: [1000000] * len(b),
     )
     def test_non_native_token_constraint_true(self):
         constraint = HasTokenVerification(self.user_profile)
@@ -182,8 +228,8 @@ class TestNonNativeTokenConstraint(BaseTestCase):
         self.assertEqual(constraint.is_observed(), True)
 
     @patch(
-        "core.utils.TokenClient.get_non_native_token_balance",
-        lambda a, b: 100000,
+        "core.utils.TokenClient.get_non_native_token_balances",
+        lambda a, b: [100000] * len(b),
     )
     def test_non_native_token_constraint_false(self):
         constraint = HasTokenVerification(self.user_profile)
@@ -197,8 +243,8 @@ class TestNonNativeTokenConstraint(BaseTestCase):
         self.assertEqual(constraint.is_observed(), False)
 
     @patch(
-        "core.utils.TokenClient.get_native_token_balance",
-        lambda a, b: 2 * 10**18,
+        "core.utils.TokenClient.get_native_token_balances",
+        lambda a, b: [2 * 10**18] * len(b),
     )
     def test_native_token_constraint_true(self):
         constraint = HasTokenVerification(self.user_profile)
@@ -212,8 +258,8 @@ class TestNonNativeTokenConstraint(BaseTestCase):
         self.assertEqual(constraint.is_observed(), True)
 
     @patch(
-        "core.utils.TokenClient.get_native_token_balance",
-        lambda a, b: 2 * 10**18,
+        "core.utils.TokenClient.get_native_token_balances",
+        lambda a, b: [2 * 10**18] * len(b),
     )
     def test_native_token_constraint_false(self):
         constraint = HasTokenVerification(self.user_profile)
@@ -412,8 +458,8 @@ class TestTwitterConstraint(BaseTestCase):
         )
 
     @patch(
-        "authentication.thirdpartydrivers.twitter.TwitterDriver.get_tweet_count",
-        lambda a, b, c: 100,
+        "authentication.thirdpartydrivers.twitter.TwitterDriver.get_profile",
+        lambda a, b, c: {"tweet_count": 100},
     )
     def test_twitter_minimum_tweet_constraint_success(self):
         constraint = HasMinimumTweetCount(self.user_profile)
@@ -434,8 +480,8 @@ class TestTwitterConstraint(BaseTestCase):
         self.assertEqual(constraint.is_observed(), False)
 
     @patch(
-        "authentication.thirdpartydrivers.twitter.TwitterDriver.get_tweet_count",
-        lambda a, b, c: 5,
+        "authentication.thirdpartydrivers.twitter.TwitterDriver.get_profile",
+        lambda a, b, c: {"tweet_count": 5},
     )
     def test_twitter_minimum_tweet_constraint_fail_due_to_high_minimum(self):
         constraint = HasMinimumTweetCount(self.not_connected_user_profile)
@@ -457,8 +503,8 @@ class TestTwitterConstraint(BaseTestCase):
         self.assertEqual(constraint.is_observed(), False)
 
     @patch(
-        "authentication.thirdpartydrivers.twitter.TwitterDriver.get_follower_count",
-        lambda a, b, c: 100,
+        "authentication.thirdpartydrivers.twitter.TwitterDriver.get_profile",
+        lambda a, b, c: {"follower_count": 100},
     )
     def test_twitter_minimum_follower_constraint_success(self):
         constraint = HasMinimumTwitterFollowerCount(self.user_profile)
@@ -479,8 +525,8 @@ class TestTwitterConstraint(BaseTestCase):
         self.assertEqual(constraint.is_observed(), False)
 
     @patch(
-        "authentication.thirdpartydrivers.twitter.TwitterDriver.get_follower_count",
-        lambda a, b, c: 5,
+        "authentication.thirdpartydrivers.twitter.TwitterDriver.get_profile",
+        lambda a, b, c: {"follower_count": 5},
     )
     def test_twitter_minimum_follower_constraint_fail_due_to_high_minimum(self):
         constraint = HasMinimumTwitterFollowerCount(self.not_connected_user_profile)
@@ -493,7 +539,7 @@ class TestTwitterConstraint(BaseTestCase):
 
     @patch(
         "authentication.thirdpartydrivers.twitter.TwitterDriver.get_is_replied",
-        lambda a, b, c, d, e: True,
+        lambda a, b, c, d, e, user_id: True,
     )
     def test_twitter_replied_to_tweet_constraint_success(self):
         constraint = HasCommentOnATweet(self.user_profile)
@@ -515,7 +561,7 @@ class TestTwitterConstraint(BaseTestCase):
 
     @patch(
         "authentication.thirdpartydrivers.twitter.TwitterDriver.get_is_liked",
-        lambda a, b, c, d: True,
+        lambda a, b, c, d, user_id: True,
     )
     def test_twitter_liked_tweet_constraint_success(self):
         constraint = HasVoteOnATweet(self.user_profile)
@@ -536,6 +582,148 @@ class TestTwitterConstraint(BaseTestCase):
         self.assertEqual(constraint.is_observed(), False)
 
 
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class TestTwitterConnectionCache(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        for attr in ("consumer_key", "consumer_secret"):
+            patcher = patch.object(TwitterUtils, attr, attr)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.twitter = TwitterConnection.objects.create(
+            user_profile=self.user_profile,
+            oauth_token="oauth-1",
+            oauth_token_secret="oauth-secret-1",
+            access_token="access-1",
+            access_token_secret="access-secret-1",
+            twitter_id="1",
+        )
+        self.other_twitter = TwitterConnection.objects.create(
+            user_profile=UserProfile.objects.create(
+                user=User.objects.create_user(username="other", password="1234"),
+                initial_context_id="other",
+                username="other",
+            ),
+            oauth_token="oauth-2",
+            oauth_token_secret="oauth-secret-2",
+            access_token="access-2",
+            access_token_secret="access-secret-2",
+            twitter_id="2",
+        )
+        self.profile = {
+            "id": "1",
+            "username": "unitap",
+            "follower_count": 10,
+            "tweet_count": 20,
+        }
+
+    def test_profile_is_fetched_once(self):
+        with patch(
+            "authentication.thirdpartydrivers.twitter.TwitterDriver.get_profile",
+            return_value=self.profile,
+        ) as get_profile:
+            self.assertEqual(self.twitter.username, "unitap")
+            self.assertEqual(self.twitter.follower_count, 10)
+            self.assertEqual(
+                TwitterConnection.objects.get(pk=self.twitter.pk).tweet_count, 20
+            )
+            self.assertEqual(get_profile.call_count, 1)
+
+            self.twitter.get_profile(refresh=True)
+            self.assertEqual(get_profile.call_count, 2)
+
+            self.twitter.access_token = "access-3"
+            self.twitter.username
+            self.assertEqual(get_profile.call_count, 3)
+
+    def test_liking_users_are_shared_by_connections(self):
+        response = tweepy.Response(
+            data=[tweepy.User({"id": "2", "name": "", "username": "other"})],
+            includes={},
+            errors=[],
+            meta={},
+        )
+        with patch.object(
+            tweepy.Client, "get_liking_users", return_value=response
+        ) as get_liking_users:
+            self.assertFalse(self.twitter.is_liked("100"))
+            self.assertTrue(self.other_twitter.is_liked("100"))
+            self.assertEqual(get_liking_users.call_count, 1)
+
+    def test_missing_liker_is_looked_for_on_the_latest_page(self):
+        pages = [
+            tweepy.Response(
+                data=[tweepy.User({"id": str(user_id), "name": "", "username": ""})]
+                + [tweepy.User({"id": "3", "name": "", "username": "third"})],
+                includes={},
+                errors=[],
+                meta={},
+            )
+            for user_id in (2, 1)
+        ]
+        with patch.object(
+            tweepy.Client, "get_liking_users", side_effect=pages
+        ) as get_liking_users:
+            self.assertTrue(self.other_twitter.is_liked("100"))
+            # liked after the likers were cached
+            self.assertTrue(self.twitter.is_liked("100"))
+            self.assertTrue(self.twitter.is_liked("100"))
+            self.assertEqual(get_liking_users.call_count, 2)
+
+    def test_rate_limited_token_waits_for_reset(self):
+        response = Mock(
+            status_code=429,
+            reason="Too Many Requests",
+            headers={"x-rate-limit-reset": str(int(time.time()) + 60)},
+        )
+        response.json.return_value = {}
+        with patch.object(
+            tweepy.Client,
+            "get_liking_users",
+            side_effect=tweepy.TooManyRequests(response),
+        ) as get_liking_users:
+            for _attempt in range(2):
+                with self.assertRaises(TwitterUtilsError):
+                    self.twitter.is_liked("100")
+            self.assertEqual(get_liking_users.call_count, 1)
+
+            # other tokens have their own budget
+            with self.assertRaises(TwitterUtilsError):
+                self.other_twitter.is_liked("100")
+            self.assertEqual(get_liking_users.call_count, 2)
+
+    def test_retweeters_are_paginated(self):
+        pages = [
+            tweepy.Response(
+                data=[tweepy.User({"id": "3", "name": "", "username": "third"})],
+                includes={},
+                errors=[],
+                meta={"next_token": "next"},
+            ),
+            tweepy.Response(
+                data=[tweepy.User({"id": "1", "name": "", "username": "unitap"})],
+                includes={},
+                errors=[],
+                meta={},
+            ),
+        ]
+        with patch.object(
+            tweepy.Client, "get_retweeters", side_effect=pages + pages[:1]
+        ) as get_retweeters:
+            self.assertTrue(self.twitter.is_retweeted("100"))
+            self.assertEqual(get_retweeters.call_count, 2)
+            self.assertEqual(
+                get_retweeters.call_args.kwargs["pagination_token"], "next"
+            )
+            # a missing user is only looked for again on the first page
+            self.assertFalse(self.other_twitter.is_retweeted("100"))
+            self.assertEqual(get_retweeters.call_count, 3)
+            self.assertIsNone(get_retweeters.call_args.kwargs["pagination_token"])
+
+
 class TestGLMStakingConstraint(BaseTestCase):
     def setUp(self):
         super().setUp()
@@ -568,3 +756,899 @@ class TestGLMStakingConstraint(BaseTestCase):
         }
 
         self.assertEqual(constraint.is_observed(), True)
+
+
+class TestWeb3ProviderRegistry(APITestCase):
+    rpc_url = "http://127.0.0.1:7545"
+    abi = [
+        {
+            "inputs": [],
+            "name": "totalSupply",
+            "outputs": [{"name": "", "type": "uint256"}],
+            "stateMutability": "view",
+            "type": "function",
+        }
+    ]
+    address = "0x23826Fd930916718a98A21FF170088FBb4C30803"
+
+    def tearDown(self):
+        Web3ProviderRegistry.clear()
+
+    def test_provider_is_shared_between_utils(self):
+        w3 = Web3ProviderRegistry.get_w3(self.rpc_url)
+        self.assertIs(Web3ProviderRegistry.get_w3(self.rpc_url), w3)
+        self.assertIsNot(Web3ProviderRegistry.get_w3(self.rpc_url, poa=True), w3)
+
+    def test_contract_is_cached(self):
+        first = Web3Utils(self.rpc_url)
+        first.set_contract(self.address, self.abi)
+        second = Web3Utils(self.rpc_url)
+        second.set_contract(self.address, self.abi)
+        self.assertIs(first.contract, second.contract)
+
+    @patch("web3.Web3.is_connected", return_value=True)
+    def test_health_check_is_lazy(self, is_connected_mock):
+        web3_utils = Web3Utils(self.rpc_url)
+        web3_utils.w3
+        web3_utils.w3
+        Web3Utils(self.rpc_url).w3
+        self.assertEqual(is_connected_mock.call_count, 1)
+
+    @patch("web3.Web3.is_connected", return_value=False)
+    def test_unhealthy_provider_is_evicted(self, is_connected_mock):
+        w3 = Web3ProviderRegistry.get_w3(self.rpc_url)
+        with self.assertRaises(Exception):
+            Web3Utils(self.rpc_url).w3
+        self.assertIsNot(Web3ProviderRegistry.get_w3(self.rpc_url), w3)
+
+
+class TestAccountNonce(APITestCase):
+    def setUp(self):
+        self.wallet = WalletAccount.objects.create(
+            name="Test Wallet", private_key=test_wallet_key
+        )
+        self.chain = Chain.objects.create(
+            chain_name="Ethereum",
+            native_currency_name="ethereum",
+            symbol="ETH",
+            rpc_url_private="http://127.0.0.1:7545",
+            wallet=self.wallet,
+            chain_id=1337,
+        )
+        self.address = "0x90F8bf6A479f320ead074411a4B0e7944Ea8c9C1"
+
+    def test_allocate_increments_locally(self):
+        self.assertEqual(AccountNonce.allocate(self.chain, self.address, 5), 5)
+        self.assertEqual(AccountNonce.allocate(self.chain, self.address, 5), 6)
+        self.assertEqual(AccountNonce.allocate(self.chain, self.address, 5), 7)
+
+    def test_allocate_follows_network_nonce(self):
+        AccountNonce.allocate(self.chain, self.address, 1)
+        self.assertEqual(AccountNonce.allocate(self.chain, self.address, 10), 10)
+
+    def test_reset(self):
+        AccountNonce.allocate(self.chain, self.address, 10)
+        self.assertTrue(AccountNonce.reset(self.chain, self.address, 3))
+        self.assertEqual(AccountNonce.allocate(self.chain, self.address, 0), 3)
+
+    def test_reset_waits_for_idle_counter(self):
+        AccountNonce.allocate(self.chain, self.address, 10)
+        self.assertFalse(AccountNonce.reset(self.chain, self.address, 3, idle_for=60))
+        self.assertFalse(AccountNonce.reset(self.chain, self.address, 11))
+        self.assertEqual(AccountNonce.allocate(self.chain, self.address, 0), 11)
+
+
+class TestConfirmationTracker(APITestCase):
+    rpc_url = "http://127.0.0.1:7545"
+
+    @patch("core.utils.Web3Utils.batch_request")
+    def test_only_deep_enough_receipts_are_returned(self, batch_request):
+        batch_request.return_value = [
+            "0x10",
+            {"status": "0x1", "blockNumber": "0xe"},
+            {"status": "0x0", "blockNumber": "0x10"},
+            None,
+        ]
+        tracker = ConfirmationTracker(self.rpc_url, confirmations=2)
+
+        receipts = tracker.get_receipts(["0x1", "0x2", "0x3", "0x1"])
+
+        batch_request.assert_called_once_with(
+            [
+                ("eth_blockNumber", []),
+                ("eth_getTransactionReceipt", ["0x1"]),
+                ("eth_getTransactionReceipt", ["0x2"]),
+                ("eth_getTransactionReceipt", ["0x3"]),
+            ]
+        )
+        self.assertEqual(list(receipts), ["0x1"])
+        self.assertEqual(receipts["0x1"]["status"], 1)
+
+    @patch("core.utils.Web3Utils.get_transaction_receipt")
+    @patch("core.utils.Web3Utils.get_current_block", return_value=16)
+    @patch("core.utils.Web3Utils.batch_request", side_effect=ValueError)
+    def test_falls_back_to_single_lookups(self, *mocks):
+        get_transaction_receipt = mocks[-1]
+        get_transaction_receipt.return_value = {"status": 1, "blockNumber": 16}
+
+        receipts = ConfirmationTracker(self.rpc_url).get_receipts(["0x1"])
+
+        self.assertEqual(receipts["0x1"]["status"], 1)
+
+
+class TestUnitapPassIndex(BaseTestCase):
+    holder = "0x90F8bf6A479f320ead074411a4B0e7944Ea8c9C1"
+    other = "0xFFcf8FDEE72ac11b5c542428B35EEF5769C409f0"
+
+    def setUp(self):
+        super().setUp()
+        chain = Chain.objects.create(
+            chain_name="Base",
+            native_currency_name="ethereum",
+            symbol="ETH",
+            rpc_url_private="http://127.0.0.1:7545",
+            wallet=WalletAccount.objects.create(
+                name="Test Wallet", private_key=test_wallet_key
+            ),
+            chain_id=8453,
+        )
+        self.contract = UnitapPassContract.objects.create(
+            chain=chain,
+            address="0x23826Fd930916718a98A21FF170088FBb4C30803",
+            last_indexed_block=99,
+        )
+        create_new_wallet(self.user_profile, self.holder, NetworkTypes.EVM)
+
+    @staticmethod
+    def transfer_log(block_number, sender, receiver, token_id):
+        return {
+            "blockNumber": block_number,
+            "logIndex": 0,
+            "topics": [
+                bytes.fromhex(UnitapPassContract.TRANSFER_TOPIC[2:]),
+                bytes(12) + bytes.fromhex(sender[2:]),
+                bytes(12) + bytes.fromhex(receiver[2:]),
+                token_id.to_bytes(32, "big"),
+            ],
+        }
+
+    @patch("core.models.Web3ProviderRegistry.get_healthy_w3")
+    def test_sync_follows_transfers_from_cursor(self, get_healthy_w3):
+        w3 = get_healthy_w3.return_value
+        w3.eth.block_number = 2105
+        w3.eth.get_logs.side_effect = [
+            [
+                self.transfer_log(150, UnitapPass.ZERO_ADDRESS, self.holder, 1),
+                self.transfer_log(151, UnitapPass.ZERO_ADDRESS, self.holder, 2),
+            ],
+            [self.transfer_log(2050, self.holder, self.other, 2)],
+        ]
+
+        self.assertEqual(self.contract.sync(), 3)
+
+        self.assertEqual(
+            [call.args[0]["fromBlock"] for call in w3.eth.get_logs.call_args_list],
+            [100, 2100],
+        )
+        self.contract.refresh_from_db()
+        self.assertEqual(self.contract.last_indexed_block, 2100)
+        self.assertEqual(
+            list(UnitapPass.owned_by([self.holder]).values_list("token_id", flat=True)),
+            [1],
+        )
+        self.assertEqual(UnitapPass.objects.get(token_id=2).owner, self.other.lower())
+
+    def test_unitap_pass_checks_read_the_index(self):
+        UnitapPassContract.objects.update(synced_at=timezone.now())
+        UnitapPass.objects.create(
+            contract=self.contract,
+            token_id=5,
+            owner=self.holder.lower(),
+            updated_block=100,
+        )
+        constraint = HaveUnitapPass(self.user_profile)
+        constraint.param_values = {"MINIMUM": 1}
+        self.assertTrue(constraint.is_observed())
+        constraint.param_values = {"MINIMUM": 2}
+        self.assertFalse(constraint.is_observed())
+
+    @patch(
+        "core.thirdpartyapp.Subgraph.iter_unitap_passes",
+        return_value=[
+            {"tokenId": "8", "owner": holder.lower()},
+            {"tokenId": "7", "owner": holder.lower()},
+        ],
+    )
+    def test_ethereum_pass_checks_read_the_subgraph(self, _):
+        UnitapPassContract.objects.update(synced_at=timezone.now())
+        UnitapPass.objects.create(
+            contract=self.contract,
+            token_id=5,
+            owner=self.holder.lower(),
+            updated_block=100,
+        )
+
+        self.assertEqual(self.user_profile.has_unitap_pass(), (True, [7, 8]))
+        update_prizetap_winning_chance_number()
+        self.user_profile.refresh_from_db()
+        self.assertEqual(self.user_profile.prizetap_winning_chance_number, 2)
+
+    @patch("core.models.NFTClient")
+    @patch(
+        "core.thirdpartyapp.Subgraph.iter_unitap_passes",
+        return_value=[{"tokenId": "7", "owner": holder.lower()}],
+    )
+    def test_unitap_pass_checks_wait_for_the_index(self, _, nft_client):
+        nft_client.return_value.to_checksum_address.side_effect = (
+            Web3.to_checksum_address
+        )
+        get_numbers_of_tokens = nft_client.return_value.get_numbers_of_tokens
+        get_numbers_of_tokens.return_value = [2]
+        UnitapPass.objects.create(
+            contract=self.contract,
+            token_id=5,
+            owner=self.holder.lower(),
+            updated_block=100,
+        )
+
+        self.assertEqual(self.user_profile.has_unitap_pass(), (True, [7]))
+        constraint = HaveUnitapPass(self.user_profile)
+        constraint.param_values = {"MINIMUM": 2}
+        self.assertTrue(constraint.is_observed())
+        get_numbers_of_tokens.assert_called_once_with([self.holder])
+
+
+class TestTokenTransferIndex(BaseTestCase):
+    token = "0x8A791620dd6260079BF849Dc5567aDC3F2FdC318"
+    holder = "0x90F8bf6A479f320ead074411a4B0e7944Ea8c9C1"
+    other = "0xFFcf8FDEE72ac11b5c542428B35EEF5769C409f0"
+
+    def setUp(self):
+        super().setUp()
+        self.chain = Chain.objects.create(
+            chain_name="Base",
+            native_currency_name="ethereum",
+            symbol="ETH",
+            rpc_url_private="http://127.0.0.1:7545",
+            wallet=WalletAccount.objects.create(
+                name="Test Wallet", private_key=test_wallet_key
+            ),
+            chain_id=8453,
+        )
+        self.index = TokenTransferIndex.register(self.chain, self.token)
+        create_new_wallet(self.user_profile, self.holder, NetworkTypes.EVM)
+
+    @staticmethod
+    def transfer_log(block_number, log_index, sender, receiver, value):
+        return {
+            "blockNumber": block_number,
+            "logIndex": log_index,
+            "transactionHash": bytes([block_number % 256, log_index]) * 16,
+            "topics": [
+                bytes.fromhex(TokenTransferIndex.TRANSFER_TOPIC[2:]),
+                bytes(12) + bytes.fromhex(sender[2:]),
+                bytes(12) + bytes.fromhex(receiver[2:]),
+            ],
+            "data": value.to_bytes(32, "big"),
+        }
+
+    @staticmethod
+    def blocks_response(calls):
+        return [
+            {"timestamp": hex(1_700_000_000 + int(params[0], 16))}
+            for _method, params in calls
+        ]
+
+    @patch("core.models.Web3ProviderRegistry.get_healthy_w3")
+    def test_sync_halves_ranges_with_too_many_logs(self, get_healthy_w3):
+        w3 = get_healthy_w3.return_value
+        w3.eth.block_number = 1500
+        w3.eth.get_logs.side_effect = [
+            ValueError({"code": -32005, "message": "query returned more than 10000"}),
+            [],
+            [],
+            [],
+        ]
+        self.index.last_indexed_block = 999
+        self.index.save()
+
+        self.index.sync()
+
+        self.assertEqual(
+            [
+                (call.args[0]["fromBlock"], call.args[0]["toBlock"])
+                for call in w3.eth.get_logs.call_args_list
+            ],
+            [(936, 1500), (936, 1217), (1218, 1499), (1500, 1500)],
+        )
+        self.index.refresh_from_db()
+        self.assertEqual(self.index.last_indexed_block, 1500)
+
+    @patch("core.models.Web3ProviderRegistry.get_healthy_w3")
+    def test_sync_falls_back_to_start_block(self, get_healthy_w3):
+        w3 = get_healthy_w3.return_value
+        w3.eth.block_number = 1500
+        w3.eth.get_code.side_effect = ValueError(
+            {"code": -32000, "message": "missing trie node"}
+        )
+        w3.eth.get_logs.return_value = []
+
+        with self.assertRaises(ValueError):
+            self.index.sync()
+
+        self.index.start_block = 1200
+        self.index.save()
+        self.index.sync()
+
+        self.assertEqual(w3.eth.get_logs.call_args.args[0]["fromBlock"], 1200)
+
+    @patch("core.models.Web3ProviderRegistry.get_healthy_w3")
+    def test_sync_starts_at_deployment_and_rewinds_reorg_depth(self, get_healthy_w3):
+        w3 = get_healthy_w3.return_value
+        w3.eth.block_number = 1500
+        w3.eth.get_code.side_effect = lambda address, block_identifier: (
+            b"\x01" if block_identifier >= 1000 else b""
+        )
+        w3.provider.make_batch_request.side_effect = self.blocks_response
+        w3.eth.get_logs.return_value = [
+            self.transfer_log(1200, 0, self.holder, self.other, 10),
+            self.transfer_log(1300, 1, self.holder, self.other, 5),
+            self.transfer_log(1490, 0, self.other, self.holder, 7),
+        ]
+
+        self.assertEqual(self.index.sync(), 3)
+
+        self.assertEqual(w3.eth.get_logs.call_args.args[0]["fromBlock"], 1000)
+        self.index.refresh_from_db()
+        self.assertEqual(self.index.last_indexed_block, 1500)
+        self.assertIsNotNone(self.index.synced_at)
+
+        # the block at 1490 was reorged away
+        w3.eth.block_number = 1510
+        w3.eth.get_logs.return_value = [
+            self.transfer_log(1505, 0, self.holder, self.other, 1)
+        ]
+        self.assertEqual(self.index.sync(), 1)
+
+        self.assertEqual(
+            w3.eth.get_logs.call_args.args[0]["fromBlock"],
+            1501 - TokenTransferIndex.REORG_DEPTH,
+        )
+        self.assertEqual(self.index.get_transferred_amount(senders=[self.holder]), 16)
+        self.assertEqual(self.index.get_transferred_amount(receivers=[self.holder]), 0)
+        self.assertEqual(
+            self.index.get_transferred_amount(senders=[self.holder], since_block=1300),
+            6,
+        )
+        self.assertEqual(
+            self.index.get_transferred_amount(
+                senders=[self.holder],
+                since=datetime.datetime.fromtimestamp(
+                    1_700_001_301, tz=datetime.timezone.utc
+                ),
+            ),
+            1,
+        )
+
+    @patch("core.utils.Web3.is_connected", lambda self: True)
+    @patch("core.utils.TokenClient.get_non_native_token_transfer_amount")
+    def test_transfer_constraint_sums_index_and_unindexed_blocks(
+        self, get_transfer_amount
+    ):
+        get_transfer_amount.return_value = 3
+        constraint = HasTokenTransferVerification(self.user_profile)
+        constraint.param_values = {
+            "CHAIN": self.chain.pk,
+            "ADDRESS": self.token,
+            "MINIMUM": 10,
+        }
+
+        # full scan until the index has caught up
+        self.assertFalse(constraint.is_observed())
+        self.assertEqual(get_transfer_amount.call_args.args, (self.holder,))
+
+        TokenTransfer.objects.create(
+            index=self.index,
+            block_number=90,
+            block_timestamp=timezone.now(),
+            log_index=0,
+            tx_hash="0x" + "ab" * 32,
+            sender=self.holder.lower(),
+            receiver=self.other.lower(),
+            value=8,
+        )
+        TokenTransferIndex.objects.filter(pk=self.index.pk).update(
+            last_indexed_block=100, synced_at=timezone.now()
+        )
+
+        self.assertTrue(constraint.is_observed())
+        self.assertEqual(get_transfer_amount.call_args.kwargs, {"from_block": 101})
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    HTTP_CLIENT_TIMEOUT=3,
+    HTTP_CLIENT_RETRIES=2,
+    HTTP_CLIENT_BACKOFF_MS=0,
+    HTTP_CIRCUIT_FAILURE_THRESHOLD=3,
+    HTTP_CIRCUIT_RESET_TIMEOUT=30,
+)
+class TestRequestHelper(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.session = Mock()
+        patchers = [
+            patch.object(RequestHelper, "get_session", return_value=self.session),
+            patch.dict(RequestHelper._breakers, clear=True),
+            patch.object(HostMetrics, "_known_hosts", set()),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.helper = RequestHelper("https://api.example.com")
+
+    @staticmethod
+    def response(status_code, body=None):
+        response = Mock(status_code=status_code)
+        response.json.return_value = body
+        response.raise_for_status.side_effect = (
+            requests.HTTPError(status_code) if status_code >= 400 else None
+        )
+        return response
+
+    def test_get_is_retried_with_a_timeout(self):
+        self.session.request.side_effect = [
+            requests.ConnectionError(),
+            self.response(503),
+            self.response(200, {"ok": True}),
+        ]
+
+        self.assertEqual(self.helper.get("path"), {"ok": True})
+
+        self.assertEqual(self.session.request.call_count, 3)
+        self.assertEqual(self.session.request.call_args.kwargs["timeout"], 3)
+        stats = HostMetrics.get_stats()["api.example.com"]
+        self.assertEqual(stats["requests"], 3)
+        self.assertEqual(stats["errors"], 2)
+
+    def test_post_is_only_retried_when_allowed(self):
+        self.session.request.return_value = self.response(502)
+
+        with self.assertRaises(RequestException):
+            self.helper.post("path", json={})
+        self.assertEqual(self.session.request.call_count, 1)
+
+        self.session.request.reset_mock()
+        self.session.request.side_effect = [self.response(502), self.response(200, {})]
+        RequestHelper("https://api.example.com", retry_post=True).post("path", json={})
+        self.assertEqual(self.session.request.call_count, 2)
+
+    def test_circuit_opens_after_consecutive_failures(self):
+        self.session.request.side_effect = requests.Timeout()
+
+        with self.assertRaises(RequestException):
+            self.helper.get("path")
+        with self.assertRaises(CircuitOpenException):
+            self.helper.request("GET", "path")
+        self.assertEqual(self.session.request.call_count, 3)
+
+        # one trial request is let through after the reset timeout
+        breaker = RequestHelper.get_breaker("api.example.com")
+        breaker.opened_at -= 30
+        self.session.request.side_effect = None
+        self.session.request.return_value = self.response(200, {})
+        self.assertEqual(self.helper.get("path"), {})
+        self.assertFalse(breaker.is_open)
+
+    def test_trial_request_errors_do_not_hold_the_circuit(self):
+        breaker = RequestHelper.get_breaker("api.example.com")
+        breaker.opened_at = time.monotonic() - 30
+
+        self.session.request.side_effect = requests.TooManyRedirects()
+        with self.assertRaises(RequestException):
+            self.helper.request("GET", "path", retries=0)
+        self.assertTrue(breaker.is_open)
+        self.assertFalse(breaker.trial_running)
+
+        breaker.opened_at -= 30
+        self.session.request.side_effect = KeyError("header")
+        with self.assertRaises(KeyError):
+            self.helper.request("GET", "path")
+        self.assertFalse(breaker.trial_running)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    IDENTITY_RESOLUTION_TTL=3600,
+    IDENTITY_RESOLUTION_NEGATIVE_TTL=60,
+)
+class TestResolvedIdentity(APITestCase):
+    holder = "0x90F8bf6A479f320ead074411a4B0e7944Ea8c9C1"
+    other = "0xFFcf8FDEE72ac11b5c542428B35EEF5769C409f0"
+
+    def setUp(self):
+        cache.clear()
+
+    def test_identities_are_resolved_once_with_negative_caching(self):
+        resolve = Mock(return_value={self.holder.lower(): 12})
+        provider = ResolvedIdentity.Provider.FARCASTER
+
+        for _attempt in range(2):
+            self.assertEqual(
+                ResolvedIdentity.resolve_many(
+                    provider, [self.holder, self.other], resolve
+                ),
+                {self.holder.lower(): "12", self.other.lower(): None},
+            )
+        resolve.assert_called_once_with([self.holder.lower(), self.other.lower()])
+
+        # the database tier answers once the cache is gone, until the ttl
+        cache.clear()
+        ResolvedIdentity.objects.filter(identity__isnull=True).update(
+            resolved_at=timezone.now() - datetime.timedelta(seconds=61)
+        )
+        resolve.return_value = {self.other.lower(): 13}
+        self.assertEqual(
+            ResolvedIdentity.resolve_many(provider, [self.holder, self.other], resolve),
+            {self.holder.lower(): "12", self.other.lower(): "13"},
+        )
+        self.assertEqual(resolve.call_args.args, ([self.other.lower()],))
+
+        ResolvedIdentity.forget(provider, self.holder)
+        self.assertFalse(
+            ResolvedIdentity.objects.filter(address=self.holder.lower()).exists()
+        )
+
+    def test_addresses_in_flight_are_waited_for(self):
+        provider = ResolvedIdentity.Provider.FARCASTER
+        resolve = Mock(return_value={self.holder.lower(): 12})
+        # another check is resolving the other address
+        self.assertTrue(ResolvedIdentity.claim_resolving(provider, self.other.lower()))
+
+        def other_check_finishes(_seconds):
+            ResolvedIdentity.cache_identities(provider, {self.other.lower(): "13"})
+
+        with patch("core.models.time.sleep", side_effect=other_check_finishes):
+            self.assertEqual(
+                ResolvedIdentity.resolve_many(
+                    provider, [self.holder, self.other], resolve
+                ),
+                {self.holder.lower(): "12", self.other.lower(): "13"},
+            )
+        resolve.assert_called_once_with([self.holder.lower()])
+        self.assertTrue(ResolvedIdentity.claim_resolving(provider, self.holder.lower()))
+
+    @patch("core.thirdpartyapp.farcaster.FarcasterUtil._get_users")
+    @patch("core.thirdpartyapp.farcaster.FarcasterUtil._get_bulk_profile")
+    def test_farcaster_checks_share_resolved_fids(self, get_bulk_profile, get_users):
+        get_bulk_profile.return_value = {self.holder.lower(): [{"fid": 12}]}
+        get_users.return_value = {
+            1: {"viewer_context": {"following": True}},
+            2: {"viewer_context": {"following": False}},
+        }
+
+        self.assertEqual(FarcasterUtil().get_address_fid(self.holder), 12)
+        self.assertEqual(
+            FarcasterUtil().is_following_batch([1, 2], self.holder), {1: True, 2: False}
+        )
+        self.assertEqual(FarcasterUtil().get_address_fid(self.other), None)
+
+        self.assertEqual(get_bulk_profile.call_count, 2)
+        self.assertEqual(get_users.call_args.args, (12, [1, 2, 12]))
+
+
+class TestSubgraphPaging(APITestCase):
+    @staticmethod
+    def nfts_response(*ids):
+        return {
+            "data": {
+                "nfts": [{"id": id_, "tokenId": id_, "owner": "0xabc"} for id_ in ids]
+            }
+        }
+
+    @patch("core.thirdpartyapp.Subgraph.send_post_request")
+    def test_pages_follow_the_id_cursor(self, send_post_request):
+        send_post_request.side_effect = [
+            self.nfts_response("1", "2"),
+            self.nfts_response("3"),
+        ]
+
+        pages = list(
+            Subgraph().paginate(
+                "path", "nfts", ["tokenId"], filter_type="NFT_filter", first=2
+            )
+        )
+
+        self.assertEqual([len(page) for page in pages], [2, 1])
+        self.assertEqual(
+            [call.kwargs["vars"]["where"] for call in send_post_request.call_args_list],
+            [{}, {"id_gt": "2"}],
+        )
+
+    @patch("core.thirdpartyapp.Subgraph.send_post_request")
+    def test_in_filter_is_batched(self, send_post_request):
+        send_post_request.return_value = self.nfts_response("1")
+        addresses = [f"0x{i:040x}" for i in range(Subgraph.IN_FILTER_BATCH_SIZE + 1)]
+
+        passes = list(Subgraph().iter_unitap_passes(addresses=addresses))
+
+        self.assertEqual(len(passes), 2)
+        self.assertEqual(
+            sorted(
+                len(call.kwargs["vars"]["where"]["owner_in"])
+                for call in send_post_request.call_args_list
+            ),
+            [1, Subgraph.IN_FILTER_BATCH_SIZE],
+        )
+
+
+class SlowConstraint(ConstraintVerification):
+    delay = 0.2
+
+    def is_observed(self, *args, **kwargs):
+        time.sleep(self.delay)
+        return True
+
+
+class HangingConstraint(SlowConstraint):
+    delay = 1
+
+
+class CountingConstraint(ConstraintVerification):
+    calls = 0
+
+    def is_observed(self, *args, **kwargs):
+        CountingConstraint.calls += 1
+        return True
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class TestConstraintEvaluator(APITransactionTestCase):
+    def setUp(self):
+        self.user_profile = UserProfile.objects.create(
+            user=User.objects.create_user(username="test", password="1234"),
+            initial_context_id="test",
+            username="test",
+        )
+        self.constraints = [
+            Mock(pk=pk, title=f"c{pk}", response=f"r{pk}") for pk in [1, 2]
+        ]
+        for c in self.constraints:
+            # name is taken by the Mock constructor
+            c.name = "SlowConstraint"
+
+    def tearDown(self):
+        cache.clear()
+        CountingConstraint.calls = 0
+
+    def get_evaluator(self, reversed_constraints=(), obj=None):
+        return ConstraintEvaluator(
+            self.user_profile,
+            obj or self.user_profile,
+            param_values={},
+            data={},
+            reversed_constraints=list(reversed_constraints),
+        )
+
+    @patch("core.constraints.evaluator.get_constraint", lambda name: SlowConstraint)
+    def test_constraints_run_concurrently_in_order(self):
+        started_at = time.monotonic()
+        result, error_messages = self.get_evaluator(["2"]).evaluate(self.constraints)
+
+        self.assertLess(time.monotonic() - started_at, 2 * SlowConstraint.delay)
+        self.assertEqual(list(result), [1, 2])
+        self.assertTrue(result[1]["is_verified"])
+        self.assertFalse(result[2]["is_verified"])
+        self.assertEqual(error_messages, {"c2": "r2"})
+
+    @override_settings(CONSTRAINT_EVALUATION_TIMEOUT=0.3)
+    @patch("core.constraints.evaluator.get_constraint")
+    def test_timed_out_constraint_is_not_verified(self, get_constraint):
+        get_constraint.side_effect = lambda name: {
+            "SlowConstraint": SlowConstraint,
+            "HangingConstraint": HangingConstraint,
+        }[name]
+        self.constraints[1].name = "HangingConstraint"
+
+        result, error_messages = self.get_evaluator().evaluate(self.constraints)
+
+        self.assertTrue(result[1]["is_verified"])
+        self.assertFalse(result[2]["is_verified"])
+        self.assertEqual(list(error_messages), ["c2"])
+
+    @override_settings(
+        CONSTRAINT_EVALUATION_WORKERS=2, CONSTRAINT_EVALUATION_TIMEOUT=0.3
+    )
+    @patch("core.constraints.evaluator.get_constraint", lambda name: SlowConstraint)
+    @patch.object(ConstraintEvaluator, "_executor", None)
+    def test_timeout_runs_from_when_the_constraint_starts(self):
+        constraints = self.constraints + [
+            Mock(pk=3, title="c3", response="r3"),
+        ]
+        constraints[2].name = "SlowConstraint"
+
+        result, error_messages = self.get_evaluator().evaluate(constraints)
+
+        # the third one ends past the timeout counted from when it was queued
+        self.assertTrue(all(data["is_verified"] for data in result.values()))
+        self.assertEqual(error_messages, {})
+        ConstraintEvaluator._executor.shutdown()
+
+    def test_captcha_results_are_not_shared_between_campaigns(self):
+        c = self.constraints[0]
+        for constraint_class in (HasVerifiedCloudflareCaptcha, HasVerifiedHCaptcha):
+            constraint = constraint_class(self.user_profile)
+            self.assertNotEqual(
+                self.get_evaluator().get_cache_key(c, constraint),
+                self.get_evaluator(obj=self.user_profile.user).get_cache_key(
+                    c, constraint
+                ),
+            )
+
+    @patch("core.thirdpartyapp.RapidTwitter.is_following_batch_with_cache")
+    @patch("authentication.models.TwitterConnection.get_connection")
+    def test_info_and_verdict_share_one_fetch(self, get_connection, following_batch):
+        get_connection.return_value = Mock(username="test")
+        following_batch.return_value = {"1": True, "2": False}
+        self.constraints[0].name = "core.IsFollowingTwitterBatch"
+        evaluator = self.get_evaluator()
+        evaluator.param_values = {
+            "core.IsFollowingTwitterBatch": {"TWITTER_IDS": [1, 2]}
+        }
+
+        result, _ = evaluator.evaluate(self.constraints[:1])
+
+        self.assertEqual(following_batch.call_count, 1)
+        self.assertFalse(result[1]["is_verified"])
+        self.assertEqual(result[1]["info"], {"1": True, "2": False})
+
+    @patch("core.thirdpartyapp.farcaster.FarcasterUtil._get_reacts_on_casts")
+    @patch("core.thirdpartyapp.farcaster.FarcasterUtil._get_channels")
+    @patch("core.thirdpartyapp.farcaster.FarcasterUtil._get_users")
+    @patch("core.thirdpartyapp.farcaster.FarcasterUtil.get_address_fid")
+    @patch("authentication.models.FarcasterConnection.get_connection")
+    def test_farcaster_checks_are_fetched_together(
+        self, get_connection, get_address_fid, get_users, get_channels, get_reactions
+    ):
+        get_connection.return_value = Mock(user_wallet_address="0xabc")
+        get_address_fid.return_value = 12
+        get_users.return_value = {
+            1: {"viewer_context": {"following": True, "followed_by": False}},
+            2: {"viewer_context": {"following": False, "followed_by": True}},
+            12: {"follower_count": 50},
+        }
+        get_channels.return_value = {"unitap": {"viewer_context": {"following": True}}}
+        get_reactions.return_value = {"likes": [{"fid": 12}], "recasts": []}
+        names = [
+            "core.IsFollowingFarcasterUser",
+            "core.BeFollowedByFarcasterUser",
+            "core.HasMinimumFarcasterFollower",
+            "core.IsFollowingFarcasterChannel",
+            "core.DidLikedFarcasterCast",
+            "core.DidRecastFarcasterCast",
+        ]
+        constraints = [
+            Mock(pk=pk, title=name, response=name) for pk, name in enumerate(names)
+        ]
+        for c, name in zip(constraints, names):
+            c.name = name
+        evaluator = self.get_evaluator()
+        evaluator.param_values = {
+            "core.IsFollowingFarcasterUser": {"FARCASTER_FID": 1},
+            "core.BeFollowedByFarcasterUser": {"FARCASTER_FID": 2},
+            "core.HasMinimumFarcasterFollower": {"MINIMUM": 10},
+            "core.IsFollowingFarcasterChannel": {"FARCASTER_CHANNEL_ID": "unitap"},
+            "core.DidLikedFarcasterCast": {"FARCASTER_CAST_HASH": "0x1"},
+            "core.DidRecastFarcasterCast": {"FARCASTER_CAST_HASH": "0x1"},
+        }
+
+        result, error_messages = evaluator.evaluate(constraints)
+
+        self.assertEqual(list(error_messages), ["core.DidRecastFarcasterCast"])
+        self.assertEqual(get_users.call_count, 1)
+        self.assertEqual(get_users.call_args.args, (12, [1, 2, 12]))
+        self.assertEqual(get_channels.call_count, 1)
+
+    @patch("core.constraints.evaluator.get_constraint", lambda name: CountingConstraint)
+    def test_results_are_shared_between_campaigns(self):
+        self.get_evaluator().evaluate(self.constraints[:1])
+        result, _ = self.get_evaluator(["1"], obj=self.user_profile.user).evaluate(
+            self.constraints[:1]
+        )
+
+        self.assertEqual(CountingConstraint.calls, 1)
+        self.assertFalse(result[1]["is_verified"])
+        self.assertEqual(
+            ConstraintEvaluator.get_cache_stats(),
+            {"hits": 1, "misses": 1, "hit_rate": 0.5},
+        )
+
+    @patch("core.constraints.evaluator.get_constraint", lambda name: CountingConstraint)
+    def test_linking_a_wallet_invalidates_results(self):
+        self.get_evaluator().evaluate(self.constraints[:1])
+        create_new_wallet(
+            self.user_profile, "0x90F8bf6A479f320ead074411a4B0e7944Ea8c9C1", "EVM"
+        )
+        self.get_evaluator().evaluate(self.constraints[:1])
+
+        self.assertEqual(CountingConstraint.calls, 2)
+
+
+@patch("web3.Web3.is_connected", return_value=True)
+class TestMulticallClient(APITestCase):
+    rpc_url = "http://127.0.0.1:7545"
+
+    def setUp(self):
+        self.web3_utils = Web3Utils(self.rpc_url)
+        self.web3_utils.set_contract(
+            "0xc2132D05D31c914a87C6611C10748AEb04B58e8F", ERC20_METHODS
+        )
+        self.funcs = [
+            self.web3_utils.contract.functions.balanceOf(address)
+            for address in (
+                "0x90F8bf6A479f320ead074411a4B0e7944Ea8c9C1",
+                "0xFFcf8FDEE72ac11b5c542428B35EEF5769C409f0",
+            )
+        ]
+
+    def tearDown(self):
+        Web3ProviderRegistry.clear()
+        MulticallClient._deployed.clear()
+
+    @patch("web3.contract.contract.ContractFunction.call")
+    def test_calls_are_aggregated(self, call, *mocks):
+        MulticallClient._deployed[self.rpc_url] = True
+        call.return_value = [(True, encode(["uint256"], [5])), (False, b"")]
+
+        results = MulticallClient(self.web3_utils).call(self.funcs)
+
+        self.assertEqual(results, [5, None])
+        call.assert_called_once()
+
+    @patch("core.utils.Web3Utils.batch_request")
+    def test_falls_back_to_rpc_batch(self, batch_request, *mocks):
+        MulticallClient._deployed[self.rpc_url] = False
+        batch_request.return_value = ["0x" + encode(["uint256"], [7]).hex(), None]
+
+        results = MulticallClient(self.web3_utils).call(self.funcs)
+
+        self.assertEqual(results, [7, None])
+        self.assertEqual(
+            [method for method, _ in batch_request.call_args.args[0]],
+            ["eth_call", "eth_call"],
+        )
+
+
+class TestAllowList(BaseTestCase):
+    listed = "0x90F8bf6A479f320ead074411a4B0e7944Ea8c9C1"
+
+    def setUp(self):
+        super().setUp()
+        create_new_wallet(self.user_profile, self.listed, NetworkTypes.EVM)
+
+    def tearDown(self):
+        _allow_list_contains.cache_clear()
+
+    def get_constraint(self, path):
+        constraint = AllowListVerification(self.user_profile)
+        constraint.param_values = {"CSV_FILE": path}
+        return constraint
+
+    def test_ingested_list_is_used(self):
+        allow_list = AllowList.ingest(
+            "list.csv", [self.listed.lower(), self.listed, "0x1234", ""]
+        )
+
+        self.assertEqual(allow_list.address_count, 2)
+        self.assertTrue(self.get_constraint("list.csv").is_observed())
+        self.assertFalse(AllowList.contains_any("list.csv", ["0x5678"]))
+
+    def test_uploaded_csv_is_ingested_on_first_use(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as f:
+            f.write("0x1234\n")
+            f.flush()
+
+            self.assertFalse(self.get_constraint(f.name).is_observed())
+            self.assertEqual(AllowList.objects.get(path=f.name).address_count, 1)
@@ -13,7 +13,9 @@ class EASUtils:
     }
 
     def __init__(self, chain_name: str) -> None:
-        self.requests = RequestHelper(EAS_BASE_URL.get(chain_name.lower()))
+        self.requests = RequestHelper(
+            EAS_BASE_URL.get(chain_name.lower()), retry_post=True
+        )
 
     @property
     def headers(self) -> dict:
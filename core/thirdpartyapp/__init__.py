@@ -1,6 +1,6 @@
 from .EAS import EASUtils
 from .ens import ENSUtil  # noqa: F401
-from .farcaster import FarcasterUtil  # noqa: F401
+from .farcaster import FarcasterUtil, FarcasterViewer  # noqa: F401
 from .gitcoin_passport import GitcoinPassport, GitcoinPassportRequestError  # noqa: F401
 from .lens import LensUtil  # noqa: F401
 from .subgraph import Subgraph
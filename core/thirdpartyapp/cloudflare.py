@@ -1,7 +1,8 @@
 import logging
+
 from django.conf import settings
-import requests
 
+from core.request_helper import RequestHelper
 
 logger = logging.getLogger(__name__)
 
@@ -12,8 +13,9 @@ class CloudflareUtil:
 
     def is_verified(self, token: str, ip: str) -> bool:
         try:
-            res = requests.post(
-                f"{self.api_url}/siteverify",
+            res = RequestHelper(self.api_url).request(
+                "POST",
+                "siteverify",
                 data={"secret": self.secret_key, "response": token, "remoteip": ip},
             )
 
@@ -25,9 +25,20 @@ class ENSUtil:
         """
         return self.ns.address(name)
 
+    def _resolve_names(self, addresses: list[str]) -> dict:
+        return {
+            address: self.ns.name(self.w3_utils.to_checksum_address(address))
+            for address in addresses
+        }
+
     def get_name(self, address: str) -> None | str:
-        """return name on address
+        """return name on address, cached in ResolvedIdentity
         :param address:
         """
-        _address = self.w3_utils.to_checksum_address(address)
-        return self.ns.name(_address)
+        from core.models import ResolvedIdentity
+
+        return ResolvedIdentity.resolve_many(
+            ResolvedIdentity.Provider.ENS,
+            [address],
+            self._resolve_names,
+        )[address.lower()]
@@ -1,4 +1,8 @@
+import functools
 import logging
+import threading
+
+from django.core.cache import cache
 
 from core.request_helper import RequestException, RequestHelper
 from core.thirdpartyapp import config
@@ -13,74 +17,95 @@ class FarcasterUtil:
         "get_bulk_profile_by_fid": "user/bulk",
         "get_bulk_channel": "channel/bulk",
     }
-
-    def __init__(self):
-        self.session = self.requests.get_session()
-
-    def __del__(self):
-        self.session.close()
+    BULK_SIZE = 100
+    CAST_CACHE_TIMEOUT = 60
 
     @property
     def headers(self):
         return {"api_key": config.FARCASTER_API_KEY, "accept": "application/json"}
 
-    def _get_profile(self, address: str) -> dict:
-        address = Web3Utils.to_checksum_address(address)
-        params = {"addresses": address}
-        path = self.paths.get("get_bulk_profile_by_address")
-        res = self.requests.get(
-            path=path, headers=self.headers, params=params, session=self.session
-        )
-        return res[address.lower()][0]
-
     def _get_bulk_profile(self, addresses: list[str]) -> dict:
         path = self.paths.get("get_bulk_profile_by_address")
         addresses = map(Web3Utils.to_checksum_address, addresses)
         params = {"addresses": ",".join(addresses)}
-        res = self.requests.get(
-            path=path, session=self.session, params=params, headers=self.headers
-        )
+        res = self.requests.get(path=path, params=params, headers=self.headers)
         return res
 
-    def get_address_fid(self, address: str) -> None | str:
+    def _resolve_fids(self, addresses: list[str]) -> dict:
+        try:
+            profiles = self._get_bulk_profile(addresses)
+        except RequestException as e:
+            # none of the addresses has a profile
+            if e.response is not None and e.response.status_code == 404:
+                return {}
+            raise
+        return {
+            address: profiles[address][0]["fid"]
+            for address in profiles
+            if profiles[address]
+        }
+
+    def get_fids(self, addresses: list[str]) -> dict:
+        """return fids of the given EVM addresses, resolved in one bulk request
+        and cached in ResolvedIdentity.
+        :param addresses: addresses that we want to get fid
+        :return: {lowercased address: fid} of the addresses that have a profile
+        """
+        from core.models import ResolvedIdentity
+
+        identities = ResolvedIdentity.resolve_many(
+            ResolvedIdentity.Provider.FARCASTER,
+            addresses,
+            self._resolve_fids,
+        )
+        return {
+            address: int(fid) for address, fid in identities.items() if fid is not None
+        }
+
+    def get_address_fid(self, address: str) -> None | int:
         """return fid for given EVM address.
         :param address: address that we want to get fid
         :return: return fid
         """
         try:
-            res = self._get_profile(address)
-            return res["fid"]
-        except (RequestException, KeyError):
-            logging.error("user profile for this address not found")
+            fid = self.get_fids([address]).get(address.lower())
+        except RequestException:
+            logging.error("could not resolve farcaster profile of this address")
             return None
+        if fid is None:
+            logging.error("user profile for this address not found")
+        return fid
 
     def get_follower_number(self, address: str) -> None | int:
         """return follower number for given EVM address.
         :param address: address that we want to get fid
         :return: follower number
         """
-        try:
-            res = self._get_profile(address)
-            return res["follower_count"]
-        except (RequestException, KeyError):
-            logging.error("user profile for this address not found")
-            return None
+        return FarcasterViewer(address, self).get_follower_count()
 
     def _get_reacts_on_casts(self, cast_hash: str) -> dict:
+        cache_key = f"farcaster-cast-reactions-{cast_hash}"
+        reactions = cache.get(cache_key)
+        if reactions is not None:
+            return reactions
         path = self.paths.get("cast")
         params = {"identifier": cast_hash, "type": "hash"}
 
         res = self.requests.get(
             path=path,
             headers=self.headers,
-            session=self.session,
             params=params,
         )
-        return res["reactions"]
+        # only the fids are kept, the reactions are shared by all users
+        reactions = {
+            kind: [{"fid": reaction["fid"]} for reaction in res["reactions"][kind]]
+            for kind in ("likes", "recasts")
+        }
+        cache.set(cache_key, reactions, self.CAST_CACHE_TIMEOUT)
+        return reactions
 
-    def _get_fids_from_addresses(self, addreses: list[str]) -> list[str]:
-        profiles = self._get_bulk_profile(addreses)
-        return set([profiles[address][0]["fid"] for address in profiles])
+    def _get_fids_from_addresses(self, addreses: list[str]) -> set[int]:
+        return set(self.get_fids(addreses).values())
 
     def did_liked_cast(self, cast_hash: str, addresses: list[str]) -> bool:
         """
@@ -114,17 +139,34 @@ class FarcasterUtil:
             logging.error(f"user not found, error: {e}")
         return False
 
-    def _get_followers_status(self, user_fid: str, follower_fids: str | list) -> bool:
-        if isinstance(follower_fids, list):
-            follower_fids = ",".join(map(str, follower_fids))
+    def _get_users(self, viewer_fid: int, fids: list[int]) -> dict:
+        """users by fid, with the viewer context of viewer_fid"""
         path = self.paths.get("get_bulk_profile_by_fid")
-        params = {"viewer_fid": user_fid, "fids": follower_fids}
-        res = self.requests.get(
-            path=path, params=params, session=self.session, headers=self.headers
-        )
-        return {
-            data["fid"]: data["viewer_context"]["following"] for data in res["users"]
-        }
+        users = {}
+        fids = list(fids)
+        for index in range(0, len(fids), self.BULK_SIZE):
+            params = {
+                "viewer_fid": viewer_fid,
+                "fids": ",".join(map(str, fids[index : index + self.BULK_SIZE])),
+            }
+            res = self.requests.get(path=path, params=params, headers=self.headers)
+            users.update({data["fid"]: data for data in res["users"]})
+        return users
+
+    def _get_channels(self, viewer_fid: int, channel_ids: list[str]) -> dict:
+        """channels by id, with the viewer context of viewer_fid"""
+        path = self.paths.get("get_bulk_channel")
+        channels = {}
+        channel_ids = list(channel_ids)
+        for index in range(0, len(channel_ids), self.BULK_SIZE):
+            params = {
+                "ids": ",".join(channel_ids[index : index + self.BULK_SIZE]),
+                "type": "id",
+                "viewer_fid": viewer_fid,
+            }
+            res = self.requests.get(path=path, params=params, headers=self.headers)
+            channels.update({data["id"]: data for data in res["channels"]})
+        return channels
 
     def is_following(self, fid: str, address: str) -> bool:
         """check if address followed fid or not.
@@ -132,18 +174,7 @@ class FarcasterUtil:
         :param address: address that must following profile_id
         :return: True or False
         """
-        try:
-            follower_fid = self._get_profile(address)["fid"]
-            return self._get_followers_status(follower_fid, fid)[fid]
-        except (
-            RequestException,
-            IndexError,
-            KeyError,
-            AttributeError,
-            ValueError,
-        ) as e:
-            logging.error(f"could not check following status, error: {e}")
-        return False
+        return FarcasterViewer(address, self).is_following(fid)
 
     def be_followed_by(self, fid: str, address: str):
         """check if address be followed by fid.
@@ -151,18 +182,7 @@ class FarcasterUtil:
         :param address: address that must be followed by profile_id
         :return: True or False
         """
-        try:
-            following_fid = self._get_profile(address)["fid"]
-            return self._get_follow_status(fid, following_fid)[following_fid]
-        except (
-            RequestException,
-            IndexError,
-            KeyError,
-            AttributeError,
-            ValueError,
-        ) as e:
-            logging.error(f"could not check following status, error: {e}")
-        return False
+        return FarcasterViewer(address, self).is_followed_by(fid)
 
     def is_following_channel(self, channel_id: str, addresses: list[str]) -> bool:
         """check if one address is following channel.
@@ -170,34 +190,121 @@ class FarcasterUtil:
         :param addresses: list of EVM address
         :return: True or False
         """
-        path = self.paths.get("get_bulk_channel")
+        return any(
+            FarcasterViewer(address, self).is_following_channel(channel_id)
+            for address in addresses
+        )
+
+    def is_following_batch(self, fids: list[str], address: str) -> None | dict:
+        return FarcasterViewer(address, self).get_following_statuses(fids)
+
+
+class FarcasterViewer:
+    """
+    Farcaster state of one user address for one constraint evaluation.
+
+    Checks add the fids and channels they need before reading, the first read
+    then fetches all of them together: one bulk user call with the user as the
+    viewer answers following, followed by and the follower count, and one bulk
+    channel call answers every channel. Fids or channels added later are
+    fetched on their own read. Reads are safe from several threads.
+    """
+
+    def __init__(self, address: str, util: None | FarcasterUtil = None) -> None:
+        self.address = address
+        self.util = util or FarcasterUtil()
+        self.target_fids = set()
+        self.channel_ids = set()
+        self._users = {}
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def add_fids(self, fids):
+        with self._lock:
+            self.target_fids.update(int(fid) for fid in fids)
+
+    def add_channels(self, channel_ids):
+        with self._lock:
+            self.channel_ids.update(channel_ids)
+
+    @functools.cached_property
+    def fid(self) -> None | int:
+        return self.util.get_address_fid(self.address)
+
+    def _get_user(self, fid: int) -> None | dict:
+        if self.fid is None:
+            return None
+        with self._lock:
+            self.target_fids.update([fid, self.fid])
+            if fid not in self._users:
+                missing = self.target_fids - self._users.keys()
+                users = self.util._get_users(self.fid, sorted(missing))
+                self._users.update({fid: users.get(fid) for fid in missing})
+            return self._users[fid]
+
+    def _get_channel(self, channel_id: str) -> None | dict:
+        if self.fid is None:
+            return None
+        with self._lock:
+            self.channel_ids.add(channel_id)
+            if channel_id not in self._channels:
+                missing = self.channel_ids - self._channels.keys()
+                channels = self.util._get_channels(self.fid, sorted(missing))
+                self._channels.update(
+                    {channel_id: channels.get(channel_id) for channel_id in missing}
+                )
+            return self._channels[channel_id]
+
+    def _get_viewer_context(self, fid) -> dict:
         try:
-            fids = self._get_fids_from_addresses(addresses)
-            params = {
-                "ids": channel_id,
-                "type": "id",
+            user = self._get_user(int(fid))
+        except (RequestException, KeyError, ValueError) as e:
+            logging.error(f"could not check following status, error: {e}")
+            return {}
+        return (user or {}).get("viewer_context") or {}
+
+    def is_following(self, fid) -> bool:
+        return bool(self._get_viewer_context(fid).get("following"))
+
+    def is_followed_by(self, fid) -> bool:
+        return bool(self._get_viewer_context(fid).get("followed_by"))
+
+    def get_following_statuses(self, fids) -> None | dict:
+        if self.fid is None:
+            return None
+        try:
+            self.add_fids(fids)
+            return {
+                fid: bool(self._get_user(int(fid))["viewer_context"]["following"])
+                for fid in fids
             }
-            for fid in fids:
-                params["viewer_fid"] = fid
-                res = self.requests.get(
-                    path, session=self.session, params=params, headers=self.headers
-                )
-                if res.get("channels")[0].get("viewer_context").get("following"):
-                    return True
-        except (RequestException, KeyError, AttributeError) as e:
+        except (RequestException, KeyError, TypeError, ValueError) as e:
+            logging.error(f"could not check following status, error: {e}")
+        return None
+
+    def get_follower_count(self) -> None | int:
+        if self.fid is None:
+            return None
+        try:
+            return self._get_user(self.fid)["follower_count"]
+        except (RequestException, KeyError, TypeError) as e:
+            logging.error(f"user profile for this address not found, error: {e}")
+        return None
+
+    def is_following_channel(self, channel_id: str) -> bool:
+        try:
+            channel = self._get_channel(channel_id)
+            return bool(channel["viewer_context"]["following"])
+        except (RequestException, KeyError, TypeError) as e:
             logging.error(f"Channel not found, error: {e}")
         return False
 
-    def is_following_batch(self, fids: list[str], address: str) -> None | dict:
+    def did_react(self, cast_hash: str, kind: str) -> bool:
+        if self.fid is None:
+            return False
         try:
-            follower_fid = self._get_profile(address)["fid"]
-            return self._get_followers_status(follower_fid, fids)
-        except (
-            RequestException,
-            IndexError,
-            KeyError,
-            AttributeError,
-            ValueError,
-        ) as e:
-            logging.error(f"could not check following status, error: {e}")
-        return None
+            reactions = self.util._get_reacts_on_casts(cast_hash)[kind]
+        except (RequestException, KeyError, AttributeError) as e:
+            logging.error(f"cast not found, error: {e}")
+            return False
+        return any(reaction["fid"] == self.fid for reaction in reactions)
@@ -1,17 +1,19 @@
 import json
 import logging
 
-import requests
 import zstandard as zstd
 
+from core.request_helper import RequestHelper
+
 
 class GitcoinGraph:
     URL = "https://grants-stack-indexer-v2.gitcoin.co/graphql"
+    requests = RequestHelper(URL, retry_post=True)
 
     def send_post_request(self, json_data):
         try:
-            res = requests.post(
-                self.URL, headers={"Content-Type": "application/json"}, json=json_data
+            res = self.requests.request(
+                "POST", headers={"Content-Type": "application/json"}, json=json_data
             )
             return json.loads(zstd.decompress(res.content, 1073741824).decode())
         except Exception as e:
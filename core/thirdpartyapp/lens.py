@@ -6,13 +6,7 @@ from core.utils import Web3Utils
 
 
 class LensUtil:
-    requests = RequestHelper(base_url=LENS_BASE_URL)
-
-    def __init__(self) -> None:
-        self.session = self.requests.get_session()
-
-    def __del__(self):
-        self.session.close()
+    requests = RequestHelper(base_url=LENS_BASE_URL, retry_post=True)
 
     @property
     def headers(self):
@@ -26,9 +20,7 @@ class LensUtil:
         return json
 
     def _post_request(self, json: dict) -> dict:
-        return self.requests.post(
-            path="", json=json, headers=self.headers, session=self.session
-        )
+        return self.requests.post(path="", json=json, headers=self.headers)
 
     def _get_profile_info(self, address: str):
         query = """
@@ -58,11 +50,48 @@ class LensUtil:
         except (KeyError, TypeError, AttributeError):
             return None
 
+    def _resolve_profile_ids(self, addresses: list[str]) -> dict:
+        # default profiles of all addresses in one query, one alias per address
+        definitions = ", ".join(
+            f"$request{index}: DefaultProfileRequest!"
+            for index in range(len(addresses))
+        )
+        fields = "\n".join(
+            f"profile{index}: defaultProfile(request: $request{index}) {{ id }}"
+            for index in range(len(addresses))
+        )
+        json = {
+            "query": f"query DefaultProfiles({definitions}) {{ {fields} }}",
+            "variables": {
+                f"request{index}": {"for": Web3Utils.to_checksum_address(address)}
+                for index, address in enumerate(addresses)
+            },
+        }
+        data = self._post_request(json)["data"]
+        return {
+            address: (data[f"profile{index}"] or {}).get("id")
+            for index, address in enumerate(addresses)
+        }
+
+    def get_profile_ids(self, addresses: list[str]) -> dict:
+        """get profile_id in lens of EVM addresses, cached in ResolvedIdentity
+        :param addresses: EVM addresses
+        :return: {lowercased address: profile_id}, profile_id is None if not exists
+        """
+        from core.models import ResolvedIdentity
+
+        return ResolvedIdentity.resolve_many(
+            ResolvedIdentity.Provider.LENS,
+            addresses,
+            self._resolve_profile_ids,
+        )
+
     def _get_profile_id(self, address: str):
-        address = Web3Utils.to_checksum_address(address)
         try:
-            profile_info = self._get_profile_info(address)
-            return profile_info.get("id")
+            return self.get_profile_ids([address])[address.lower()]
+        except RequestException as e:
+            logging.error(f"connection lost, {e}")
+            return None
         except (KeyError, TypeError, AttributeError):
             return None
 
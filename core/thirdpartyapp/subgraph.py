@@ -1,66 +1,125 @@
 import logging
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 from core.request_helper import RequestException, RequestHelper
 from core.thirdpartyapp import config
 
 
 class Subgraph:
-    requests = RequestHelper(config.SUBGRAPH_BASE_URL)
+    requests = RequestHelper(config.SUBGRAPH_BASE_URL, retry_post=True)
     paths = {
         "unitap_pass": "query/73675/unitap-pass-eth/version/latest",
         "arb_bridge_mainnet": "query/21879/unitap-arb-bridge-mainnet/version/latest",
     }
-
-    def __init__(self):
-        self.session = self.requests.get_session()
-
-    def __del__(self):
-        self.session.close()
+    PAGE_SIZE = 1000
+    IN_FILTER_BATCH_SIZE = 100
+    MAX_WORKERS = 4
 
     def send_post_request(self, path, query, vars, **kwargs):
         try:
             return self.requests.post(
                 path=path,
                 json={"query": query, "variables": vars},
-                session=self.session,
                 **kwargs,
             )
         except RequestException:
             logging.error("Could not connect to subgraph API")
 
-    def get_unitap_pass_holders(
-        self, first=1000, *, addresses: list[str] | None = None
-    ) -> dict[str : set[str]]:
-        """get unitap pass holders
-        :return: {'owner_id':{'unitap_pass_id'}}
+    def paginate(
+        self,
+        path: str,
+        entity: str,
+        fields: list[str],
+        *,
+        filter_type: str,
+        where: dict | None = None,
+        first: int = PAGE_SIZE,
+    ):
         """
-
-        count = 0
-        holders = defaultdict(set)
-        query = """
-        query GetNFTHolders($first: Int, $skip: Int, $where: NFT_filter) {
-            nfts (first: $first, skip: $skip, where: $where) {
-                tokenId,
-                owner
-            }
-        }
+        Yield the pages of entity ordered by id, each page continues after the last
+        id of the previous one so deep pages cost the same as the first
+        """
+        query = f"""
+        query Page($first: Int, $where: {filter_type}) {{
+            {entity} (first: $first, where: $where, orderBy: id, orderDirection: asc) {{
+                id
+                {" ".join(fields)}
+            }}
+        }}
         """
-        vars = {"first": first, "where": {}}
-        if addresses:
-            or_ = [{"owner": address} for address in addresses]
-            vars["where"] = {"or": or_}
+        where = where or {}
         while True:
-            vars["skip"] = count
             res = self.send_post_request(
-                self.paths.get("unitap_pass"), query=query, vars=vars
+                path, query=query, vars={"first": first, "where": where}
+            )
+            page = ((res or {}).get("data") or {}).get(entity)
+            if not page:
+                return
+            yield page
+            if len(page) < first:
+                return
+            where = {**where, "id_gt": page[-1]["id"]}
+
+    def paginate_in(
+        self,
+        path: str,
+        entity: str,
+        fields: list[str],
+        *,
+        filter_type: str,
+        key: str,
+        values: list,
+        where: dict | None = None,
+        first: int = PAGE_SIZE,
+    ):
+        """
+        Yield the pages of entity whose key is one of values, values are split in
+        batches of IN_FILTER_BATCH_SIZE that are paged concurrently
+        """
+        values = list(values)
+        batches = [
+            values[i : i + self.IN_FILTER_BATCH_SIZE]
+            for i in range(0, len(values), self.IN_FILTER_BATCH_SIZE)
+        ]
+        if not batches:
+            return
+
+        def get_pages(batch):
+            return list(
+                self.paginate(
+                    path,
+                    entity,
+                    fields,
+                    filter_type=filter_type,
+                    where={**(where or {}), f"{key}_in": batch},
+                    first=first,
+                )
+            )
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.MAX_WORKERS, len(batches))
+        ) as executor:
+            for pages in executor.map(get_pages, batches):
+                yield from pages
+
+    def iter_unitap_passes(self, *, addresses: list[str] | None = None):
+        """
+        Yield the {'tokenId', 'owner'} of the unitap passes, of all holders when
+        addresses is None
+        """
+        kwargs = {"filter_type": "NFT_filter"}
+        if addresses is None:
+            pages = self.paginate(
+                self.paths["unitap_pass"], "nfts", ["tokenId", "owner"], **kwargs
+            )
+        else:
+            pages = self.paginate_in(
+                self.paths["unitap_pass"],
+                "nfts",
+                ["tokenId", "owner"],
+                key="owner",
+                values=[address.lower() for address in addresses],
+                **kwargs,
             )
-            match res:
-                case None:
-                    return {}
-                case {"data": {"nfts": nfts}} if len(nfts) == 0:
-                    return holders
-                case {"data": {"nfts": nfts}}:
-                    for item in nfts:
-                        count += 1
-                        holders[item["owner"]].add(item["tokenId"])
+        for page in pages:
+            yield from page
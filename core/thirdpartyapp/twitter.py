@@ -1,21 +1,40 @@
+import hashlib
 import os
+import threading
+import time
 
-import requests
 import tweepy
+from django.conf import settings
 from django.core.cache import cache
 from ratelimit import limits, sleep_and_retry
 
+from core.request_helper import RequestHelper
+
 
 class TwitterUtilsError(tweepy.TweepyException):
     pass
 
 
 class TwitterUtils:
+    MAX_TWEET_PAGES = 5
+    # wait used when a 429 response has no x-rate-limit-reset header, the tweet
+    # lookup endpoints count requests per user token over 15 minutes
+    RATE_LIMIT_WINDOW = 15 * 60
+    # kind: (client method, extra params, field of the user id)
+    TWEET_LOOKUPS = {
+        "likes": ("get_liking_users", {}, "id"),
+        "retweets": ("get_retweeters", {}, "id"),
+        "quotes": ("get_quote_tweets", {"expansions": ["author_id"]}, "author_id"),
+    }
+
+    _tweet_locks = [threading.Lock() for _ in range(32)]
+
     consumer_key = os.getenv("CONSUMER_KEY")
     consumer_secret = os.getenv("CONSUMER_SECRET")
     callback_url = os.getenv("TWITTER_CALLBACK_URL")
 
     def __init__(self, access_token: str, access_token_secret: str):
+        self.token_digest = hashlib.md5(str(access_token).encode()).hexdigest()
         auth = tweepy.OAuthHandler(
             consumer_key=self.consumer_key,
             consumer_secret=self.consumer_secret,
@@ -67,30 +86,114 @@ class TwitterUtils:
 
         return access_token, access_token_secret
 
-    def get_username(self) -> str:
+    def get_profile(self) -> dict:
         try:
-            username = self.api.verify_credentials().screen_name
+            user = self.api.verify_credentials()
         except tweepy.TweepyException as e:
-            raise TwitterUtilsError(f"Can not get username, error: {e}")
-        return username
+            raise TwitterUtilsError(f"Can not get profile, error: {e}")
+        return {
+            "id": user.id_str,
+            "username": user.screen_name,
+            "follower_count": user.followers_count,
+            "tweet_count": user.statuses_count,
+        }
+
+    def get_username(self) -> str:
+        return self.get_profile()["username"]
 
     def get_user_id(self) -> str:
-        try:
-            user_id = self.api.verify_credentials().id_str
-        except tweepy.TweepyException as e:
-            raise TwitterUtilsError(f"Can not get user_id, error: {e}")
-        return user_id
+        return self.get_profile()["id"]
 
     def get_tweet_count(self) -> int:
-        user = self.api.get_user()
-        return user.statuses_count
+        return self.get_profile()["tweet_count"]
 
     def get_follower_count(self) -> int:
-        user = self.api.get_user()
-        return user.followers_count
+        return self.get_profile()["follower_count"]
+
+    def _lookup(self, kind: str, tweet_id: str, **kwargs):
+        """
+        one page of a tweet lookup, once twitter answers 429 the lookups of the
+        token wait for x-rate-limit-reset instead of being sent
+        """
+        rate_limit_key = f"twitter-rate-limited-{kind}-{self.token_digest}"
+        reset_at = cache.get(rate_limit_key)
+        if reset_at is not None:
+            raise TwitterUtilsError(f"Tweet {kind} are rate limited until {reset_at}")
+        method_name, extra_kwargs, _ = self.TWEET_LOOKUPS[kind]
+        try:
+            return getattr(self.client, method_name)(
+                tweet_id, user_auth=True, max_results=100, **extra_kwargs, **kwargs
+            )
+        except tweepy.TooManyRequests as e:
+            now = int(time.time())
+            reset_at = int(e.response.headers.get("x-rate-limit-reset", 0))
+            if reset_at <= now:
+                reset_at = now + self.RATE_LIMIT_WINDOW
+            cache.set(rate_limit_key, reset_at, reset_at - now)
+            raise TwitterUtilsError(f"Tweet {kind} are rate limited until {reset_at}")
+
+    def _get_page_user_ids(self, kind: str, tweet_id: str, next_token=None) -> tuple:
+        """ids of the users on one page of a tweet lookup and the next page token"""
+        try:
+            response = self._lookup(kind, tweet_id, pagination_token=next_token)
+        except TwitterUtilsError:
+            raise
+        except tweepy.TweepyException as e:
+            raise TwitterUtilsError(f"Can not get {kind} of tweet: {e}")
+        user_field = self.TWEET_LOOKUPS[kind][2]
+        user_ids = {str(getattr(item, user_field)) for item in response.data or []}
+        return user_ids, response.meta.get("next_token")
+
+    def _get_tweet_user_ids(self, kind: str, tweet_id: str) -> tuple[set[str], bool]:
+        """
+        ids of the users that liked, retweeted or quoted a tweet, fetched once
+        and shared by all users that are checked against the tweet. The flag
+        tells whether they were read from the cache.
+        """
+        cache_key = f"twitter-tweet-{kind}-{tweet_id}"
+        user_ids = cache.get(cache_key)
+        if user_ids is not None:
+            return set(user_ids), True
+        with self._tweet_locks[hash(cache_key) % len(self._tweet_locks)]:
+            user_ids = cache.get(cache_key)
+            if user_ids is not None:
+                return set(user_ids), True
+            user_ids = set()
+            next_token = None
+            for _ in range(self.MAX_TWEET_PAGES):
+                page_user_ids, next_token = self._get_page_user_ids(
+                    kind, tweet_id, next_token
+                )
+                user_ids.update(page_user_ids)
+                if not next_token:
+                    break
+            cache.set(cache_key, list(user_ids), settings.TWITTER_TWEET_USERS_TTL)
+        return user_ids, False
+
+    def _is_tweet_user(self, kind: str, tweet_id: str, user_id: str) -> bool:
+        """
+        The shared ids may predate the action of the user, so a user missing from
+        cached ids is looked for again on the first page, which lists the latest
+        users, with the token of the user
+        """
+        user_id = str(user_id)
+        user_ids, is_cached = self._get_tweet_user_ids(kind, tweet_id)
+        if user_id in user_ids or not is_cached:
+            return user_id in user_ids
+        latest_user_ids, _ = self._get_page_user_ids(kind, tweet_id)
+        if user_id not in latest_user_ids:
+            return False
+        cache.set(
+            f"twitter-tweet-{kind}-{tweet_id}",
+            list(user_ids | latest_user_ids),
+            settings.TWITTER_TWEET_USERS_TTL,
+        )
+        return True
 
-    def get_is_replied(self, user_tweet_id: str, reference_tweet_id: str) -> bool:
-        user_id = self.get_user_id()
+    def get_is_replied(
+        self, user_tweet_id: str, reference_tweet_id: str, user_id: str = None
+    ) -> bool:
+        user_id = user_id or self.get_user_id()
 
         tweet = self.client.get_tweet(
             id=user_tweet_id,
@@ -110,78 +213,30 @@ class TwitterUtils:
                         return True
         return False
 
-    def get_is_liked(self, reference_tweet_id: str) -> bool:
-        user_id = self.get_user_id()
-
-        liked_users = self.client.get_liking_users(
-            id=reference_tweet_id, user_auth=True
-        ).data
-
-        for liker in liked_users:
-            if str(liker.id) == str(user_id):
-                return True
-        return False
-
-    def did_retweet_tweet(self, tweet_id: str) -> bool:
-        user_id = self.get_user_id()
-        next_token = None
-        attempt = 0
+    def get_is_liked(self, reference_tweet_id: str, user_id: str = None) -> bool:
+        user_id = user_id or self.get_user_id()
+        return self._is_tweet_user("likes", reference_tweet_id, user_id)
 
-        while True and attempt < 5:
-            attempt += 1
-            response = self.client.get_retweeters(
-                tweet_id, user_auth=True, pagination_token=next_token
-            )
-            retweeters = response.data
-            if retweeters is None:
-                return False
+    def did_retweet_tweet(self, tweet_id: str, user_id: str = None) -> bool:
+        user_id = user_id or self.get_user_id()
+        return self._is_tweet_user("retweets", tweet_id, user_id)
 
-            did_retweet = bool(
-                list(filter(lambda user: str(user.id) == str(user_id), retweeters))
-            )
-            if did_retweet:
-                return True
-            next_token = response.meta.get("next_token")
-            if next_token is None:
-                return False
-        return False
-
-    def did_quote_tweet(self, tweet_id):
-        user_id = self.get_user_id()
-        next_token = None
-        attempt = 0
-
-        while True and attempt < 5:
-            attempt += 1
-            response = self.client.get_quote_tweets(
-                tweet_id,
-                user_auth=True,
-                pagination_token=next_token,
-                expansions=["author_id"],
-            )
-            quotes = response.data
-            if quotes is None:
-                return False
-
-            did_quote_tweet = bool(
-                list(filter(lambda quote: str(quote.author_id) == str(user_id), quotes))
-            )
-            if did_quote_tweet:
-                return True
-            next_token = response.meta.get("next_token")
-            if next_token is None:
-                return False
+    def did_quote_tweet(self, tweet_id: str, user_id: str = None) -> bool:
+        user_id = user_id or self.get_user_id()
+        return self._is_tweet_user("quotes", tweet_id, user_id)
 
 
 class RapidTwitter:
     rapid_key = os.getenv("RAPID_API_KEY")
     host = "twitter135.p.rapidapi.com"
+    USER_ID_CACHE_TIMEOUT = 24 * 60 * 60
 
     @sleep_and_retry
     @limits(calls=5, period=1)
     def _request(self, url, params):
-        return requests.get(
-            url=f"https://{self.host}/{url}",
+        return RequestHelper(f"https://{self.host}").request(
+            "GET",
+            url,
             headers={
                 "x-rapidapi-key": self.rapid_key,
                 "x-rapidapi-host": self.host,
@@ -193,9 +248,16 @@ class RapidTwitter:
         )
 
     def get_user_id(self, username: str):
+        cache_key = f"twitter-user-id-{username.lower()}"
+        user_id = cache.get(cache_key)
+        if user_id is not None:
+            return user_id
         response = self._request(url="UserByScreenName", params={"username": username})
         response.raise_for_status()
-        return response.json()["data"]["user"]["result"]["rest_id"]
+        user_id = response.json()["data"]["user"]["result"]["rest_id"]
+        # ids never change, usernames rarely do
+        cache.set(cache_key, user_id, self.USER_ID_CACHE_TIMEOUT)
+        return user_id
 
     def is_following(self, username: str, target_username: str):
         target_id = self.get_user_id(target_username)
@@ -8,9 +8,6 @@ class ZoraUtil:
     request = RequestHelper(base_url=config.ZORA_BASE_URL)
     paths = {"get-address-token-transfer": "api/v2/addresses/{address}/token-transfers"}
 
-    def __init__(self) -> None:
-        self.session = self.request.get_session()
-
     @property
     def headers(self):
         return {"accept: application/json"}
@@ -26,7 +23,6 @@ class ZoraUtil:
                 path=self.paths.get("get-address-token-transfer").format(
                     address=address
                 ),
-                session=self.session,
                 headers=self.headers,
                 params=params,
             )
@@ -1,28 +1,40 @@
 import datetime
 import logging
 import os
+import threading
 import time
 import uuid
 from contextlib import contextmanager
 
 from django.http import HttpRequest
 import pytz
+import requests
 import web3.exceptions
+from django.conf import settings
 from django.core.cache import cache
 from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import UploadedFile
 from django.utils import timezone
+from eth_abi.exceptions import DecodingError
 from eth_account.datastructures import SignedTransaction
 from eth_account.messages import encode_defunct
+from eth_utils.abi import collapse_if_tuple
+from hexbytes import HexBytes
 from solana.rpc.api import Client
-from web3 import Account, Web3
+from requests.adapters import HTTPAdapter
+from web3 import Account, HTTPProvider, Web3
 from web3.contract.contract import Contract, ContractFunction
 from web3.logs import DISCARD, IGNORE, STRICT, WARN
 from web3.middleware import geth_poa_middleware
-from web3.types import TxParams, Type
+from web3.types import RPCEndpoint, RPCResponse, TxParams, Type
 
 from brightIDfaucet.settings import MEDIA_ROOT
-from core.constants import ERC20_METHODS, ERC721_READ_METHODS
+from core.constants import (
+    ERC20_METHODS,
+    ERC721_READ_METHODS,
+    MULTICALL3_ABI,
+    MULTICALL3_ADDRESS,
+)
 
 
 @contextmanager
@@ -137,6 +149,134 @@ class TimeUtils:
         )
 
 
+class PooledHTTPProvider(HTTPProvider):
+    """
+    HTTPProvider that sends every request through one shared keep-alive session
+    instead of web3's per-thread session cache
+    """
+
+    def __init__(self, endpoint_uri, session: requests.Session, request_kwargs=None):
+        super().__init__(endpoint_uri, request_kwargs=request_kwargs)
+        self.session = session
+
+    def make_request(self, method: RPCEndpoint, params) -> RPCResponse:
+        request_data = self.encode_rpc_request(method, params)
+        response = self.session.post(
+            self.endpoint_uri, data=request_data, **self.get_request_kwargs()
+        )
+        response.raise_for_status()
+        return self.decode_rpc_response(response.content)
+
+    def make_batch_request(self, calls):
+        """
+        Send several (method, params) calls as one JSON-RPC batch.
+        Results are returned in the order of the calls, failed calls as None.
+        """
+        payload = [
+            {"jsonrpc": "2.0", "method": method, "params": params, "id": index}
+            for index, (method, params) in enumerate(calls)
+        ]
+        response = self.session.post(
+            self.endpoint_uri, json=payload, **self.get_request_kwargs()
+        )
+        response.raise_for_status()
+        responses = response.json()
+        if not isinstance(responses, list):
+            raise ValueError(f"RPC does not support batch requests: {responses}")
+
+        results = [None] * len(calls)
+        for item in responses:
+            results[item["id"]] = item.get("result")
+        return results
+
+
+class Web3ProviderRegistry:
+    """
+    Process-wide registry of Web3 instances keyed by (rpc url, poa).
+
+    Providers are built once and reuse a pooled HTTP session, the connection is
+    only health checked once every WEB3_HEALTH_CHECK_INTERVAL seconds and contract
+    objects are cached per (provider, address, abi).
+    """
+
+    _lock = threading.Lock()
+    _providers = {}
+    _last_health_check = {}
+    _contracts = {}
+
+    @staticmethod
+    def build_session() -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=settings.WEB3_POOL_CONNECTIONS,
+            pool_maxsize=settings.WEB3_POOL_MAXSIZE,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    @classmethod
+    def get_w3(cls, rpc_url, poa=False) -> Web3:
+        key = (rpc_url, bool(poa))
+        w3 = cls._providers.get(key)
+        if w3 is not None:
+            return w3
+        with cls._lock:
+            w3 = cls._providers.get(key)
+            if w3 is None:
+                provider = PooledHTTPProvider(
+                    rpc_url,
+                    session=cls.build_session(),
+                    request_kwargs={"timeout": settings.WEB3_REQUEST_TIMEOUT},
+                )
+                w3 = Web3(provider)
+                if poa:
+                    w3.middleware_onion.inject(geth_poa_middleware, layer=0)
+                cls._providers[key] = w3
+        return w3
+
+    @classmethod
+    def get_healthy_w3(cls, rpc_url, poa=False) -> Web3:
+        key = (rpc_url, bool(poa))
+        w3 = cls.get_w3(rpc_url, poa)
+        last_check = cls._last_health_check.get(key)
+        now = time.monotonic()
+        if last_check and now - last_check < settings.WEB3_HEALTH_CHECK_INTERVAL:
+            return w3
+        if w3.is_connected():
+            cls._last_health_check[key] = now
+            return w3
+        cls.evict(rpc_url, poa)
+        raise Exception(f"RPC provider is not connected ({rpc_url})")
+
+    @classmethod
+    def get_contract(cls, rpc_url, poa, address, abi) -> Contract:
+        key = (rpc_url, bool(poa), address, id(abi))
+        cached = cls._contracts.get(key)
+        # the abi is kept with the contract so its id can not be reused
+        if cached is not None and cached[0] is abi:
+            return cached[1]
+        contract = cls.get_w3(rpc_url, poa).eth.contract(address=address, abi=abi)
+        cls._contracts[key] = (abi, contract)
+        return contract
+
+    @classmethod
+    def evict(cls, rpc_url, poa=False):
+        key = (rpc_url, bool(poa))
+        with cls._lock:
+            w3 = cls._providers.pop(key, None)
+            cls._last_health_check.pop(key, None)
+            for contract_key in [k for k in cls._contracts if k[:2] == key]:
+                cls._contracts.pop(contract_key, None)
+        if w3 is not None:
+            w3.provider.session.close()
+
+    @classmethod
+    def clear(cls):
+        for rpc_url, poa in list(cls._providers):
+            cls.evict(rpc_url, poa)
+
+
 class Web3Utils:
     LOG_STRICT = STRICT
     LOG_IGNORE = IGNORE
@@ -145,24 +285,13 @@ class Web3Utils:
 
     def __init__(self, rpc_url, poa=False) -> None:
         self._rpc_url = rpc_url
-        self._w3 = None
         self._account = None
         self._contract = None
         self._poa = poa
 
     @property
     def w3(self) -> Web3:
-        if self._w3 and self._w3.is_connected():
-            return self._w3
-
-        self._w3 = Web3(Web3.HTTPProvider(self._rpc_url))
-        if self.poa:
-            self._w3.middleware_onion.inject(geth_poa_middleware, layer=0)
-
-        if self._w3.is_connected():
-            return self._w3
-
-        raise Exception(f"RPC provider is not connected ({self._rpc_url})")
+        return Web3ProviderRegistry.get_healthy_w3(self._rpc_url, self.poa)
 
     @property
     def poa(self):
@@ -180,7 +309,9 @@ class Web3Utils:
         return self._contract
 
     def set_contract(self, address, abi):
-        self._contract = self.w3.eth.contract(address=address, abi=abi)
+        self._contract = Web3ProviderRegistry.get_contract(
+            self._rpc_url, self.poa, address, abi
+        )
 
     def get_contract_function(self, func_name: str):
         func = getattr(self.contract.functions, func_name)
@@ -199,13 +330,32 @@ class Web3Utils:
     def get_gas_estimate(self, func: Type[ContractFunction]):
         return func.estimate_gas({"from": self.account.address})
 
+    def get_transaction_count(self, address, block_identifier="pending"):
+        return self.w3.eth.get_transaction_count(address, block_identifier)
+
     def build_contract_txn(self, func: Type[ContractFunction], **kwargs):
-        nonce = self.w3.eth.get_transaction_count(self.account.address)
+        nonce = kwargs.pop("nonce", None)
+        if nonce is None:
+            nonce = self.get_transaction_count(self.account.address)
         tx_data = func.build_transaction(
             {"from": self.account.address, "nonce": nonce, **kwargs}
         )
         return self.sign_tx(tx_data)
 
+    def build_transfer_txn(self, to, value: int, **kwargs):
+        nonce = kwargs.pop("nonce", None)
+        if nonce is None:
+            nonce = self.get_transaction_count(self.account.address)
+        tx_data = {
+            "from": self.account.address,
+            "to": to,
+            "value": value,
+            "nonce": nonce,
+            "chainId": self.w3.eth.chain_id,
+            **kwargs,
+        }
+        return self.sign_tx(tx_data)
+
     def sign_tx(self, tx_data: TxParams):
         return self.w3.eth.account.sign_transaction(tx_data, self.account.key)
 
@@ -218,6 +368,9 @@ class Web3Utils:
     def get_current_block(self):
         return self.w3.eth.block_number
 
+    def get_block_gas_limit(self, block_identifier="latest"):
+        return self.w3.eth.get_block(block_identifier)["gasLimit"]
+
     def get_transaction_by_hash(self, tx_hash):
         return self.w3.eth.get_transaction(tx_hash)
 
@@ -247,10 +400,131 @@ class Web3Utils:
     def get_transaction_receipt(self, tx_hash):
         return self.w3.eth.get_transaction_receipt(tx_hash)
 
+    def batch_request(self, calls):
+        return self.w3.provider.make_batch_request(calls)
+
     def get_balance(self, address):
         return self.w3.eth.get_balance(address)
 
 
+class ConfirmationTracker:
+    """
+    Looks up the receipts of all outstanding transactions of a chain in one
+    JSON-RPC batch request, so no worker ever waits for a receipt.
+    A receipt only counts once it is `confirmations` blocks deep.
+    """
+
+    # quantities of a raw receipt, the other fields are kept as they are
+    RECEIPT_QUANTITY_FIELDS = (
+        "blockNumber",
+        "cumulativeGasUsed",
+        "effectiveGasPrice",
+        "gasUsed",
+        "status",
+        "transactionIndex",
+        "type",
+    )
+    LOG_QUANTITY_FIELDS = ("blockNumber", "logIndex", "transactionIndex")
+    LOG_BYTES_FIELDS = ("blockHash", "data", "transactionHash")
+
+    def __init__(self, rpc_url, poa=False, confirmations=1) -> None:
+        self.web3_utils = Web3Utils(rpc_url, poa)
+        self.confirmations = max(confirmations, 1)
+
+    @classmethod
+    def for_chain(cls, chain):
+        return cls(chain.rpc_url_private, chain.poa, chain.confirmations)
+
+    def get_receipts(self, tx_hashes):
+        """confirmed receipts by tx hash, pending transactions are left out"""
+        tx_hashes = list(dict.fromkeys(tx_hash for tx_hash in tx_hashes if tx_hash))
+        if not tx_hashes:
+            return {}
+
+        try:
+            block_number, *receipts = self.web3_utils.batch_request(
+                [("eth_blockNumber", [])]
+                + [("eth_getTransactionReceipt", [tx_hash]) for tx_hash in tx_hashes]
+            )
+            block_number = int(block_number, 16)
+            receipts = [self.format_receipt(r) if r else None for r in receipts]
+        except Exception as e:
+            logging.warning(f"Batch receipt lookup failed, checking one by one: {e}")
+            block_number = self.web3_utils.get_current_block()
+            receipts = [self._get_receipt(tx_hash) for tx_hash in tx_hashes]
+
+        return {
+            tx_hash: receipt
+            for tx_hash, receipt in zip(tx_hashes, receipts)
+            if receipt is not None
+            and block_number - receipt["blockNumber"] + 1 >= self.confirmations
+        }
+
+    @classmethod
+    def format_receipt(cls, receipt: dict) -> dict:
+        receipt = cls._format_fields(receipt, cls.RECEIPT_QUANTITY_FIELDS)
+        if "logs" in receipt:
+            # like web3 does, so the events can be decoded by process_receipt
+            receipt["logs"] = [cls.format_log(log) for log in receipt["logs"]]
+        return receipt
+
+    @classmethod
+    def format_log(cls, log: dict) -> dict:
+        log = cls._format_fields(log, cls.LOG_QUANTITY_FIELDS, cls.LOG_BYTES_FIELDS)
+        if "address" in log:
+            log["address"] = Web3.to_checksum_address(log["address"])
+        if "topics" in log:
+            log["topics"] = [HexBytes(topic) for topic in log["topics"]]
+        return log
+
+    @staticmethod
+    def _format_fields(entry: dict, quantity_fields, bytes_fields=()) -> dict:
+        formatted = {}
+        for key, value in entry.items():
+            if key in quantity_fields and isinstance(value, str):
+                value = int(value, 16)
+            elif key in bytes_fields and isinstance(value, str):
+                value = HexBytes(value)
+            formatted[key] = value
+        return formatted
+
+    def _get_receipt(self, tx_hash):
+        try:
+            return self.web3_utils.get_transaction_receipt(tx_hash)
+        except web3.exceptions.TransactionNotFound:
+            return None
+
+    @classmethod
+    def get_receipts_by_chain(cls, chain_tx_hashes):
+        """receipts of (chain, tx_hash) pairs, with one batch request per chain"""
+        tx_hashes_by_chain = {}
+        for chain, tx_hash in chain_tx_hashes:
+            tx_hashes_by_chain.setdefault(chain.pk, (chain, []))[1].append(tx_hash)
+
+        receipts = {}
+        for chain, tx_hashes in tx_hashes_by_chain.values():
+            try:
+                receipts.update(cls.for_chain(chain).get_receipts(tx_hashes))
+            except Exception as e:
+                logging.exception(f"Could not check receipts on {chain}: {e}")
+        return receipts
+
+    @staticmethod
+    def next_countdown(key, progressed):
+        """
+        Seconds until the next check, doubled on every check that resolved
+        nothing and reset as soon as something was resolved
+        """
+        cache_key = f"confirmation-backoff-{key}"
+        last_countdown = cache.get(cache_key)
+        if progressed or last_countdown is None:
+            countdown = settings.CONFIRMATION_MIN_BACKOFF
+        else:
+            countdown = min(last_countdown * 2, settings.CONFIRMATION_MAX_BACKOFF)
+        cache.set(cache_key, countdown, settings.CONFIRMATION_MAX_BACKOFF * 2)
+        return countdown
+
+
 class SolanaWeb3Utils:
     def __init__(self, rpc_url) -> None:
         self.rpc_url = rpc_url
@@ -271,6 +545,83 @@ class InvalidAddressException(Exception):
     pass
 
 
+class MulticallClient:
+    """
+    Run the read calls of one chain in a single Multicall3 aggregate3 call, or in
+    one JSON-RPC batch of eth_call where Multicall3 is not deployed. Results keep
+    the order of the calls, failed calls are None.
+    """
+
+    _deployed = {}
+
+    def __init__(self, web3_utils: Web3Utils) -> None:
+        self.web3_utils = web3_utils
+
+    @classmethod
+    def for_chain(cls, chain):
+        return cls(Web3Utils(chain.rpc_url_private, chain.poa))
+
+    def is_deployed(self) -> bool:
+        rpc_url = self.web3_utils._rpc_url
+        if rpc_url not in self._deployed:
+            code = self.web3_utils.w3.eth.get_code(MULTICALL3_ADDRESS)
+            self._deployed[rpc_url] = len(code) > 0
+        return self._deployed[rpc_url]
+
+    @property
+    def multicall(self) -> Contract:
+        return Web3ProviderRegistry.get_contract(
+            self.web3_utils._rpc_url,
+            self.web3_utils.poa,
+            MULTICALL3_ADDRESS,
+            MULTICALL3_ABI,
+        )
+
+    def call(self, funcs: list[ContractFunction]) -> list:
+        if not funcs:
+            return []
+        calls = [(func.address, func._encode_transaction_data()) for func in funcs]
+        if self.is_deployed():
+            results = self.multicall.functions.aggregate3(
+                [(target, True, data) for target, data in calls]
+            ).call()
+            return_data = [data if success else None for success, data in results]
+        else:
+            return_data = self.web3_utils.batch_request(
+                [
+                    ("eth_call", [{"to": target, "data": data}, "latest"])
+                    for target, data in calls
+                ]
+            )
+        return [self.decode(func, data) for func, data in zip(funcs, return_data)]
+
+    def get_eth_balances(self, addresses: list[str]) -> list:
+        if self.is_deployed():
+            return self.call(
+                [
+                    self.multicall.functions.getEthBalance(address)
+                    for address in addresses
+                ]
+            )
+        results = self.web3_utils.batch_request(
+            [("eth_getBalance", [address, "latest"]) for address in addresses]
+        )
+        return [None if result is None else int(result, 16) for result in results]
+
+    def decode(self, func: ContractFunction, data):
+        # an empty result is what calling an address without code returns
+        if not data or data == "0x":
+            return None
+        try:
+            values = self.web3_utils.w3.codec.decode(
+                [collapse_if_tuple(output) for output in func.abi["outputs"]],
+                HexBytes(data),
+            )
+        except DecodingError:
+            return None
+        return values[0] if len(values) == 1 else values
+
+
 class NFTClient:
     def __init__(
         self,
@@ -291,6 +642,17 @@ class NFTClient:
         ):
             raise InvalidAddressException("Invalid contract address")
 
+    def get_numbers_of_tokens(self, addresses: list[str]) -> list[int]:
+        results = MulticallClient(self.web3_utils).call(
+            [
+                self.web3_utils.contract.functions.balanceOf(address)
+                for address in addresses
+            ]
+        )
+        if None in results:
+            raise InvalidAddressException("Invalid contract address")
+        return results
+
     def to_checksum_address(self, address: str):
         return self.web3_utils.w3.to_checksum_address(address)
 
@@ -302,6 +664,7 @@ class TokenClient:
         contract=None,
         abi=ERC20_METHODS,
     ) -> None:
+        self.chain = chain
         self.web3_utils = Web3Utils(chain.rpc_url_private, chain.poa)
         if contract:
             self.web3_utils.set_contract(self.to_checksum_address(contract), abi)
@@ -318,6 +681,31 @@ class TokenClient:
         ):
             raise InvalidAddressException("Invalid contract address")
 
+    def get_non_native_token_balances(self, addresses: list[str]) -> list[int]:
+        if not self.web3_utils.contract:
+            raise InvalidAddressException("Invalid contract address")
+        results = MulticallClient(self.web3_utils).call(
+            [
+                self.web3_utils.contract.functions.balanceOf(
+                    self.to_checksum_address(address)
+                )
+                for address in addresses
+            ]
+        )
+        if None in results:
+            raise InvalidAddressException("Invalid contract address")
+        return results
+
+    def get_native_token_balances(self, addresses: list[str]) -> list[int]:
+        if self.web3_utils.contract:
+            raise InvalidAddressException("Invalid contract address")
+        results = MulticallClient(self.web3_utils).get_eth_balances(
+            [self.to_checksum_address(address) for address in addresses]
+        )
+        if None in results:
+            raise InvalidAddressException("Invalid user address")
+        return results
+
     def get_native_token_balance(self, address: str):
         address = self.to_checksum_address(address)
         if self.web3_utils.contract:
@@ -330,11 +718,11 @@ class TokenClient:
         ):
             raise InvalidAddressException("Invalid contract address")
 
-    def get_non_native_token_transfer_amount(self, address: str):
+    def get_non_native_token_transfer_amount(self, address: str, from_block=0):
         if not self.web3_utils.contract:
             raise InvalidAddressException("Invalid contract address")
         transfer_event = self.web3_utils.contract.events.Transfer.get_logs(
-            fromBlock=0,
+            fromBlock=from_block,
             argument_filters={
                 "from": address,
             },
@@ -344,6 +732,20 @@ class TokenClient:
             total_transferred += event.args.value
         return total_transferred
 
+    def get_delegates_and_balances(self, addresses: list[str]) -> list[tuple]:
+        """
+        (delegate, balance) of every address, in one multicall
+        """
+        if not self.web3_utils.contract:
+            raise InvalidAddressException("Invalid contract address")
+        funcs = []
+        for address in addresses:
+            address = self.to_checksum_address(address)
+            funcs.append(self.web3_utils.contract.functions.delegates(address))
+            funcs.append(self.web3_utils.contract.functions.balanceOf(address))
+        results = MulticallClient(self.web3_utils).call(funcs)
+        return list(zip(results[::2], results[1::2]))
+
     def get_delegates_address(self, address: str):
         if not self.web3_utils.contract:
             raise InvalidAddressException("Invalid contract address")
@@ -399,11 +801,11 @@ class RequestContextExtractor:
 
 
 
-def cache_constraint_result(cache_key, is_verified, constraint, info):
-    caching_time = constraint.valid_cache_until if is_verified else constraint.invalid_cache_until
+def cache_constraint_result(cache_key, is_observed, constraint, info):
+    caching_time = constraint.valid_cache_until if is_observed else constraint.invalid_cache_until
     expiration_time = time.time() + caching_time
     cache_data = {
-        "is_verified": is_verified,
+        "is_observed": is_observed,
         "info": info,
         "expiration_time": expiration_time,
     }
@@ -411,4 +813,17 @@ def cache_constraint_result(cache_key, is_verified, constraint, info):
         return cache_data
     
     cache.set(cache_key, cache_data, caching_time)
-    return cache_data
\ No newline at end of file
+    return cache_data
+
+
+def get_constraint_cache_version(user_profile_id):
+    key = f"constraint-version-{user_profile_id}"
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key, "")
+    return version
+
+
+def invalidate_constraint_cache(user_profile_id):
+    cache.delete(f"constraint-version-{user_profile_id}")
@@ -3,11 +3,16 @@ from safedelete.admin import SafeDeleteAdmin, SafeDeleteAdminFilter, highlight_d
 
 from .models import (
     BrightUser,
+    ClaimCounter,
+    ClaimLedger,
     ClaimReceipt,
     DonationContract,
     DonationReceipt,
     Faucet,
+    FaucetSnapshot,
+    FuelChampion,
     GlobalSettings,
+    LeaderboardEntry,
     TransactionBatch,
 )
 
@@ -87,6 +92,20 @@ class ClaimReceiptAdmin(admin.ModelAdmin):
             return obj.batch.tx_hash
 
 
+class FaucetSnapshotAdmin(admin.ModelAdmin):
+    list_display = [
+        "pk",
+        "faucet",
+        "has_enough_funds",
+        "has_enough_fees",
+        "remaining_claim_number",
+        "current_fuel_level",
+        "updated_at",
+        "is_stale",
+    ]
+    list_filter = ["has_enough_funds", "has_enough_fees"]
+
+
 class GlobalSettingsAdmin(admin.ModelAdmin):
     list_display = ["pk", "index", "value"]
     list_editable = ["value"]
@@ -97,17 +116,38 @@ class TransactionBatchAdmin(admin.ModelAdmin):
         "pk",
         "_status",
         "tx_hash",
+        "nonce",
         "updating",
         "faucet",
         "age",
         "is_expired",
         "claims_count",
+        "gas_used",
         # "claims_amount",
     ]
-    search_fields = ["tx_hash"]
+    search_fields = ["tx_hash", "cancel_tx_hash"]
     list_filter = ["faucet", "_status", "updating"]
 
 
+class ClaimCounterAdmin(admin.ModelAdmin):
+    list_display = ["pk", "faucet", "round_start", "count"]
+    list_filter = ["faucet"]
+
+
+class ClaimLedgerAdmin(admin.ModelAdmin):
+    list_display = [
+        "pk",
+        "user_profile",
+        "chain",
+        "round_start",
+        "claimed_amount",
+        "pending_count",
+        "claims_count",
+    ]
+    list_filter = ["chain"]
+    search_fields = ["user_profile__username"]
+
+
 class DonationReceiptAdmin(admin.ModelAdmin):
     list_display = [
         "tx_hash",
@@ -122,6 +162,17 @@ class DonationReceiptAdmin(admin.ModelAdmin):
     list_filter = ["faucet"]
 
 
+class FuelChampionAdmin(admin.ModelAdmin):
+    list_display = ["pk", "faucet", "round_start", "user_profile", "value"]
+    list_filter = ["faucet"]
+
+
+class LeaderboardEntryAdmin(admin.ModelAdmin):
+    list_display = ["pk", "user_profile", "faucet", "sum_total_price"]
+    list_filter = ["faucet"]
+    search_fields = ["user_profile__username"]
+
+
 class DonationContractAdmin(SafeDeleteAdmin):
     list_display = (
         highlight_deleted,
@@ -138,7 +189,12 @@ class DonationContractAdmin(SafeDeleteAdmin):
 admin.site.register(Faucet, FaucetAdmin)
 admin.site.register(BrightUser, BrightUserAdmin)
 admin.site.register(ClaimReceipt, ClaimReceiptAdmin)
+admin.site.register(ClaimCounter, ClaimCounterAdmin)
+admin.site.register(ClaimLedger, ClaimLedgerAdmin)
+admin.site.register(FaucetSnapshot, FaucetSnapshotAdmin)
 admin.site.register(GlobalSettings, GlobalSettingsAdmin)
 admin.site.register(TransactionBatch, TransactionBatchAdmin)
 admin.site.register(DonationReceipt, DonationReceiptAdmin)
+admin.site.register(LeaderboardEntry, LeaderboardEntryAdmin)
+admin.site.register(FuelChampion, FuelChampionAdmin)
 admin.site.register(DonationContract, DonationContractAdmin)
@@ -2,34 +2,87 @@ import decimal
 import logging
 import math
 import os
+from collections import Counter
 
 import requests
 import web3.exceptions
-from django.core.cache import cache
 from django.db import transaction
 from django.db.models import F, Func
 from django.utils import timezone
 from sentry_sdk import capture_exception
 
-from core.models import TokenPrice
-from core.utils import Web3Utils
+from core.models import NetworkTypes, TokenPrice
+from core.utils import ConfirmationTracker, Web3Utils
 from faucet.faucet_manager.claim_manager import RoundCreditStrategy
 
-from .constants import FUEL_LEVEL_STATUS_NUMBER
+from .constants import (
+    BASE_TX_GAS,
+    BATCH_BLOCK_GAS_SHARE,
+    BATCH_GAS_HISTORY,
+    DEFAULT_BATCH_SIZE,
+    FUEL_LEVEL_STATUS_NUMBER,
+)
 from .faucet_manager.fund_manager import FundMangerException, get_fund_manager
 from .models import (
+    ClaimCounter,
+    ClaimLedger,
     ClaimReceipt,
     DonationContract,
     DonationReceipt,
     Faucet,
+    FaucetSnapshot,
+    FuelChampion,
+    GlobalSettings,
+    LeaderboardEntry,
     TransactionBatch,
 )
 
 
-def has_pending_batch(faucet):
+def count_in_flight_batches(faucet):
     return TransactionBatch.objects.filter(
         faucet=faucet, _status=ClaimReceipt.PENDING
-    ).exists()
+    ).count()
+
+
+def get_max_in_flight_batches():
+    return int(GlobalSettings.get("gastap_max_in_flight_batches", "3"))
+
+
+def get_gas_per_claim(chain):
+    """
+    Gas each claim added to a batch on this chain, measured on the recent batches.
+    Uses the gas actually used when it is known and the estimate otherwise.
+    """
+    recent_batches = (
+        TransactionBatch.objects.filter(
+            faucet__chain=chain, size__gt=0, gas_estimate__isnull=False
+        )
+        .order_by("-pk")
+        .values_list("size", "gas_estimate", "gas_used")[:BATCH_GAS_HISTORY]
+    )
+    return max(
+        [
+            max((gas_used or gas_estimate) - BASE_TX_GAS, 0) / size
+            for size, gas_estimate, gas_used in recent_batches
+        ],
+        default=None,
+    )
+
+
+def get_batch_size_limit(faucet):
+    """
+    Number of claims that fit in a share of the chain block gas limit.
+    Falls back to the default size until the chain has some batch history.
+    """
+    max_size = int(GlobalSettings.get("gastap_max_batch_size", "128"))
+    snapshot = faucet.get_snapshot()
+    block_gas_limit = snapshot.block_gas_limit if snapshot else None
+    gas_per_claim = get_gas_per_claim(faucet.chain)
+    if not block_gas_limit or not gas_per_claim:
+        return min(DEFAULT_BATCH_SIZE, max_size)
+
+    size = int((block_gas_limit * BATCH_BLOCK_GAS_SHARE - BASE_TX_GAS) // gas_per_claim)
+    return max(1, min(size, max_size))
 
 
 class CeleryTasks:
@@ -45,28 +98,29 @@ class CeleryTasks:
 
             batch = TransactionBatch.objects.get(pk=batch_pk)
             if not batch.should_be_processed:
-                return
+                return batch
             if batch.is_expired:
+                if batch.nonce is not None:
+                    try:
+                        get_fund_manager(batch.faucet).fill_nonce_gap(batch)
+                    except Exception as e:
+                        capture_exception()
+                        logging.exception(str(e))
                 batch._status = ClaimReceipt.REJECTED
-                batch.save()
-                batch.claims.update(_status=batch._status)
-                return
-
-            data = [
-                {
-                    "to": receipt.to_address,
-                    "amount": int(receipt.amount),
-                }
-                for receipt in batch.claims.all()
-            ]
-            #####
-            print(data)
+                with transaction.atomic():
+                    batch.save()
+                    ClaimLedger.update_claims_status(batch.claims, batch._status)
+                try:
+                    # a nonce that could not be filled leaves the counter ahead
+                    get_fund_manager(batch.faucet).resync_nonce()
+                except Exception as e:
+                    capture_exception()
+                    logging.exception(str(e))
+                return batch
 
             try:
                 manager = get_fund_manager(batch.faucet)
-                tx_hash = manager.multi_transfer(data)
-                batch.tx_hash = tx_hash
-                batch.save()
+                manager.send_batch(batch)
             except FundMangerException.GasPriceTooHigh as e:
                 logging.exception(e)
             except FundMangerException.RPCError as e:
@@ -74,11 +128,12 @@ class CeleryTasks:
             except Exception as e:
                 capture_exception()
                 logging.exception(str(e))
+            return batch
         except TransactionBatch.DoesNotExist:
             pass
 
     @staticmethod
-    def update_pending_batch_with_tx_hash(batch_pk):
+    def update_pending_batch_with_tx_hash(batch_pk, receipts=None):
         # only one ongoing update per batch
         logging.info("Updating Batch")
         try:
@@ -87,30 +142,80 @@ class CeleryTasks:
             return
         try:
             if not batch.status_should_be_updated:
-                return
+                return batch
             manager = get_fund_manager(batch.faucet)
 
-            if manager.is_tx_verified(batch.tx_hash):
-                batch._status = ClaimReceipt.VERIFIED
-            elif batch.is_expired:
-                batch._status = ClaimReceipt.REJECTED
+            status = manager.get_batch_status(batch, receipts)
+            if status is not None:
+                batch._status = status
+            elif batch.is_stuck:
+                manager.replace_stuck_batch(batch)
         except Exception as e:
-            if batch.is_expired:
+            # a batch that owns a nonce is only given up on through a cancel tx
+            if batch.is_stuck and (batch.nonce is None or batch.cancel_tx_hash):
                 batch._status = ClaimReceipt.REJECTED
             capture_exception()
             logging.exception(str(e))
         finally:
-            batch.save()
-            batch.claims.update(_status=batch._status)
+            with transaction.atomic():
+                batch.save()
+                if batch._status == ClaimReceipt.VERIFIED:
+                    CeleryTasks.count_verified_claims(batch)
+                ClaimLedger.update_claims_status(batch.claims, batch._status)
+        return batch
+
+    @staticmethod
+    def count_verified_claims(batch):
+        claim_datetimes = (
+            batch.claims.select_for_update()
+            .exclude(_status=ClaimReceipt.VERIFIED)
+            .values_list("datetime", flat=True)
+        )
+        rounds = Counter(
+            RoundCreditStrategy.get_round_start(claim_datetime)
+            for claim_datetime in claim_datetimes
+        )
+        for round_start, count in rounds.items():
+            ClaimCounter.increment(batch.faucet_id, round_start, count)
+
+    @staticmethod
+    def update_chain_pending_batches(chain_id):
+        """
+        Update every broadcast batch of the chain, their receipts are looked up
+        together in a single batch request
+        """
+        batches = list(
+            TransactionBatch.objects.filter(
+                faucet__chain_id=chain_id, _status=ClaimReceipt.PENDING
+            )
+            .exclude(tx_hash=None)
+            .select_related("faucet__chain")
+        )
+        if not batches:
+            return []
+
+        chain = batches[0].faucet.chain
+        receipts = None
+        if chain.chain_type != NetworkTypes.SOLANA:
+            receipts = ConfirmationTracker.for_chain(chain).get_receipts(
+                tx_hash
+                for batch in batches
+                for tx_hash in batch.tx_hashes + [batch.cancel_tx_hash]
+            )
+        return [
+            CeleryTasks.update_pending_batch_with_tx_hash(batch.pk, receipts)
+            for batch in batches
+        ]
 
     @staticmethod
     def reject_expired_pending_claims():
-        ClaimReceipt.objects.filter(
+        expired_claims = ClaimReceipt.objects.filter(
             batch=None,
             _status=ClaimReceipt.PENDING,
             datetime__lte=timezone.now()
             - timezone.timedelta(minutes=ClaimReceipt.MAX_PENDING_DURATION),
-        ).update(_status=ClaimReceipt.REJECTED)
+        )
+        ClaimLedger.update_claims_status(expired_claims, ClaimReceipt.REJECTED)
 
     @staticmethod
     def process_faucet_pending_claims(faucet_id):
@@ -119,88 +224,101 @@ class CeleryTasks:
                 pk=faucet_id
             )  # lock based on chain
 
-            # all pending batches must be resolved before new transactions can be made
-            if has_pending_batch(faucet):
+            # each batch holds its own nonce, so a few of them may be in flight
+            if count_in_flight_batches(faucet) >= get_max_in_flight_batches():
                 return
 
-            # get all pending receipts for this chain
             # pending receipts are receipts that have not been batched yet
-            receipts = ClaimReceipt.objects.filter(
+            pending_receipts = ClaimReceipt.objects.filter(
                 faucet=faucet, _status=ClaimReceipt.PENDING, batch=None
             )
-
-            if receipts.count() == 0:
+            if not pending_receipts.exists():
                 return
 
-            receipts = receipts.order_by("pk")[:32]
-
-            # if there are no pending batches, create a new batch
-            batch = TransactionBatch.objects.create(faucet=faucet)
-
-            # assign the batch to the receipts
-            for receipt in receipts:
-                receipt.batch = batch
-                receipt.save()
-
-    @staticmethod
-    def update_needs_funding_status_faucet(faucet_id):
-        try:
-            faucet = Faucet.objects.get(pk=faucet_id)
-            # if it has enough funds and enough fees, needs_funding is False
-
-            faucet.needs_funding = True
-
-            if faucet.has_enough_funds and faucet.chain.has_enough_fees:
-                faucet.needs_funding = False
+            size_limit = get_batch_size_limit(faucet)
+            batch = TransactionBatch.objects.create(
+                faucet=faucet, size_limit=size_limit
+            )
 
-            faucet.save()
-        except Exception as e:
-            logging.exception(str(e))
-            capture_exception()
+            # assign the batch to the oldest receipts in a single UPDATE
+            size = ClaimReceipt.objects.filter(
+                pk__in=pending_receipts.order_by("pk")
+                .select_for_update(skip_locked=True)
+                .values("pk")[:size_limit]
+            ).update(batch=batch)
+            if size == 0:
+                batch.delete()
+                return
+            batch.size = size
+            batch.save(update_fields=["size"])
+            return batch
 
     @staticmethod
-    def update_remaining_claim_number(faucet_id):
-        try:
-            faucet = Faucet.objects.get(pk=faucet_id)
-            fund_manager_balance = decimal.Decimal(faucet.manager_balance)
-            max_claim = decimal.Decimal(faucet.max_claim_amount)
-            remaining_claim_number = fund_manager_balance // max_claim
-            cache.set(
-                f"{faucet_id}_remaining_claim_number",
-                remaining_claim_number,
-                timeout=600,
+    def refresh_chain_snapshot(chain_id):
+        """
+        Read balances and gas price of a chain once and store them, together with
+        the derived funding state of every active faucet on it, in FaucetSnapshot
+        """
+        faucets = list(
+            Faucet.objects.filter(chain_id=chain_id, is_active=True).select_related(
+                "chain", "chain__wallet"
             )
-        except Exception as e:
-            logging.error(str(e))
-            capture_exception()
-
-    @staticmethod
-    def update_current_fuel_level_faucet(faucet_id):
-        try:
-            # TODO: must check chain wallet balance and gasprice
-            remaining_claim_number = cache.get(f"{faucet_id}_remaining_claim_number")
-            if remaining_claim_number is None:
-                return
-            faucet = Faucet.objects.get(pk=faucet_id)
+        )
+        if not faucets:
+            return
+        chain = faucets[0].chain
 
-            float_fuel_level = (
-                remaining_claim_number * FUEL_LEVEL_STATUS_NUMBER
-            ) / faucet.fuel_level
-            fuel_level = math.ceil(float_fuel_level)
-            fuel_level = min(FUEL_LEVEL_STATUS_NUMBER, fuel_level)
+        wallet_balance = chain.get_wallet_balance()
+        gas_price = chain.gas_price
+        block_gas_limit = chain.block_gas_limit
+        has_enough_fees = wallet_balance > gas_price * chain.enough_fee_multiplier
+        if not has_enough_fees:
+            logging.warning(f"Chain {chain.chain_name} has insufficient fees in wallet")
 
-            cache.set(f"{faucet_id}_current_fuel_level", fuel_level, timeout=600)
-        except Exception as e:
-            logging.error(str(e))
-            capture_exception()
+        for faucet in faucets:
+            try:
+                manager_balance = faucet.get_manager_balance()
+                max_claim = decimal.Decimal(faucet.max_claim_amount)
+                has_enough_funds = manager_balance > max_claim
+                if not has_enough_funds:
+                    logging.warning(
+                        f"Faucet {faucet.pk}-{chain.chain_name} "
+                        "has insufficient funds in contract"
+                    )
 
-    @staticmethod
-    def empty_used_unitap_pass_list(faucet_id):
-        faucet = Faucet.objects.get(pk=faucet_id)
-        if faucet.is_one_time_claim:
-            return
-        faucet.used_unitap_pass_list = []
-        faucet.save()
+                remaining_claim_number = (
+                    int(decimal.Decimal(manager_balance) // max_claim)
+                    if max_claim > 0
+                    else 0
+                )
+                fuel_level = math.ceil(
+                    (remaining_claim_number * FUEL_LEVEL_STATUS_NUMBER)
+                    / faucet.fuel_level
+                )
+                fuel_level = min(FUEL_LEVEL_STATUS_NUMBER, fuel_level)
+
+                FaucetSnapshot.objects.update_or_create(
+                    faucet=faucet,
+                    defaults={
+                        "manager_balance": manager_balance,
+                        "wallet_balance": wallet_balance,
+                        "gas_price": gas_price,
+                        "has_enough_funds": has_enough_funds,
+                        "has_enough_fees": has_enough_fees,
+                        "remaining_claim_number": remaining_claim_number,
+                        "current_fuel_level": fuel_level,
+                        "block_gas_limit": block_gas_limit,
+                    },
+                )
+
+                # if it has enough funds and enough fees, needs_funding is False
+                needs_funding = not (has_enough_funds and has_enough_fees)
+                if faucet.needs_funding != needs_funding:
+                    faucet.needs_funding = needs_funding
+                    faucet.save(update_fields=["needs_funding"])
+            except Exception as e:
+                logging.exception(str(e))
+                capture_exception()
 
     @staticmethod
     def update_token_price(token_pk):
@@ -242,7 +360,36 @@ class CeleryTasks:
             )
 
     @staticmethod
-    def process_donation_receipt(donation_receipt_pk):
+    def process_chain_donation_receipts(chain_id):
+        """
+        Process the pending donations of a chain whose transactions are confirmed,
+        the others stay pending until a later check or until they expire
+        """
+        donation_receipts = list(
+            DonationReceipt.objects.filter(
+                status=ClaimReceipt.PENDING, faucet__chain_id=chain_id
+            ).select_related("faucet__chain")
+        )
+        if not donation_receipts:
+            return 0
+        receipts = ConfirmationTracker.for_chain(
+            donation_receipts[0].faucet.chain
+        ).get_receipts(
+            donation_receipt.tx_hash for donation_receipt in donation_receipts
+        )
+        for donation_receipt in donation_receipts:
+            if donation_receipt.tx_hash in receipts:
+                CeleryTasks.process_donation_receipt(
+                    donation_receipt.pk, receipts[donation_receipt.tx_hash]
+                )
+            elif donation_receipt.is_expired:
+                # dropped or never broadcast, it would stay pending forever
+                donation_receipt.status = ClaimReceipt.REJECTED
+                donation_receipt.save()
+        return len(receipts)
+
+    @staticmethod
+    def process_donation_receipt(donation_receipt_pk, receipt=None):
         donation_receipt = DonationReceipt.objects.get(pk=donation_receipt_pk)
         faucet = donation_receipt.faucet
         evm_fund_manager = get_fund_manager(faucet)
@@ -258,7 +405,17 @@ class CeleryTasks:
                 f"donation contract for faucet {faucet.chain} does not exists"
             )
         try:
-            if not evm_fund_manager.is_tx_verified(donation_receipt.tx_hash):
+            if receipt is None:
+                receipt = evm_fund_manager.get_tx_receipts(
+                    [donation_receipt.tx_hash]
+                ).get(donation_receipt.tx_hash)
+                if receipt is None:
+                    # not confirmed yet, it is checked again later
+                    if donation_receipt.is_expired:
+                        donation_receipt.status = ClaimReceipt.REJECTED
+                        donation_receipt.save()
+                    return
+            if receipt["status"] != 1:
                 donation_receipt.status = ClaimReceipt.REJECTED
                 donation_receipt.save()
                 return
@@ -281,14 +438,13 @@ class CeleryTasks:
                 donation_receipt.status = ClaimReceipt.REJECTED
                 donation_receipt.save()
                 return
-            donation_receipt.value = str(evm_fund_manager.from_wei(tx.get("value")))
+            donation_receipt.value = evm_fund_manager.from_wei(tx.get("value"))
             if not faucet.chain.is_testnet:
                 try:
                     token_price = TokenPrice.objects.get(symbol=faucet.chain.symbol)
-                    donation_receipt.total_price = str(
-                        decimal.Decimal(donation_receipt.value)
-                        * decimal.Decimal(token_price.usd_price)
-                    )
+                    donation_receipt.total_price = decimal.Decimal(
+                        donation_receipt.value
+                    ) * decimal.Decimal(token_price.usd_price)
                 except TokenPrice.DoesNotExist:
                     logging.error(
                         f"TokenPrice for Chain: "
@@ -299,9 +455,11 @@ class CeleryTasks:
                     donation_receipt.save()
                     return
             else:
-                donation_receipt.total_price = str(0)
-            donation_receipt.status = ClaimReceipt.VERIFIED
-            donation_receipt.save()
+                donation_receipt.total_price = 0
+            with transaction.atomic():
+                donation_receipt.status = ClaimReceipt.VERIFIED
+                donation_receipt.save()
+                LeaderboardEntry.add_donation(donation_receipt)
         except (web3.exceptions.TransactionNotFound, web3.exceptions.TimeExhausted):
             donation_receipt.status = ClaimReceipt.REJECTED
             donation_receipt.save()
@@ -310,23 +468,33 @@ class CeleryTasks:
     @staticmethod
     def update_claims_for_faucet(faucet_id, since_last_round):
         faucet = Faucet.objects.get(pk=faucet_id)
+        total_claims = ClaimCounter.get_count(
+            faucet, RoundCreditStrategy.get_start_of_the_round()
+        )
         if since_last_round:
-            start_time = RoundCreditStrategy.get_start_of_previous_round()
+            total_claims += ClaimCounter.get_count(
+                faucet, RoundCreditStrategy.get_start_of_previous_round()
+            )
             claim_field = "total_claims_since_last_round"
         else:
-            start_time = RoundCreditStrategy.get_start_of_the_round()
             claim_field = "total_claims_this_round"
 
-        total_claims = ClaimReceipt.objects.filter(
-            faucet=faucet, datetime__gte=start_time, _status__in=[ClaimReceipt.VERIFIED]
-        ).count()
-
         setattr(faucet, claim_field, total_claims)
-        faucet.save()
+        faucet.save(update_fields=[claim_field])
 
     @staticmethod
-    def remove_unitap_pass_used_in_each_faucet(faucet_id):
-        with transaction.atomic():
-            faucet = Faucet.objects.select_for_update().get(pk=faucet_id)
-            faucet.used_unitap_pass_list = []
-            faucet.save(update_fields=["used_unitap_pass_list"])
+    def refresh_fuel_champions():
+        """
+        Recompute the champions of the current round, donations are normally
+        picked up as they get verified so this only catches up on missed ones
+        """
+        round_start = RoundCreditStrategy.get_start_of_the_round()
+        faucet_ids = (
+            DonationReceipt.objects.filter(
+                status=ClaimReceipt.VERIFIED, datetime__gt=round_start
+            )
+            .values_list("faucet", flat=True)
+            .distinct()
+        )
+        for faucet_id in faucet_ids:
+            FuelChampion.refresh(faucet_id, round_start)
@@ -0,0 +1,107 @@
+import datetime
+from collections import Counter, defaultdict
+
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDay
+
+from faucet.faucet_manager.credit_strategy import RoundCreditStrategy
+from faucet.models import BrightUser, ClaimLedger, ClaimReceipt
+
+
+def build_claim_counters(counter_model, receipt_model):
+    """claim counters computed from the receipts history"""
+    verified_claims = receipt_model.objects.filter(
+        _status__in=[ClaimReceipt.VERIFIED, BrightUser.VERIFIED]
+    )
+    faucets = Counter(verified_claims.values_list("faucet", flat=True).iterator())
+    rounds = Counter(
+        (faucet_id, RoundCreditStrategy.get_round_start(claim_datetime))
+        for faucet_id, claim_datetime in verified_claims.filter(
+            _status=ClaimReceipt.VERIFIED
+        )
+        .values_list("faucet", "datetime")
+        .iterator()
+    )
+    return (
+        [counter_model(count=sum(faucets.values()))]
+        + [
+            counter_model(faucet_id=faucet_id, count=count)
+            for faucet_id, count in faucets.items()
+        ]
+        + [
+            counter_model(faucet_id=faucet_id, round_start=round_start, count=count)
+            for (faucet_id, round_start), count in rounds.items()
+        ]
+    )
+
+
+def build_claim_ledgers(ledger_model, receipt_model):
+    """claim ledger rows computed from the receipts history"""
+    # rounds start on a utc midnight, so summing per day and folding the days into
+    # their rounds keeps the aggregation in the database
+    rows = (
+        receipt_model.objects.exclude(user_profile=None)
+        .annotate(day=TruncDay("datetime", tzinfo=datetime.timezone.utc))
+        .values("user_profile", "faucet__chain", "day")
+        .annotate(
+            claimed_amount=Sum(
+                "amount", filter=Q(_status=ClaimReceipt.VERIFIED), default=0
+            ),
+            pending_count=Count("pk", filter=Q(_status=ClaimReceipt.PENDING)),
+            claims_count=Count("pk", filter=Q(_status__in=ClaimLedger.ROUND_STATUSES)),
+        )
+    )
+    ledgers = defaultdict(lambda: [0, 0, 0])
+    for row in rows.iterator():
+        ledger = ledgers[
+            (
+                row["user_profile"],
+                row["faucet__chain"],
+                RoundCreditStrategy.get_round_start(row["day"]),
+            )
+        ]
+        ledger[0] += row["claimed_amount"]
+        ledger[1] += row["pending_count"]
+        ledger[2] += row["claims_count"]
+    return [
+        ledger_model(
+            user_profile_id=user_profile_id,
+            chain_id=chain_id,
+            round_start=round_start,
+            claimed_amount=claimed_amount,
+            pending_count=pending_count,
+            claims_count=claims_count,
+        )
+        for (user_profile_id, chain_id, round_start), (
+            claimed_amount,
+            pending_count,
+            claims_count,
+        ) in ledgers.items()
+    ]
+
+
+def build_leaderboard_entries(entry_model, donation_model):
+    """leaderboard entries computed from the verified donations"""
+    verified_donations = donation_model.objects.filter(status=ClaimReceipt.VERIFIED)
+    interacted_chains = defaultdict(set)
+    for user_profile_id, chain_id in verified_donations.values_list(
+        "user_profile", "faucet__chain"
+    ).distinct():
+        interacted_chains[user_profile_id].add(chain_id)
+
+    totals = defaultdict(int)
+    for row in verified_donations.values("user_profile", "faucet").annotate(
+        sum_total_price=Sum("total_price", default=0)
+    ):
+        totals[(row["user_profile"], row["faucet"])] += row["sum_total_price"]
+        totals[(row["user_profile"], None)] += row["sum_total_price"]
+
+    return [
+        entry_model(
+            user_profile_id=user_profile_id,
+            faucet_id=faucet_id,
+            sum_total_price=sum_total_price,
+            interacted_chains=sorted(interacted_chains[user_profile_id]),
+        )
+        for (user_profile_id, faucet_id), sum_total_price in totals.items()
+    ]
@@ -1 +1,14 @@
 FUEL_LEVEL_STATUS_NUMBER = 10
+
+DEFAULT_BATCH_SIZE = 32
+# a batch should not take more than this share of a block
+BATCH_BLOCK_GAS_SHARE = 0.3
+BASE_TX_GAS = 21000
+BATCH_GAS_HISTORY = 5
+
+# seconds a new claim waits so a burst of claims ends up in one batch
+CLAIM_COALESCE_WINDOW = 2
+BATCH_STATUS_POLL_INTERVAL = 10
+
+FAUCET_LIST_VERSION_KEY = "gastap_faucet_list_version"
+FAUCET_LIST_CACHE_TIMEOUT = 180
@@ -1,10 +1,10 @@
-import requests
 import json
 import time
-import requests
 import base64
 import ed25519
 
+from core.request_helper import RequestHelper
+
 # http://node.brightid.org/brightid/v6/verifications/unitap/53735351-050d-4284-a362-620b1992be9a
 
 
@@ -16,10 +16,12 @@ class BrightIDInterface:
         return f"https://{network}.brightid.org/link-verification/{self.app_name}/{context_id}"
 
     def get_verification_status(self, context_id, network="node"):
-        response = requests.get(
+        response = RequestHelper().request(
+            "GET",
             f"http://{network}.brightid.org/brightid/"
-            f"v6/verifications/{self.app_name}/{context_id}"
-        ).json()
+            f"v6/verifications/{self.app_name}/{context_id}",
+        )
+        response = response.json()
         if "error" in response:
             return False
         data = response.get("data")
@@ -44,7 +46,7 @@ class BrightIDInterface:
         message = json.dumps(op, sort_keys=True, separators=(",", ":")).encode("ascii")
         sig = signing_key.sign(message)
         op["sig"] = base64.b64encode(sig).decode("ascii")
-        r = requests.post(URL, json.dumps(op))
+        r = RequestHelper().request("POST", URL, data=json.dumps(op))
         print("res: ", r.json())
         if r.status_code != 200 or "error" in r.json():
             return False
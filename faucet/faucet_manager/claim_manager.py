@@ -3,16 +3,18 @@ from abc import ABC
 
 import rest_framework.exceptions
 from django.db import transaction
+from django.db.models import Sum
 from django.utils import timezone
 
 from authentication.models import UserProfile
+from core.models import UnitapPassUsage
 from faucet.faucet_manager.credit_strategy import (
     CreditStrategy,
     CreditStrategyFactory,
     RoundCreditStrategy,
 )
 from faucet.faucet_manager.fund_manager import EVMFundManager
-from faucet.models import BrightUser, ClaimReceipt, GlobalSettings
+from faucet.models import ClaimLedger, ClaimReceipt, GlobalSettings
 
 
 class ClaimManager(ABC):
@@ -39,38 +41,45 @@ class SimpleClaimManager(ClaimManager):
                 pk=self.credit_strategy.user_profile.pk
             )
             self.assert_pre_claim_conditions(amount, user_profile, ups)
-            return self.create_pending_claim_receipt(
-                amount, to_address, ups
-            )  # all pending claims will be processed periodically
+            return self.create_pending_claim_receipt(amount, to_address, ups)
 
     def assert_pre_claim_conditions(self, amount, user_profile, ups=[]):
-        assert amount <= self.credit_strategy.get_unclaimed()
+        balance = ClaimLedger.get_balance(
+            user_profile,
+            self.credit_strategy.faucet.chain_id,
+            self.credit_strategy.get_claimed_since(),
+        )
+        self.assert_balance_conditions(amount, balance)
         # assert self.user_is_meet_verified() is True
-        used_unitap_pass = set(self.credit_strategy.faucet.used_unitap_pass_list)
-        not_used_unitap_pass = set(ups) - used_unitap_pass
-        assert len(ups) == 0 or len(not_used_unitap_pass) != 0
-        assert not ClaimReceipt.objects.filter(
-            faucet__chain=self.credit_strategy.faucet.chain,
-            user_profile=user_profile,
-            _status=ClaimReceipt.PENDING,
-        ).exists()
+        reserved_unitap_passes = self.reserve_unitap_passes(ups)
+        assert len(ups) == 0 or len(reserved_unitap_passes) != 0
+
+    def assert_balance_conditions(self, amount, balance):
+        assert amount <= self.credit_strategy.get_unclaimed(balance["claimed"])
+        assert balance["pending"] == 0
+
+    def get_unitap_pass_round(self):
+        # passes of one time faucets are never used again
+        if self.credit_strategy.faucet.is_one_time_claim:
+            return None
+        return RoundCreditStrategy.get_start_of_the_round()
+
+    def reserve_unitap_passes(self, ups):
+        return UnitapPassUsage.reserve(
+            UnitapPassUsage.get_scope(self.credit_strategy.faucet),
+            ups,
+            self.get_unitap_pass_round(),
+        )
 
     def create_pending_claim_receipt(self, amount, to_address, ups=[]):
+        from faucet.tasks import schedule_faucet_pending_claims
+
         if to_address is None:
             raise rest_framework.exceptions.ParseError("wallet address is required")
         _faucet = self.credit_strategy.faucet
         _user_profile = self.credit_strategy.user_profile
 
-        used_unitap_pass = set(self.credit_strategy.faucet.used_unitap_pass_list)
-        not_used_unitap_pass = set(ups) - used_unitap_pass
-        _faucet.used_unitap_pass_list.extend(list(not_used_unitap_pass))
-        _faucet.save(
-            update_fields=[
-                "used_unitap_pass_list",
-            ]
-        )
-
-        return ClaimReceipt.objects.create(
+        claim_receipt = ClaimReceipt.objects.create(
             faucet_id=_faucet.pk,
             user_profile=_user_profile,
             datetime=timezone.now(),
@@ -78,6 +87,8 @@ class SimpleClaimManager(ClaimManager):
             _status=ClaimReceipt.PENDING,
             to_address=to_address,
         )
+        transaction.on_commit(lambda: schedule_faucet_pending_claims(_faucet.pk))
+        return claim_receipt
 
     def get_credit_strategy(self) -> CreditStrategy:
         return self.credit_strategy
@@ -94,21 +105,13 @@ class LimitedChainClaimManager(SimpleClaimManager):
     @staticmethod
     def get_total_round_claims(user_profile):
         start_of_the_round = RoundCreditStrategy.get_start_of_the_round()
-        return ClaimReceipt.objects.filter(
-            user_profile=user_profile,
-            _status__in=[
-                ClaimReceipt.PENDING,
-                ClaimReceipt.VERIFIED,
-                BrightUser.PENDING,
-                BrightUser.VERIFIED,
-            ],
-            datetime__gte=start_of_the_round,
-        ).count()
-
-    def assert_pre_claim_conditions(self, amount, user_profile, ups):
-        super().assert_pre_claim_conditions(amount, user_profile, ups)
-        total_claims = self.get_total_round_claims(user_profile)
-        assert total_claims < self.get_round_limit()
+        return ClaimLedger.objects.filter(
+            user_profile=user_profile, round_start=start_of_the_round
+        ).aggregate(total=Sum("claims_count", default=0))["total"]
+
+    def assert_balance_conditions(self, amount, balance):
+        super().assert_balance_conditions(amount, balance)
+        assert balance["round_claims"] < self.get_round_limit()
 
 
 class ClaimManagerFactory:
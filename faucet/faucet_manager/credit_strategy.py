@@ -4,11 +4,10 @@ from abc import ABC
 from time import time
 
 import pytz
-from django.db.models import Sum
 from django.utils import timezone
 
 from authentication.models import UserProfile
-from faucet.models import ClaimReceipt, Faucet
+from faucet.models import ClaimLedger, ClaimReceipt, Faucet
 
 
 class CreditStrategy(ABC):
@@ -41,15 +40,21 @@ class SimpleCreditStrategy(CreditStrategy):
             _status=ClaimReceipt.VERIFIED,
         )
 
+    def get_claimed_since(self):
+        return None
+
+    def get_balance(self):
+        return ClaimLedger.get_balance(
+            self.user_profile, self.faucet.chain_id, self.get_claimed_since()
+        )
+
     def get_claimed(self):
-        aggregate = self.get_claim_receipts().aggregate(Sum("amount"))
-        _sum = aggregate.get("amount__sum")
-        if not _sum:
-            return 0
-        return _sum
+        return int(self.get_balance()["claimed"])
 
-    def get_unclaimed(self):
-        return int(self.faucet.max_claim_amount) - int(self.get_claimed())
+    def get_unclaimed(self, claimed=None):
+        if claimed is None:
+            claimed = self.get_claimed()
+        return int(self.faucet.max_claim_amount) - int(claimed)
 
 
 class RoundCreditStrategy(SimpleCreditStrategy):
@@ -65,6 +70,9 @@ class RoundCreditStrategy(SimpleCreditStrategy):
             datetime__gte=self.get_start_of_the_round(),
         )
 
+    def get_claimed_since(self):
+        return self.get_start_of_the_round()
+
     @staticmethod
     def get_start_of_the_round():
         return RoundCreditStrategy._get_first_day_of_the_week()
@@ -91,9 +99,14 @@ class RoundCreditStrategy(SimpleCreditStrategy):
         )
         return first_day_of_last_month
 
+    @staticmethod
+    def get_round_start(at):
+        return RoundCreditStrategy._get_first_day_of_the_week(int(at.timestamp()))
+
     @classmethod
-    def _get_first_day_of_the_week(cls):
-        now = int(time())
+    def _get_first_day_of_the_week(cls, now=None):
+        if now is None:
+            now = int(time())
         day = 86400  # seconds in a day
         week = 7 * day
         weeks = now // week  # number of weeks since epoch
@@ -142,6 +155,9 @@ class OneTimeCreditStrategy(SimpleCreditStrategy):
             ),  # also change in views.py
         )
 
+    def get_claimed_since(self):
+        return datetime.datetime(2023, 12, 18, 0, 0, 0, 0, pytz.timezone("UTC"))
+
 
 class CreditStrategyFactory:
     def __init__(self, faucet: Faucet, user_profile):
@@ -1,5 +1,7 @@
 import logging
+import math
 
+from django.utils import timezone
 from eth_account.signers.local import LocalAccount
 from solana.rpc.api import Client
 from solana.rpc.core import RPCException, RPCNoResultException
@@ -10,9 +12,10 @@ from solders.signature import Signature
 from solders.transaction_status import TransactionConfirmationStatus
 
 from authentication.models import NetworkTypes
-from core.utils import Web3Utils
+from core.models import AccountNonce
+from core.utils import ConfirmationTracker, Web3Utils
 from faucet.faucet_manager.fund_manager_abi import manager_abi
-from faucet.models import BrightUser, Faucet
+from faucet.models import BrightUser, ClaimReceipt, Faucet, TransactionBatch
 
 from .anchor_client import instructions
 from .anchor_client.accounts.lock_account import LockAccount
@@ -41,6 +44,11 @@ def get_fund_manager(faucet: Faucet):
 
 
 class EVMFundManager:
+    # nodes only accept a replacement with at least 10% higher gas price
+    REPLACEMENT_GAS_BUMP = 1.125
+    # the counter is only reset when no nonce was allocated for this long
+    NONCE_IDLE_SECONDS = 60
+
     def __init__(self, faucet: Faucet):
         self.faucet = faucet
         self.chain = faucet.chain
@@ -65,48 +73,176 @@ class EVMFundManager:
             logging.error(e)
             return True
 
+    def get_broadcast_gas_price(self, replaced_gas_price=None):
+        gas_price = int(self.get_gas_price() * self.chain.gas_multiplier)
+        if replaced_gas_price:
+            gas_price = max(
+                gas_price, math.ceil(replaced_gas_price * self.REPLACEMENT_GAS_BUMP)
+            )
+        return gas_price
+
     def get_balance(self, address):
         return self.web3_utils.get_balance(address)
 
     def get_fund_manager_checksum_address(self):
         return self.web3_utils.to_checksum_address(self.faucet.fund_manager_address)
 
+    def allocate_nonce(self):
+        address = self.web3_utils.account.address
+        return AccountNonce.allocate(
+            self.chain, address, self.web3_utils.get_transaction_count(address)
+        )
+
     def transfer(self, bright_user: BrightUser, amount: int):
         return self._transfer("withdrawEth", amount, bright_user.address)
 
-    def multi_transfer(self, data):
-        return self._transfer("multiWithdrawEth", data)
+    def multi_transfer(self, data, **tx_params):
+        return self._transfer("multiWithdrawEth", data, **tx_params)
 
-    def _transfer(self, tx_function_str, *args):
-        tx = self.prepare_tx_for_broadcast(tx_function_str, *args)
+    def _transfer(self, tx_function_str, *args, **tx_params):
+        tx = self.prepare_tx_for_broadcast(tx_function_str, *args, **tx_params)
         try:
             self.web3_utils.send_raw_tx(tx)
             return tx["hash"].hex()
         except Exception as e:
             raise FundMangerException.RPCError(str(e))
 
-    def prepare_tx_for_broadcast(self, tx_function_str, *args):
-        tx_function = self.web3_utils.get_contract_function(tx_function_str)(*args)
-        gas_estimation = self.web3_utils.get_gas_estimate(tx_function)
+    def estimate_gas(self, tx_function_str, *args):
         if self.chain.chain_id == "997":
-            gas_estimation = 100000
+            return 100000
+        tx_function = self.web3_utils.get_contract_function(tx_function_str)(*args)
+        return self.web3_utils.get_gas_estimate(tx_function)
+
+    def prepare_tx_for_broadcast(
+        self, tx_function_str, *args, nonce=None, gas_price=None, gas=None
+    ):
+        tx_function = self.web3_utils.get_contract_function(tx_function_str)(*args)
+        gas_estimation = gas or self.estimate_gas(tx_function_str, *args)
 
         if self.is_gas_price_too_high:
             raise FundMangerException.GasPriceTooHigh("Gas price is too high")
 
         tx_params = {
             "gas": gas_estimation,
-            "gasPrice": int(
-                self.web3_utils.get_gas_price() * self.chain.gas_multiplier
-            ),
+            "gasPrice": gas_price or self.get_broadcast_gas_price(),
         }
+        if nonce is not None:
+            tx_params["nonce"] = nonce
 
         signed_tx = self.web3_utils.build_contract_txn(tx_function, **tx_params)
         return signed_tx
 
+    def send_batch(self, batch: TransactionBatch):
+        """
+        Broadcast the batch with its own nonce. A batch that was already
+        broadcast is replaced with the same nonce and a bumped gas price.
+        """
+        if batch.nonce is None:
+            # persist the nonce before broadcasting so it is never lost
+            batch.nonce = self.allocate_nonce()
+            batch.save(update_fields=["nonce"])
+
+        data = batch.transfer_data
+        gas_estimate = self.estimate_gas("multiWithdrawEth", data)
+        gas_price = self.get_broadcast_gas_price(batch.gas_price)
+        tx_hash = self.multi_transfer(
+            data, nonce=batch.nonce, gas_price=gas_price, gas=gas_estimate
+        )
+
+        if batch.tx_hash:
+            batch.replaced_tx_hashes.append(batch.tx_hash)
+        batch.tx_hash = tx_hash
+        batch.gas_price = gas_price
+        batch.gas_estimate = gas_estimate
+        batch.broadcast_at = timezone.now()
+        batch.save(
+            update_fields=[
+                "tx_hash",
+                "gas_price",
+                "gas_estimate",
+                "broadcast_at",
+                "replaced_tx_hashes",
+            ]
+        )
+        return tx_hash
+
+    def cancel_nonce(self, nonce, replaced_gas_price=None):
+        """occupy the nonce with an empty self transfer"""
+        address = self.web3_utils.account.address
+        tx = self.web3_utils.build_transfer_txn(
+            address,
+            0,
+            nonce=nonce,
+            gas=21000,
+            gasPrice=self.get_broadcast_gas_price(replaced_gas_price),
+        )
+        try:
+            self.web3_utils.send_raw_tx(tx)
+            return tx["hash"].hex()
+        except Exception as e:
+            raise FundMangerException.RPCError(str(e))
+
+    def fill_nonce_gap(self, batch: TransactionBatch):
+        """
+        A batch that got a nonce but was never broadcast would block every later
+        transaction of the wallet, so its nonce is filled with a cancel transaction
+        """
+        if batch.nonce is None or batch.tx_hash:
+            return
+        batch.cancel_tx_hash = self.cancel_nonce(batch.nonce)
+        batch.save(update_fields=["cancel_tx_hash"])
+
+    def resync_nonce(self) -> bool:
+        """
+        Reset the local nonce counter when the network is behind it. Skipped
+        while a pending batch holds a nonce of the gap, that nonce would be
+        handed out twice.
+        """
+        address = self.web3_utils.account.address
+        network_nonce = self.web3_utils.get_transaction_count(address)
+        if TransactionBatch.objects.filter(
+            faucet__chain=self.chain,
+            _status=ClaimReceipt.PENDING,
+            nonce__gte=network_nonce,
+        ).exists():
+            return False
+        return AccountNonce.reset(
+            self.chain, address, network_nonce, idle_for=self.NONCE_IDLE_SECONDS
+        )
+
+    def replace_stuck_batch(self, batch: TransactionBatch):
+        """speed up a stuck batch once, then cancel it"""
+        if batch.can_be_sped_up:
+            self.send_batch(batch)
+        elif batch.nonce is not None and batch.cancel_tx_hash is None:
+            batch.cancel_tx_hash = self.cancel_nonce(batch.nonce, batch.gas_price)
+            batch.broadcast_at = timezone.now()
+            batch.save(update_fields=["cancel_tx_hash", "broadcast_at"])
+        else:
+            batch._status = ClaimReceipt.REJECTED
+
+    def get_tx_receipts(self, tx_hashes):
+        """confirmed receipts by tx hash, without waiting on pending ones"""
+        return ConfirmationTracker.for_chain(self.chain).get_receipts(tx_hashes)
+
+    def get_batch_status(self, batch: TransactionBatch, receipts=None):
+        if receipts is None:
+            receipts = self.get_tx_receipts(batch.tx_hashes + [batch.cancel_tx_hash])
+        for tx_hash in batch.tx_hashes:
+            receipt = receipts.get(tx_hash)
+            if receipt is not None:
+                # kept on the batch to tune the batch size of the chain
+                batch.gas_used = receipt["gasUsed"]
+                if receipt["status"] == 1:
+                    return ClaimReceipt.VERIFIED
+                return ClaimReceipt.REJECTED
+        if batch.cancel_tx_hash and batch.cancel_tx_hash in receipts:
+            return ClaimReceipt.REJECTED
+        return None
+
     def is_tx_verified(self, tx_hash):
-        receipt = self.web3_utils.wait_for_transaction_receipt(tx_hash)
-        if receipt["status"] == 1:
+        receipt = self.get_tx_receipts([tx_hash]).get(tx_hash)
+        if receipt is not None and receipt["status"] == 1:
             return True
         return False
 
@@ -201,6 +337,27 @@ class SolanaFundManager:
             logging.warning(ex)
             return True
 
+    def send_batch(self, batch: TransactionBatch):
+        tx_hash = self.multi_transfer(batch.transfer_data)
+        batch.tx_hash = tx_hash
+        batch.broadcast_at = timezone.now()
+        batch.save(update_fields=["tx_hash", "broadcast_at"])
+        return tx_hash
+
+    def fill_nonce_gap(self, batch: TransactionBatch):
+        pass
+
+    def resync_nonce(self) -> bool:
+        return False
+
+    def replace_stuck_batch(self, batch: TransactionBatch):
+        batch._status = ClaimReceipt.REJECTED
+
+    def get_batch_status(self, batch: TransactionBatch, receipts=None):
+        if self.is_tx_verified(batch.tx_hash):
+            return ClaimReceipt.VERIFIED
+        return None
+
     def multi_transfer(self, data):
         if self.is_initialized:
             instruction = [
@@ -14,3 +14,14 @@ class FaucetFilterBackend(filters.BaseFilterBackend):
         if faucet_pk is None:
             return queryset
         return queryset.filter(faucet=get_object_or_404(Faucet, pk=faucet_pk))
+
+
+class LeaderboardFaucetFilterBackend(FaucetFilterBackend):
+    """
+    Leaderboard entries without a faucet rank donations over every faucet
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if request.query_params.get("faucet_pk") is None:
+            return queryset.filter(faucet=None)
+        return super().filter_queryset(request, queryset, view)
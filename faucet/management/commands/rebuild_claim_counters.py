@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from faucet.claim_history import build_claim_counters
+from faucet.models import ClaimCounter, ClaimReceipt
+
+
+class Command(BaseCommand):
+    help = "Rebuild the claim counters from the claim receipts history"
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        # hold back verifications until the counters are replaced, they would
+        # be lost otherwise
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"LOCK TABLE {ClaimCounter._meta.db_table} IN EXCLUSIVE MODE"
+            )
+        counters = build_claim_counters(ClaimCounter, ClaimReceipt)
+
+        ClaimCounter.objects.all().delete()
+        ClaimCounter.objects.bulk_create(counters)
+
+        self.stdout.write(f"Rebuilt {len(counters)} claim counters")
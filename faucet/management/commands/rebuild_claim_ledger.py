@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from faucet.claim_history import build_claim_ledgers
+from faucet.models import ClaimLedger, ClaimReceipt
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per user, chain and round claim ledger from the claim receipts"
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        # hold back claims made meanwhile, their changes would be lost otherwise
+        with connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {ClaimLedger._meta.db_table} IN EXCLUSIVE MODE")
+        ledgers = build_claim_ledgers(ClaimLedger, ClaimReceipt)
+
+        ClaimLedger.objects.all().delete()
+        ClaimLedger.objects.bulk_create(ledgers, batch_size=1000)
+
+        self.stdout.write(f"Rebuilt {len(ledgers)} claim ledger rows")
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from faucet.claim_history import build_leaderboard_entries
+from faucet.models import DonationReceipt, LeaderboardEntry
+
+
+class Command(BaseCommand):
+    help = "Rebuild the donation leaderboard from the donation receipts"
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        # hold back donations verified meanwhile, they would be lost otherwise
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"LOCK TABLE {LeaderboardEntry._meta.db_table} IN EXCLUSIVE MODE"
+            )
+        entries = build_leaderboard_entries(LeaderboardEntry, DonationReceipt)
+
+        LeaderboardEntry.objects.all().delete()
+        LeaderboardEntry.objects.bulk_create(entries, batch_size=1000)
+
+        self.stdout.write(f"Rebuilt {len(entries)} leaderboard entries")
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.2 on 2026-10-17 02:26
+
+import core.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("faucet", "0078_alter_faucet_used_unitap_pass_list"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FaucetSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("manager_balance", core.models.BigNumField(default=0, max_length=200)),
+                ("wallet_balance", core.models.BigNumField(default=0, max_length=200)),
+                ("gas_price", core.models.BigNumField(default=0, max_length=200)),
+                ("has_enough_funds", models.BooleanField(default=False)),
+                ("has_enough_fees", models.BooleanField(default=False)),
+                ("remaining_claim_number", models.IntegerField(default=-1)),
+                ("current_fuel_level", models.IntegerField(default=-1)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "faucet",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="snapshot",
+                        to="faucet.faucet",
+                    ),
+                ),
+            ],
+        ),
+    ]
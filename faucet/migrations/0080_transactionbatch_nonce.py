@@ -0,0 +1,43 @@
+# Generated by Django 5.1.2 on 2026-10-17 02:33
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("faucet", "0079_faucetsnapshot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transactionbatch",
+            name="broadcast_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="transactionbatch",
+            name="cancel_tx_hash",
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name="transactionbatch",
+            name="gas_price",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="transactionbatch",
+            name="nonce",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="transactionbatch",
+            name="replaced_tx_hashes",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.CharField(max_length=255),
+                blank=True,
+                default=list,
+                size=None,
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.2 on 2026-10-17 02:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("faucet", "0080_transactionbatch_nonce"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="faucetsnapshot",
+            name="block_gas_limit",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="transactionbatch",
+            name="gas_estimate",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="transactionbatch",
+            name="gas_used",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="transactionbatch",
+            name="size",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="transactionbatch",
+            name="size_limit",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,105 @@
+# Generated by Django 5.1.2 on 2026-10-17 02:50
+
+import datetime
+from collections import Counter
+
+import django.db.models.deletion
+import django.db.models.functions.comparison
+from django.db import migrations, models
+from django.utils import timezone
+
+# frozen copies of the statuses and the round arithmetic of the time, so the
+# backfill does not depend on the current models
+VERIFIED_STATUSES = ["Verified", "1"]
+VERIFIED = "Verified"
+
+
+def get_round_start(at):
+    """the monday midnight (RoundCreditStrategy.get_round_start) before at"""
+    now = int(at.timestamp())
+    week = 7 * 86400
+    last_monday_midnight = 345600 + (now // week) * week
+    if last_monday_midnight > now:
+        last_monday_midnight -= week
+    return timezone.make_aware(datetime.datetime.fromtimestamp(last_monday_midnight))
+
+
+def backfill_claim_counters(apps, schema_editor):
+    ClaimCounter = apps.get_model("faucet", "ClaimCounter")
+    ClaimReceipt = apps.get_model("faucet", "ClaimReceipt")
+    verified_claims = ClaimReceipt.objects.filter(_status__in=VERIFIED_STATUSES)
+    faucets = Counter(verified_claims.values_list("faucet", flat=True).iterator())
+    rounds = Counter(
+        (faucet_id, get_round_start(claim_datetime))
+        for faucet_id, claim_datetime in verified_claims.filter(_status=VERIFIED)
+        .values_list("faucet", "datetime")
+        .iterator()
+    )
+    ClaimCounter.objects.bulk_create(
+        [ClaimCounter(count=sum(faucets.values()))]
+        + [
+            ClaimCounter(faucet_id=faucet_id, count=count)
+            for faucet_id, count in faucets.items()
+        ]
+        + [
+            ClaimCounter(faucet_id=faucet_id, round_start=round_start, count=count)
+            for (faucet_id, round_start), count in rounds.items()
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("faucet", "0081_transactionbatch_size"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ClaimCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("round_start", models.DateTimeField(blank=True, null=True)),
+                ("count", models.PositiveBigIntegerField(default=0)),
+                (
+                    "faucet",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="claim_counters",
+                        to="faucet.faucet",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        django.db.models.functions.comparison.Coalesce(
+                            "faucet", models.Value(0)
+                        ),
+                        models.F("round_start"),
+                        condition=models.Q(("round_start__isnull", False)),
+                        name="unique_round_claim_counter",
+                    ),
+                    models.UniqueConstraint(
+                        django.db.models.functions.comparison.Coalesce(
+                            "faucet", models.Value(0)
+                        ),
+                        condition=models.Q(("round_start__isnull", True)),
+                        name="unique_all_time_claim_counter",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(
+            backfill_claim_counters, reverse_code=migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,143 @@
+# Generated by Django 5.1.2 on 2026-10-17 02:56
+
+from collections import defaultdict
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+import django.db.models.functions.comparison
+from django.db import migrations, models
+from django.db.models import Sum
+
+# frozen copy of the status of the time, so the backfill does not depend on the
+# current models
+VERIFIED = "Verified"
+
+
+def backfill_leaderboard(apps, schema_editor):
+    LeaderboardEntry = apps.get_model("faucet", "LeaderboardEntry")
+    DonationReceipt = apps.get_model("faucet", "DonationReceipt")
+    verified_donations = DonationReceipt.objects.filter(status=VERIFIED)
+    interacted_chains = defaultdict(set)
+    for user_profile_id, chain_id in verified_donations.values_list(
+        "user_profile", "faucet__chain"
+    ).distinct():
+        interacted_chains[user_profile_id].add(chain_id)
+
+    totals = defaultdict(int)
+    for row in verified_donations.values("user_profile", "faucet").annotate(
+        sum_total_price=Sum("total_price", default=0)
+    ):
+        totals[(row["user_profile"], row["faucet"])] += row["sum_total_price"]
+        totals[(row["user_profile"], None)] += row["sum_total_price"]
+
+    LeaderboardEntry.objects.bulk_create(
+        [
+            LeaderboardEntry(
+                user_profile_id=user_profile_id,
+                faucet_id=faucet_id,
+                sum_total_price=sum_total_price,
+                interacted_chains=sorted(interacted_chains[user_profile_id]),
+            )
+            for (user_profile_id, faucet_id), sum_total_price in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0042_twitterconnection_twitter_id"),
+        ("faucet", "0082_claimcounter"),
+    ]
+
+    operations = [
+        # values that can't be cast to numeric are dropped
+        migrations.RunSQL(
+            """
+            UPDATE faucet_donationreceipt SET value = NULL
+            WHERE value !~ '^\\s*[-+]?([0-9]+\\.?[0-9]*|\\.[0-9]+)([eE][-+]?[0-9]+)?\\s*$';
+            UPDATE faucet_donationreceipt SET total_price = NULL
+            WHERE total_price !~ '^\\s*[-+]?([0-9]+\\.?[0-9]*|\\.[0-9]+)([eE][-+]?[0-9]+)?\\s*$';
+            """,
+            migrations.RunSQL.noop,
+        ),
+        migrations.AlterField(
+            model_name="donationreceipt",
+            name="total_price",
+            field=models.DecimalField(
+                blank=True, decimal_places=18, max_digits=78, null=True
+            ),
+        ),
+        migrations.AlterField(
+            model_name="donationreceipt",
+            name="value",
+            field=models.DecimalField(
+                blank=True, decimal_places=18, max_digits=78, null=True
+            ),
+        ),
+        migrations.CreateModel(
+            name="LeaderboardEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "sum_total_price",
+                    models.DecimalField(decimal_places=18, default=0, max_digits=78),
+                ),
+                (
+                    "interacted_chains",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.IntegerField(),
+                        blank=True,
+                        default=list,
+                        size=None,
+                    ),
+                ),
+                (
+                    "faucet",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="leaderboard_entries",
+                        to="faucet.faucet",
+                    ),
+                ),
+                (
+                    "user_profile",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="leaderboard_entries",
+                        to="authentication.userprofile",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["faucet", "sum_total_price"],
+                        name="faucet_lead_faucet__156b16_idx",
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        django.db.models.functions.comparison.Coalesce(
+                            "faucet", models.Value(0)
+                        ),
+                        models.F("user_profile"),
+                        name="unique_leaderboard_entry",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(
+            backfill_leaderboard, reverse_code=migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.1.2 on 2026-10-17 02:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0042_twitterconnection_twitter_id"),
+        ("faucet", "0083_leaderboardentry"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FuelChampion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("round_start", models.DateTimeField()),
+                (
+                    "value",
+                    models.DecimalField(decimal_places=18, default=0, max_digits=78),
+                ),
+                (
+                    "faucet",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="fuel_champions",
+                        to="faucet.faucet",
+                    ),
+                ),
+                (
+                    "user_profile",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="fuel_championships",
+                        to="authentication.userprofile",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("round_start", "faucet")},
+            },
+        ),
+    ]
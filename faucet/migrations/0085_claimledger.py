@@ -0,0 +1,123 @@
+# Generated by Django 5.1.2 on 2026-10-17 03:02
+
+import datetime
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDay
+from django.utils import timezone
+
+# frozen copies of the statuses and the round arithmetic of the time, so the
+# backfill does not depend on the current models
+PENDING = "Pending"
+VERIFIED = "Verified"
+ROUND_STATUSES = ["Pending", "Verified", "0", "1"]
+
+
+def get_round_start(at):
+    """the monday midnight (RoundCreditStrategy.get_round_start) before at"""
+    now = int(at.timestamp())
+    week = 7 * 86400
+    last_monday_midnight = 345600 + (now // week) * week
+    if last_monday_midnight > now:
+        last_monday_midnight -= week
+    return timezone.make_aware(datetime.datetime.fromtimestamp(last_monday_midnight))
+
+
+def backfill_claim_ledger(apps, schema_editor):
+    ClaimLedger = apps.get_model("faucet", "ClaimLedger")
+    ClaimReceipt = apps.get_model("faucet", "ClaimReceipt")
+    # rounds start on a utc midnight, so the receipts are summed per day and the
+    # days are folded into their rounds
+    rows = (
+        ClaimReceipt.objects.exclude(user_profile=None)
+        .annotate(day=TruncDay("datetime", tzinfo=datetime.timezone.utc))
+        .values("user_profile", "faucet__chain", "day")
+        .annotate(
+            claimed_amount=Sum("amount", filter=Q(_status=VERIFIED), default=0),
+            pending_count=Count("pk", filter=Q(_status=PENDING)),
+            claims_count=Count("pk", filter=Q(_status__in=ROUND_STATUSES)),
+        )
+    )
+    ledgers = defaultdict(lambda: [0, 0, 0])
+    for row in rows.iterator():
+        ledger = ledgers[
+            (row["user_profile"], row["faucet__chain"], get_round_start(row["day"]))
+        ]
+        ledger[0] += row["claimed_amount"]
+        ledger[1] += row["pending_count"]
+        ledger[2] += row["claims_count"]
+    ClaimLedger.objects.bulk_create(
+        [
+            ClaimLedger(
+                user_profile_id=user_profile_id,
+                chain_id=chain_id,
+                round_start=round_start,
+                claimed_amount=claimed_amount,
+                pending_count=pending_count,
+                claims_count=claims_count,
+            )
+            for (user_profile_id, chain_id, round_start), (
+                claimed_amount,
+                pending_count,
+                claims_count,
+            ) in ledgers.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0042_twitterconnection_twitter_id"),
+        ("core", "0010_chain_confirmations"),
+        ("faucet", "0084_fuelchampion"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ClaimLedger",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("round_start", models.DateTimeField()),
+                (
+                    "claimed_amount",
+                    models.DecimalField(decimal_places=0, default=0, max_digits=78),
+                ),
+                ("pending_count", models.IntegerField(default=0)),
+                ("claims_count", models.IntegerField(default=0)),
+                (
+                    "chain",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="claim_ledgers",
+                        to="core.chain",
+                    ),
+                ),
+                (
+                    "user_profile",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="claim_ledgers",
+                        to="authentication.userprofile",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("user_profile", "chain", "round_start")},
+            },
+        ),
+        migrations.RunPython(
+            backfill_claim_ledger, reverse_code=migrations.RunPython.noop
+        ),
+    ]
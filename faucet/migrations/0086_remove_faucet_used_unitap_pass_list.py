@@ -0,0 +1,43 @@
+# Generated by Django 5.1.2 on 2026-10-17 03:05
+
+from datetime import timedelta
+
+from django.db import migrations
+from django.utils import timezone
+
+
+def copy_used_unitap_passes(apps, schema_editor):
+    Faucet = apps.get_model("faucet", "Faucet")
+    UnitapPassUsage = apps.get_model("core", "UnitapPassUsage")
+    now = timezone.now()
+    # monday midnight, the start of the current round
+    round_start = (now - timedelta(days=now.weekday())).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    UnitapPassUsage.objects.bulk_create(
+        [
+            UnitapPassUsage(
+                scope=f"faucet.faucet:{faucet.pk}",
+                pass_id=pass_id,
+                round_start=None if faucet.is_one_time_claim else round_start,
+            )
+            for faucet in Faucet.objects.exclude(used_unitap_pass_list=[])
+            for pass_id in set(faucet.used_unitap_pass_list)
+        ],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0011_unitappassusage"),
+        ("faucet", "0085_claimledger"),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_used_unitap_passes, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="faucet",
+            name="used_unitap_pass_list",
+        ),
+    ]
@@ -1,28 +1,24 @@
 import logging
 import uuid
+from collections import defaultdict
 from datetime import datetime, timedelta
 
 from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
 from django.core.cache import cache
-from django.db import models
-from django.db.models import Q, UniqueConstraint
-from django.db.models.functions import Lower
+from django.db import models, transaction
+from django.db.models import F, Func, Q, Sum, UniqueConstraint, Value
+from django.db.models.functions import Coalesce, Lower
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils import timezone
 from safedelete.models import SafeDeleteModel
 
 from authentication.models import UserProfile
 from brightIDfaucet.settings import BRIGHT_ID_INTERFACE
-from core.models import (
-    AbstractGlobalSettings,
-    BigNumField,
-    Chain,
-    NetworkTypes,
-    UniqueArrayField,
-)
+from core.models import AbstractGlobalSettings, BigNumField, Chain, NetworkTypes
 
-
-def get_cache_time(id):
-    return int((float(int(id) % 25) / 25.0) * 180.0) + 180
+from .constants import FAUCET_LIST_VERSION_KEY
 
 
 class BrightUserManager(models.Manager):
@@ -95,6 +91,8 @@ class BrightUser(models.Model):
 
 
 class ClaimReceipt(models.Model):
+    _saved_status = None
+
     MAX_PENDING_DURATION = 5  # minutes
     PENDING = "Pending"
     VERIFIED = "Verified"
@@ -145,6 +143,21 @@ class ClaimReceipt(models.Model):
         null=True,
     )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # the status the claim ledger has recorded for this receipt
+        instance._saved_status = instance.__dict__.get("_status")
+        return instance
+
+    def save(self, *args, **kwargs):
+        saved_status = None if self._state.adding else self._saved_status
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if saved_status != self._status:
+                ClaimLedger.record(self, saved_status)
+        self._saved_status = self._status
+
     def status(self):
         return self._status
 
@@ -160,14 +173,7 @@ class ClaimReceipt(models.Model):
 
     @staticmethod
     def claims_count():
-        cached_count = cache.get("gastap_claims_count")
-        if cached_count:
-            return cached_count
-        count = ClaimReceipt.objects.filter(
-            _status__in=[ClaimReceipt.VERIFIED, BrightUser.VERIFIED]
-        ).count()
-        cache.set("gastap_claims_count", count, 600)
-        return count
+        return ClaimCounter.get_count()
 
 
 class Faucet(models.Model):
@@ -194,25 +200,31 @@ class Faucet(models.Model):
     )
     total_claims_this_round = models.IntegerField(default=0, blank=True, null=True)
 
-    used_unitap_pass_list = UniqueArrayField(
-        models.IntegerField(), blank=True, default=list, unique_elements=True
-    )
-
     def __str__(self):
         return (
             f"{self.chain.chain_name} - {self.pk} - "
             f"{self.chain.symbol}:{self.chain.chain_id}"
         )
 
+    def get_snapshot(self):
+        try:
+            return self.snapshot
+        except FaucetSnapshot.DoesNotExist:
+            return None
+
     @property
     def current_fuel_level(self):
-        current_fuel_level = cache.get(f"{self.pk}_current_fuel_level")
-        return current_fuel_level if current_fuel_level is not None else -1
+        snapshot = self.get_snapshot()
+        if snapshot is None or snapshot.is_stale:
+            return -1
+        return snapshot.current_fuel_level
 
     @property
     def remaining_claim_number(self):
-        remaining_claim_number = cache.get(f"{self.pk}_remaining_claim_number")
-        return remaining_claim_number if remaining_claim_number is not None else -1
+        snapshot = self.get_snapshot()
+        if snapshot is None or snapshot.is_stale:
+            return -1
+        return snapshot.remaining_claim_number
 
     @property
     def has_enough_funds(self):
@@ -291,18 +303,229 @@ class Faucet(models.Model):
 
     @property
     def total_claims(self):
-        cached_total_claims = cache.get(f"gas_tap_chain_total_claims_{self.pk}")
-        if cached_total_claims:
-            return cached_total_claims
-        total_claims = ClaimReceipt.objects.filter(
-            faucet=self, _status__in=[ClaimReceipt.VERIFIED, BrightUser.VERIFIED]
-        ).count()
-        cache.set(
-            f"gas_tap_chain_total_claims_{self.pk}",
-            total_claims,
-            get_cache_time(self.pk),
+        # FaucetListView prefetches the all time counters
+        counters = getattr(self, "all_time_claim_counters", None)
+        if counters is None:
+            return ClaimCounter.get_count(faucet=self)
+        return counters[0].count if counters else 0
+
+
+class ClaimCounter(models.Model):
+    """
+    Verified claim counts, bumped in the same transaction that verifies a batch.
+    A counter without faucet counts every faucet and one without round_start
+    counts all time. `manage.py rebuild_claim_counters` recreates them from history.
+    """
+
+    faucet = models.ForeignKey(
+        Faucet,
+        related_name="claim_counters",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    round_start = models.DateTimeField(null=True, blank=True)
+    count = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                Coalesce("faucet", Value(0)),
+                "round_start",
+                name="unique_round_claim_counter",
+                condition=Q(round_start__isnull=False),
+            ),
+            UniqueConstraint(
+                Coalesce("faucet", Value(0)),
+                name="unique_all_time_claim_counter",
+                condition=Q(round_start__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.faucet or 'all faucets'} - {self.round_start or 'all time'}"
+
+    @classmethod
+    def increment(cls, faucet_id, round_start, count=1):
+        """add verified claims of a faucet in a round to all counters they belong to"""
+        scopes = [(None, None), (faucet_id, None), (faucet_id, round_start)]
+        # ensure the rows exist, then bump them without a read-modify-write race
+        cls.objects.bulk_create(
+            [cls(faucet_id=f, round_start=r) for f, r in scopes],
+            ignore_conflicts=True,
         )
-        return total_claims
+        for f, r in scopes:
+            cls.objects.filter(faucet_id=f, round_start=r).update(
+                count=F("count") + count
+            )
+        invalidate_faucet_list()
+
+    @classmethod
+    def get_count(cls, faucet=None, round_start=None):
+        counter = cls.objects.filter(faucet=faucet, round_start=round_start).first()
+        return counter.count if counter else 0
+
+
+class ClaimLedger(models.Model):
+    """
+    Claims of a user on a chain in a round, kept in step with the receipts
+    statuses so claim checks don't aggregate over the whole claim history.
+    `manage.py rebuild_claim_ledger` recreates it from the receipts.
+    """
+
+    ROUND_STATUSES = [
+        ClaimReceipt.PENDING,
+        ClaimReceipt.VERIFIED,
+        BrightUser.PENDING,
+        BrightUser.VERIFIED,
+    ]
+
+    user_profile = models.ForeignKey(
+        UserProfile, related_name="claim_ledgers", on_delete=models.CASCADE
+    )
+    chain = models.ForeignKey(
+        Chain, related_name="claim_ledgers", on_delete=models.CASCADE
+    )
+    round_start = models.DateTimeField()
+    claimed_amount = models.DecimalField(max_digits=78, decimal_places=0, default=0)
+    pending_count = models.IntegerField(default=0)
+    claims_count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("user_profile", "chain", "round_start")
+
+    def __str__(self):
+        return f"{self.user_profile} - {self.chain} - {self.round_start}"
+
+    @staticmethod
+    def get_status_entries(status, amount):
+        """claimed amount, pending count and claims count a receipt adds"""
+        return (
+            int(amount) if status == ClaimReceipt.VERIFIED else 0,
+            1 if status == ClaimReceipt.PENDING else 0,
+            1 if status in ClaimLedger.ROUND_STATUSES else 0,
+        )
+
+    @classmethod
+    def get_balance(cls, user_profile, chain, claimed_since=None):
+        """
+        Verified amount claimed on the chain since claimed_since, pending claims on
+        the chain and claims of the current round on every chain, in one query
+        """
+        from faucet.faucet_manager.credit_strategy import RoundCreditStrategy
+
+        claimed_filter = Q(chain=chain)
+        if claimed_since is not None:
+            claimed_filter &= Q(round_start__gte=claimed_since)
+        return cls.objects.filter(user_profile=user_profile).aggregate(
+            claimed=Sum("claimed_amount", filter=claimed_filter, default=0),
+            pending=Sum("pending_count", filter=Q(chain=chain), default=0),
+            round_claims=Sum(
+                "claims_count",
+                filter=Q(round_start=RoundCreditStrategy.get_start_of_the_round()),
+                default=0,
+            ),
+        )
+
+    @classmethod
+    def record(cls, claim: ClaimReceipt, previous_status):
+        from faucet.faucet_manager.credit_strategy import RoundCreditStrategy
+
+        if claim.user_profile_id is None:
+            return
+        old = cls.get_status_entries(previous_status, claim.amount)
+        new = cls.get_status_entries(claim._status, claim.amount)
+        cls._add(
+            claim.user_profile_id,
+            Faucet.objects.values_list("chain_id", flat=True).get(pk=claim.faucet_id),
+            RoundCreditStrategy.get_round_start(claim.datetime),
+            [n - o for n, o in zip(new, old)],
+        )
+
+    @classmethod
+    def update_claims_status(cls, claims, status):
+        """set the status of the claims and record the change in the ledger"""
+        from faucet.faucet_manager.credit_strategy import RoundCreditStrategy
+
+        changes = defaultdict(lambda: [0, 0, 0])
+        with transaction.atomic():
+            rows = (
+                claims.select_for_update(of=("self",))
+                .exclude(_status=status)
+                .exclude(user_profile=None)
+                .values_list(
+                    "user_profile", "faucet__chain", "datetime", "amount", "_status"
+                )
+            )
+            for user_profile_id, chain_id, claim_datetime, amount, old_status in rows:
+                key = (
+                    user_profile_id,
+                    chain_id,
+                    RoundCreditStrategy.get_round_start(claim_datetime),
+                )
+                old = cls.get_status_entries(old_status, amount)
+                new = cls.get_status_entries(status, amount)
+                for i, (n, o) in enumerate(zip(new, old)):
+                    changes[key][i] += n - o
+            for key, change in changes.items():
+                cls._add(*key, change)
+            claims.update(_status=status)
+
+    @classmethod
+    def _add(cls, user_profile_id, chain_id, round_start, change):
+        claimed_amount, pending_count, claims_count = change
+        if not any(change):
+            return
+        cls.objects.bulk_create(
+            [
+                cls(
+                    user_profile_id=user_profile_id,
+                    chain_id=chain_id,
+                    round_start=round_start,
+                )
+            ],
+            ignore_conflicts=True,
+        )
+        cls.objects.filter(
+            user_profile_id=user_profile_id, chain_id=chain_id, round_start=round_start
+        ).update(
+            claimed_amount=F("claimed_amount") + claimed_amount,
+            pending_count=F("pending_count") + pending_count,
+            claims_count=F("claims_count") + claims_count,
+        )
+
+
+class FaucetSnapshot(models.Model):
+    """
+    Last known on-chain state of a faucet and of its chain wallet.
+    It is refreshed in the background per chain so API reads never hit the RPC.
+    """
+
+    STALE_AFTER = 600  # seconds
+
+    faucet = models.OneToOneField(
+        Faucet, related_name="snapshot", on_delete=models.CASCADE
+    )
+    manager_balance = BigNumField(default=0)
+    wallet_balance = BigNumField(default=0)
+    gas_price = BigNumField(default=0)
+    has_enough_funds = models.BooleanField(default=False)
+    has_enough_fees = models.BooleanField(default=False)
+    remaining_claim_number = models.IntegerField(default=-1)
+    current_fuel_level = models.IntegerField(default=-1)
+    block_gas_limit = models.BigIntegerField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.faucet} - {self.updated_at}"
+
+    @property
+    def age(self):
+        return timezone.now() - self.updated_at
+
+    @property
+    def is_stale(self):
+        return self.age > timedelta(seconds=self.STALE_AFTER)
 
 
 class GlobalSettings(AbstractGlobalSettings):
@@ -310,6 +533,8 @@ class GlobalSettings(AbstractGlobalSettings):
 
 
 class TransactionBatch(models.Model):
+    MAX_SPEED_UPS = 1
+
     faucet = models.ForeignKey(
         Faucet, related_name="batches", on_delete=models.PROTECT, db_index=True
     )
@@ -325,6 +550,19 @@ class TransactionBatch(models.Model):
 
     updating = models.BooleanField(default=False)
 
+    nonce = models.BigIntegerField(blank=True, null=True)
+    gas_price = models.BigIntegerField(blank=True, null=True)
+    broadcast_at = models.DateTimeField(blank=True, null=True)
+    replaced_tx_hashes = ArrayField(
+        models.CharField(max_length=255), blank=True, default=list
+    )
+    cancel_tx_hash = models.CharField(max_length=255, blank=True, null=True)
+
+    size_limit = models.PositiveIntegerField(blank=True, null=True)
+    size = models.PositiveIntegerField(blank=True, null=True)
+    gas_estimate = models.BigIntegerField(blank=True, null=True)
+    gas_used = models.BigIntegerField(blank=True, null=True)
+
     @property
     def claims_count(self):
         return self.claims.count()
@@ -333,6 +571,22 @@ class TransactionBatch(models.Model):
     def claims_amount(self):
         return sum([c.amount for c in self.claims.all()]) / 1e18
 
+    @property
+    def transfer_data(self):
+        return [
+            {
+                "to": receipt.to_address,
+                "amount": int(receipt.amount),
+            }
+            for receipt in self.claims.order_by("pk")
+        ]
+
+    @property
+    def tx_hashes(self):
+        if not self.tx_hash:
+            return []
+        return [self.tx_hash] + list(self.replaced_tx_hashes)
+
     @property
     def age(self):
         return timezone.now() - self.datetime
@@ -359,8 +613,26 @@ class TransactionBatch(models.Model):
     def is_expired(self):
         return self.age > timedelta(minutes=ClaimReceipt.MAX_PENDING_DURATION)
 
+    @property
+    def is_stuck(self):
+        """the last broadcast transaction is not mined within the pending window"""
+        broadcast_at = self.broadcast_at or self.datetime
+        return timezone.now() - broadcast_at > timedelta(
+            minutes=ClaimReceipt.MAX_PENDING_DURATION
+        )
+
+    @property
+    def can_be_sped_up(self):
+        return (
+            self.nonce is not None
+            and self.cancel_tx_hash is None
+            and len(self.replaced_tx_hashes) < self.MAX_SPEED_UPS
+        )
+
 
 class DonationReceipt(models.Model):
+    # a donation whose transaction is not mined by then is rejected
+    MAX_PENDING_DURATION = 60  # minutes
     states = (
         (ClaimReceipt.PENDING, "Pending"),
         (ClaimReceipt.VERIFIED, "Verified"),
@@ -381,8 +653,10 @@ class DonationReceipt(models.Model):
         null=False,
         blank=False,
     )
-    value = models.CharField(max_length=255, null=True, blank=True)
-    total_price = models.CharField(max_length=255, null=True, blank=True)
+    value = models.DecimalField(max_digits=78, decimal_places=18, null=True, blank=True)
+    total_price = models.DecimalField(
+        max_digits=78, decimal_places=18, null=True, blank=True
+    )
     datetime = models.DateTimeField(auto_now_add=True)
     status = models.CharField(
         max_length=30,
@@ -393,6 +667,136 @@ class DonationReceipt(models.Model):
     class Meta:
         unique_together = ("faucet", "tx_hash")
 
+    @property
+    def is_expired(self):
+        return timezone.now() - self.datetime > timedelta(
+            minutes=DonationReceipt.MAX_PENDING_DURATION
+        )
+
+
+class LeaderboardEntry(models.Model):
+    """
+    Verified donations of a user, over every faucet when faucet is null.
+    Entries are updated as donations get verified, `manage.py rebuild_leaderboard`
+    recreates them from the donation receipts. Ranks are counted when read so a
+    donation only writes its donor's entries.
+    """
+
+    user_profile = models.ForeignKey(
+        UserProfile, related_name="leaderboard_entries", on_delete=models.CASCADE
+    )
+    faucet = models.ForeignKey(
+        Faucet,
+        related_name="leaderboard_entries",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    sum_total_price = models.DecimalField(max_digits=78, decimal_places=18, default=0)
+    # chains of every faucet the user donated to, whatever the entry's faucet is
+    interacted_chains = ArrayField(models.IntegerField(), blank=True, default=list)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                Coalesce("faucet", Value(0)),
+                "user_profile",
+                name="unique_leaderboard_entry",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["faucet", "sum_total_price"]),
+        ]
+
+    def __str__(self):
+        return f"{self.user_profile} - {self.faucet or 'all faucets'}"
+
+    @property
+    def username(self):
+        return self.user_profile.username
+
+    def get_rank(self):
+        """one more than the number of users who donated more"""
+        return (
+            LeaderboardEntry.objects.filter(
+                faucet_id=self.faucet_id, sum_total_price__gt=self.sum_total_price
+            ).count()
+            + 1
+        )
+
+    @classmethod
+    def add_donation(cls, donation: "DonationReceipt"):
+        with transaction.atomic():
+            for faucet_id in (None, donation.faucet_id):
+                cls._add_to_entry(
+                    donation.user_profile_id, faucet_id, donation.total_price or 0
+                )
+            chain_id = donation.faucet.chain_id
+            cls.objects.filter(user_profile_id=donation.user_profile_id).exclude(
+                interacted_chains__contains=[chain_id]
+            ).update(
+                interacted_chains=Func(
+                    F("interacted_chains"), Value(chain_id), function="array_append"
+                )
+            )
+
+    @classmethod
+    def _add_to_entry(cls, user_profile_id, faucet_id, total_price):
+        cls.objects.bulk_create(
+            [cls(user_profile_id=user_profile_id, faucet_id=faucet_id)],
+            ignore_conflicts=True,
+        )
+        cls.objects.filter(user_profile_id=user_profile_id, faucet_id=faucet_id).update(
+            sum_total_price=F("sum_total_price") + total_price
+        )
+
+
+class FuelChampion(models.Model):
+    """
+    Top donor of a faucet in a round, refreshed whenever one of the faucet's
+    donations gets verified
+    """
+
+    round_start = models.DateTimeField()
+    faucet = models.ForeignKey(
+        Faucet, related_name="fuel_champions", on_delete=models.CASCADE
+    )
+    user_profile = models.ForeignKey(
+        UserProfile, related_name="fuel_championships", on_delete=models.CASCADE
+    )
+    value = models.DecimalField(max_digits=78, decimal_places=18, default=0)
+
+    class Meta:
+        unique_together = ("round_start", "faucet")
+
+    def __str__(self):
+        return f"{self.faucet} - {self.round_start}: {self.user_profile}"
+
+    @classmethod
+    def refresh(cls, faucet_id, round_start):
+        top_donor = (
+            DonationReceipt.objects.filter(
+                faucet_id=faucet_id,
+                status=ClaimReceipt.VERIFIED,
+                datetime__gt=round_start,
+            )
+            .values("user_profile")
+            .annotate(total_value=Sum("value"))
+            .order_by("-total_value", "user_profile")
+            .first()
+        )
+        if top_donor is None:
+            cls.objects.filter(faucet_id=faucet_id, round_start=round_start).delete()
+            return
+        cls.objects.update_or_create(
+            faucet_id=faucet_id,
+            round_start=round_start,
+            defaults={
+                "user_profile_id": top_donor["user_profile"],
+                "value": top_donor["total_value"] or 0,
+            },
+        )
+
 
 class DonationContract(SafeDeleteModel):
     contract_address = models.CharField(max_length=255, blank=False, null=False)
@@ -418,3 +822,40 @@ class DonationContract(SafeDeleteModel):
                 name="unique_donation_contract_address",
             ),
         ]
+
+
+def get_faucet_list_version():
+    version = cache.get(FAUCET_LIST_VERSION_KEY)
+    if version is None:
+        cache.add(FAUCET_LIST_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(FAUCET_LIST_VERSION_KEY, "")
+    return version
+
+
+def invalidate_faucet_list():
+    # after commit, so a concurrent request can't cache the old rows as the new version
+    transaction.on_commit(lambda: cache.delete(FAUCET_LIST_VERSION_KEY))
+
+
+@receiver(post_save, sender=Chain)
+@receiver(post_delete, sender=Chain)
+@receiver(post_save, sender=Faucet)
+@receiver(post_delete, sender=Faucet)
+@receiver(post_save, sender=FaucetSnapshot)
+@receiver(post_delete, sender=FaucetSnapshot)
+@receiver(post_save, sender=ClaimCounter)
+@receiver(post_delete, sender=ClaimCounter)
+def faucet_list_changed(sender, **kwargs):
+    invalidate_faucet_list()
+
+
+@receiver(post_save, sender=DonationReceipt)
+def donation_receipt_saved(sender, instance, **kwargs):
+    if instance.status != ClaimReceipt.VERIFIED:
+        return
+    from faucet.faucet_manager.credit_strategy import RoundCreditStrategy
+
+    # donations of past rounds can no longer change who the champion is
+    round_start = RoundCreditStrategy.get_start_of_the_round()
+    if instance.datetime > round_start:
+        FuelChampion.refresh(instance.faucet_id, round_start)
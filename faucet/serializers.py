@@ -1,3 +1,5 @@
+from decimal import Decimal
+
 from rest_framework import serializers
 
 from core.serializers import ChainSerializer
@@ -14,8 +16,10 @@ class FaucetBalanceSerializer(serializers.ModelSerializer):
     contract_balance = serializers.SerializerMethodField()
     wallet_balance = serializers.SerializerMethodField()
     chain = ChainSerializer()
+    has_enough_funds = serializers.SerializerMethodField()
     has_enough_fees = serializers.SerializerMethodField()
     wallet_address = serializers.SerializerMethodField()
+    snapshot_updated_at = serializers.SerializerMethodField()
 
     class Meta:
         model = Faucet
@@ -30,20 +34,32 @@ class FaucetBalanceSerializer(serializers.ModelSerializer):
             "fund_manager_address",
             "wallet_address",
             "block_scan_address",
+            "snapshot_updated_at",
         ]
 
     def get_contract_balance(self, faucet):
-        return faucet.manager_balance
+        snapshot = faucet.get_snapshot()
+        return int(snapshot.manager_balance) if snapshot else 0
 
     def get_wallet_balance(self, faucet):
-        return faucet.chain.wallet_balance
+        snapshot = faucet.get_snapshot()
+        return int(snapshot.wallet_balance) if snapshot else 0
+
+    def get_has_enough_funds(self, faucet):
+        snapshot = faucet.get_snapshot()
+        return snapshot.has_enough_funds if snapshot else False
 
     def get_has_enough_fees(self, faucet):
-        return faucet.chain.has_enough_fees
+        snapshot = faucet.get_snapshot()
+        return snapshot.has_enough_fees if snapshot else False
 
     def get_wallet_address(self, faucet):
         return faucet.chain.wallet.address
 
+    def get_snapshot_updated_at(self, faucet):
+        snapshot = faucet.get_snapshot()
+        return snapshot.updated_at if snapshot else None
+
 
 class SmallFaucetSerializer(serializers.ModelSerializer):
     chain = ChainSerializer()
@@ -111,9 +127,21 @@ class ReceiptSerializer(serializers.ModelSerializer):
         ]
 
 
+class NormalizedDecimalField(serializers.Field):
+    """
+    Decimals without the trailing zeros the column's scale pads them with, as
+    plain strings like the amounts used to be stored
+    """
+
+    def to_representation(self, value):
+        return format(Decimal(value).normalize(), "f")
+
+
 class DonationReceiptSerializer(serializers.ModelSerializer):
     faucet_pk = serializers.CharField(max_length=20, write_only=True)
     faucet = FaucetSerializer(read_only=True)
+    value = NormalizedDecimalField(read_only=True)
+    total_price = NormalizedDecimalField(read_only=True)
 
     def validate(self, attrs):
         faucet = self._validate_faucet(attrs.pop("faucet_pk"))
@@ -155,7 +183,7 @@ class DonationReceiptSerializer(serializers.ModelSerializer):
 
 class LeaderboardSerializer(serializers.Serializer):
     username = serializers.CharField(max_length=150, read_only=True)
-    sum_total_price = serializers.CharField(max_length=150, read_only=True)
+    sum_total_price = NormalizedDecimalField(read_only=True)
     interacted_chains = serializers.ListField(
         child=serializers.IntegerField(), read_only=True
     )
@@ -164,5 +192,7 @@ class LeaderboardSerializer(serializers.Serializer):
 
 
 class FuelChampionSerializer(serializers.Serializer):
-    faucet_pk = serializers.CharField(max_length=20, read_only=True)
-    username = serializers.CharField(max_length=150, read_only=True)
+    faucet_pk = serializers.CharField(source="faucet_id", max_length=20, read_only=True)
+    username = serializers.CharField(
+        source="user_profile.username", max_length=150, read_only=True
+    )
@@ -5,9 +5,10 @@ from celery.signals import worker_ready
 from django.core.cache import cache
 
 from core.models import TokenPrice
-from core.utils import memcache_lock
+from core.utils import ConfirmationTracker, memcache_lock
 
 from .celery_tasks import CeleryTasks
+from .constants import BATCH_STATUS_POLL_INTERVAL, CLAIM_COALESCE_WINDOW
 from .models import ClaimReceipt, DonationReceipt, Faucet, TransactionBatch
 
 
@@ -17,41 +18,105 @@ def passive_address_is_not_none(address):
     return False
 
 
+def get_schedule_key(task, args):
+    return f"{task.name}-SCHEDULED-{'-'.join(map(str, args))}"
+
+
+def schedule_once(task, args, countdown):
+    """
+    Enqueue the task after countdown seconds unless the same call is already
+    waiting, so a burst of triggers is coalesced into a single run
+    """
+    countdown = max(countdown, 1)
+    # cache.add fails if the key already exists
+    if not cache.add(get_schedule_key(task, args), True, countdown):
+        return False
+    task.apply_async(args, countdown=countdown)
+    return True
+
+
+def clear_schedule(task, args):
+    """
+    Called when a scheduled task starts, so it can be scheduled again while it
+    runs, e.g. by itself
+    """
+    cache.delete(get_schedule_key(task, args))
+
+
+def schedule_faucet_pending_claims(faucet_id, countdown=CLAIM_COALESCE_WINDOW):
+    try:
+        schedule_once(process_faucet_pending_claims, (faucet_id,), countdown)
+    except Exception as e:
+        # the periodic sweep picks the claims up
+        logging.exception(str(e))
+
+
 @shared_task(bind=True)
 def process_batch(self, batch_pk):
+    clear_schedule(self, (batch_pk,))
     id_ = f"{self.name}-LOCK-{batch_pk}"
     with memcache_lock(id_, self.app.oid) as acquired:
         if not acquired:
             logging.info("Could not acquire process lock")
             return
-        CeleryTasks.process_batch(batch_pk)
+        batch = CeleryTasks.process_batch(batch_pk)
         cache.delete(id_)
 
+    if batch is None:
+        return
+    if batch.status_should_be_updated:
+        schedule_once(
+            update_chain_pending_batches,
+            (batch.faucet.chain_id,),
+            BATCH_STATUS_POLL_INTERVAL,
+        )
+    elif batch._status != ClaimReceipt.PENDING:
+        # the batch left the in-flight window, waiting claims can move on
+        schedule_faucet_pending_claims(batch.faucet_id)
+    elif batch.should_be_processed:
+        # the gas price was too high or the rpc failed, retried with backoff
+        countdown = ConfirmationTracker.next_countdown(f"batch-send-{batch_pk}", False)
+        schedule_once(process_batch, (batch_pk,), countdown)
+
 
 @shared_task
-def process_pending_batches():
-    batches = TransactionBatch.objects.filter(
+def process_pending_batches():  # periodic sweep
+    batch_pks = TransactionBatch.objects.filter(
         _status=ClaimReceipt.PENDING, tx_hash=None
-    )
-    for _batch in batches:
-        process_batch.delay(_batch.pk)
+    ).values_list("pk", flat=True)
+    for batch_pk in batch_pks:
+        process_batch.delay(batch_pk)
 
 
 @shared_task(bind=True)
-def update_pending_batch_with_tx_hash(self, batch_pk):
-    # only one ongoing update per batch
+def update_chain_pending_batches(self, chain_id):
+    clear_schedule(self, (chain_id,))
+    # only one ongoing update per chain
 
-    id_ = f"{self.name}-LOCK-{batch_pk}"
+    id_ = f"{self.name}-LOCK-{chain_id}"
 
     with memcache_lock(id_, self.app.oid) as acquired:
         if not acquired:
             logging.info("Could not acquire update lock")
             return
 
-        CeleryTasks.update_pending_batch_with_tx_hash(batch_pk)
+        batches = CeleryTasks.update_chain_pending_batches(chain_id)
 
         cache.delete(id_)
 
+    resolved_faucet_ids = {
+        batch.faucet_id for batch in batches if batch._status != ClaimReceipt.PENDING
+    }
+    # the resolved batches left the in-flight window, waiting claims can move on
+    for faucet_id in resolved_faucet_ids:
+        schedule_faucet_pending_claims(faucet_id)
+
+    if any(batch.status_should_be_updated for batch in batches):
+        countdown = ConfirmationTracker.next_countdown(
+            f"batches-{chain_id}", bool(resolved_faucet_ids)
+        )
+        schedule_once(update_chain_pending_batches, (chain_id,), countdown)
+
 
 @shared_task
 def reject_expired_pending_claims():
@@ -59,40 +124,65 @@ def reject_expired_pending_claims():
 
 
 @shared_task
-def update_pending_batches_with_tx_hash_status():
-    batches_queryset = (
+def update_pending_batches_with_tx_hash_status():  # periodic sweep
+    chain_ids = (
         TransactionBatch.objects.filter(_status=ClaimReceipt.PENDING)
         .exclude(tx_hash=None)
         .exclude(updating=True)
+        .values_list("faucet__chain_id", flat=True)
+        .distinct()
     )
-    for _batch in batches_queryset:
-        update_pending_batch_with_tx_hash.delay(_batch.pk)
+    for chain_id in chain_ids:
+        update_chain_pending_batches.delay(chain_id)
 
 
 @shared_task
 def process_faucet_pending_claims(faucet_id):  # locks chain
-    CeleryTasks.process_faucet_pending_claims(faucet_id)
+    clear_schedule(process_faucet_pending_claims, (faucet_id,))
+    batch = CeleryTasks.process_faucet_pending_claims(faucet_id)
+    if batch is None:
+        return
+    process_batch.delay(batch.pk)
+    if batch.size == batch.size_limit:
+        # there may be more claims waiting than fit in one batch
+        schedule_faucet_pending_claims(faucet_id, countdown=0)
 
 
 @shared_task
-def process_pending_claims():  # periodic task
-    faucets = Faucet.objects.filter(is_active=True)
-    for _faucet in faucets:
-        process_faucet_pending_claims.delay(_faucet.pk)
+def process_pending_claims():  # periodic sweep
+    faucet_pks = (
+        Faucet.objects.filter(
+            is_active=True,
+            claims___status=ClaimReceipt.PENDING,
+            claims__batch__isnull=True,
+        )
+        .values_list("pk", flat=True)
+        .distinct()
+    )
+    for faucet_pk in faucet_pks:
+        process_faucet_pending_claims.delay(faucet_pk)
 
 
-@shared_task
-def update_needs_funding_status_faucet(faucet_id):
-    CeleryTasks.update_needs_funding_status_faucet(faucet_id)
-    CeleryTasks.update_remaining_claim_number(faucet_id)
-    CeleryTasks.update_current_fuel_level_faucet(faucet_id)
+@shared_task(bind=True)
+def refresh_chain_snapshot(self, chain_id):
+    id_ = f"{self.name}-LOCK-{chain_id}"
+    with memcache_lock(id_, self.app.oid) as acquired:
+        if not acquired:
+            logging.info("Could not acquire snapshot lock")
+            return
+        CeleryTasks.refresh_chain_snapshot(chain_id)
+        cache.delete(id_)
 
 
 @shared_task
-def update_needs_funding_status():  # periodic task
-    faucets = Faucet.objects.filter(is_active=True)
-    for _faucet in faucets:
-        update_needs_funding_status_faucet.delay(_faucet.pk)
+def refresh_chain_snapshots():  # periodic task
+    chain_ids = (
+        Faucet.objects.filter(is_active=True)
+        .values_list("chain_id", flat=True)
+        .distinct()
+    )
+    for chain_id in chain_ids:
+        refresh_chain_snapshot.delay(chain_id)
 
 
 @shared_task
@@ -107,18 +197,6 @@ def update_tokens_price():
         update_token_price.delay(token.pk)
 
 
-@shared_task
-def update_faucet_used_unitap_pass_list(faucet_id):
-    CeleryTasks.empty_used_unitap_pass_list(faucet_id)
-
-
-@shared_task
-def update_used_unitap_pass_list():
-    faucets = Faucet.objects.filter(is_one_time_claim=False)
-    for faucet in faucets:
-        update_faucet_used_unitap_pass_list.delay(faucet.pk)
-
-
 @shared_task(bind=True)
 def process_donation_receipt(self, donation_receipt_pk):
     id_ = f"{self.name}-LOCK-{donation_receipt_pk}"
@@ -130,16 +208,31 @@ def process_donation_receipt(self, donation_receipt_pk):
         cache.delete(id_)
 
 
+@shared_task(bind=True)
+def process_chain_donation_receipts(self, chain_id):
+    id_ = f"{self.name}-LOCK-{chain_id}"
+    with memcache_lock(id_, self.app.oid) as acquired:
+        if not acquired:
+            logging.info("Could not acquire update lock")
+            return
+        CeleryTasks.process_chain_donation_receipts(chain_id)
+        cache.delete(id_)
+
+
 @shared_task
 def update_donation_receipt_pending_status():
     """
-    update status of pending donation receipt
+    update status of pending donation receipts, one receipt lookup per chain
     """
-    pending_donation_receipts = DonationReceipt.objects.filter(
-        status=ClaimReceipt.PENDING, faucet__chain__is_active=True
+    chain_ids = (
+        DonationReceipt.objects.filter(
+            status=ClaimReceipt.PENDING, faucet__chain__is_active=True
+        )
+        .values_list("faucet__chain_id", flat=True)
+        .distinct()
     )
-    for pending_donation_receipt in pending_donation_receipts:
-        process_donation_receipt.delay(pending_donation_receipt.pk)
+    for chain_id in chain_ids:
+        process_chain_donation_receipts.delay(chain_id)
 
 
 @shared_task
@@ -155,10 +248,8 @@ def update_all_faucets_claims(since_last_round=True):
 
 
 @shared_task
-def remove_used_unitap_pass_list_for_each_faucet():
-    faucet_pk = Faucet.objects.values_list("pk", flat=True)
-    for faucet_pk in faucet_pk:
-        CeleryTasks.remove_unitap_pass_used_in_each_faucet(faucet_id=faucet_pk)
+def refresh_fuel_champions():  # periodic task
+    CeleryTasks.refresh_fuel_champions()
 
 
 @worker_ready.connect
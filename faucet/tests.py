@@ -1,28 +1,43 @@
 import datetime
 import json
+from io import StringIO
 from unittest.mock import patch
 
 from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
 from django.urls import reverse
 from django.utils import timezone
+from eth_account import Account
 from rest_framework.test import APITestCase
 
 from authentication.models import UserProfile, Wallet
-from core.models import WalletAccount
+from core.models import AccountNonce, UnitapPassUsage, WalletAccount
 from faucet.constraints import OptimismDonationConstraint
 from faucet.faucet_manager.claim_manager import ClaimManagerFactory, SimpleClaimManager
 from faucet.faucet_manager.credit_strategy import RoundCreditStrategy
 from faucet.models import (
     Chain,
+    ClaimCounter,
+    ClaimLedger,
     ClaimReceipt,
     DonationReceipt,
     Faucet,
+    FaucetSnapshot,
+    FuelChampion,
     GlobalSettings,
+    LeaderboardEntry,
     NetworkTypes,
     TransactionBatch,
 )
 
 from .celery_tasks import CeleryTasks
+from .faucet_manager.fund_manager import FundMangerException
+from .tasks import (
+    process_batch,
+    process_faucet_pending_claims,
+    schedule_faucet_pending_claims,
+)
 
 address = "0x90F8bf6A479f320ead074411a4B0e7944Ea8c9C1"
 fund_manager = "0x5802f1035AbB8B191bc12Ce4668E3815e8B7Efa0"
@@ -96,6 +111,36 @@ class TestChainInfo(APITestCase):
         response = self.request_chain_list()
         self.assertEqual(response.status_code, 200)
 
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_list_is_ordered_by_last_round_claims(self):
+        create_test_faucet(self.wallet)
+        busy_faucet = create_test_faucet(self.wallet, 123)
+        Faucet.objects.filter(pk=busy_faucet.pk).update(total_claims_since_last_round=5)
+
+        response = self.request_chain_list()
+        self.assertEqual(response.data[0]["pk"], busy_faucet.pk)
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_list_supports_conditional_get(self):
+        faucet = create_test_faucet(self.wallet)
+        endpoint = reverse("FAUCET:faucet-list")
+        etag = self.client.get(endpoint)["ETag"]
+
+        response = self.client.get(endpoint, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            faucet.is_one_time_claim = True
+            faucet.save()
+        response = self.client.get(endpoint, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertTrue(response.data[0]["is_one_time_claim"])
+
 
 class TestClaim(APITestCase):
     def setUp(self) -> None:
@@ -298,6 +343,8 @@ class TestClaim(APITestCase):
             amount=10,
         )
 
+        # the claims were not verified through a batch
+        call_command("rebuild_claim_counters", stdout=StringIO())
         CeleryTasks.update_claims_for_faucet(self.test_faucet1.pk, False)
 
         # refetch test_faucet from DB
@@ -313,6 +360,7 @@ class TestClaim(APITestCase):
             amount=10,
         )
 
+        call_command("rebuild_claim_counters", stdout=StringIO())
         CeleryTasks.update_claims_for_faucet(self.test_faucet1.pk, True)
 
         db_test_faucet1 = Faucet.objects.get(pk=self.test_faucet1.pk)
@@ -674,3 +722,559 @@ class TestFuelChampion(APITestCase):
         self.assertEqual(res.status_code, 200)
         self.assertEqual(len(res.data), 1)
         self.assertEqual(res.data[-1].get("username", 0), self.user_profile.username)
+
+    def test_fuel_champion_of_previous_round_is_not_listed(self):
+        endpoint = reverse("FAUCET:gas-tap-fuel-champion")
+        donation = DonationReceipt.objects.create(
+            user_profile=self.user_profile,
+            tx_hash="0x0",
+            faucet=self.test_faucet,
+            value=10,
+            status=ClaimReceipt.VERIFIED,
+        )
+        FuelChampion.objects.filter(faucet=self.test_faucet).update(
+            round_start=RoundCreditStrategy.get_start_of_previous_round()
+        )
+        DonationReceipt.objects.filter(pk=donation.pk).update(
+            datetime=RoundCreditStrategy.get_start_of_previous_round()
+        )
+        res = self.client.get(endpoint)
+        self.assertEqual(len(res.data), 0)
+
+        CeleryTasks.refresh_fuel_champions()
+        self.assertFalse(
+            FuelChampion.objects.filter(
+                round_start=RoundCreditStrategy.get_start_of_the_round()
+            ).exists()
+        )
+
+
+class TestLeaderboard(APITestCase):
+    def setUp(self) -> None:
+        self.wallet = WalletAccount.objects.create(
+            name="Test Wallet", private_key=test_wallet_key
+        )
+        self.test_faucet = create_test_faucet(self.wallet)
+        self.other_faucet = create_test_faucet(self.wallet, 123)
+        self.user_profile = create_new_user(
+            "0x5A73E32a77E04Fb3285608B0AdEaa000B8e248F4"
+        )
+        self.other_user = create_new_user("0x5A73E32a77E04Fb3285608B0AdEaa000B8e248F3")
+        self.client.force_authenticate(user=self.user_profile.user)
+
+    def donate(self, user_profile, faucet, total_price, tx_hash):
+        donation = DonationReceipt.objects.create(
+            user_profile=user_profile,
+            tx_hash=tx_hash,
+            faucet=faucet,
+            value=1,
+            total_price=total_price,
+            status=ClaimReceipt.VERIFIED,
+        )
+        LeaderboardEntry.add_donation(donation)
+
+    def test_verified_donations_update_ranks(self):
+        self.donate(self.other_user, self.test_faucet, 50, "0x0")
+        self.donate(self.user_profile, self.test_faucet, 20, "0x1")
+        self.donate(self.user_profile, self.other_faucet, 40, "0x2")
+
+        entry = LeaderboardEntry.objects.get(
+            user_profile=self.user_profile, faucet=None
+        )
+        self.assertEqual(entry.sum_total_price, 60)
+        self.assertEqual(
+            sorted(entry.interacted_chains),
+            sorted([self.test_faucet.chain_id, self.other_faucet.chain_id]),
+        )
+
+        res = self.client.get(reverse("FAUCET:gas-tap-leaderboard"))
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            [row["username"] for row in res.data["results"]],
+            [self.user_profile.username, self.other_user.username],
+        )
+        self.assertEqual(res.data["results"][0]["sum_total_price"], "60")
+
+        res = self.client.get(reverse("FAUCET:user-gas-tap-leaderboard"))
+        self.assertEqual(res.data["rank"], 1)
+
+        res = self.client.get(
+            reverse("FAUCET:user-gas-tap-leaderboard"),
+            {"faucet_pk": self.test_faucet.pk},
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["rank"], 2)
+
+    def test_rebuild_leaderboard(self):
+        self.donate(self.other_user, self.test_faucet, 50, "0x0")
+        self.donate(self.user_profile, self.test_faucet, 50, "0x1")
+        LeaderboardEntry.objects.update(sum_total_price=0)
+
+        call_command("rebuild_leaderboard", stdout=StringIO())
+
+        self.assertEqual(LeaderboardEntry.objects.count(), 4)
+        self.assertEqual(
+            set(LeaderboardEntry.objects.values_list("sum_total_price", flat=True)),
+            {50},
+        )
+
+    @patch("faucet.celery_tasks.ConfirmationTracker.get_receipts", return_value={})
+    def test_unmined_donations_expire(self, get_receipts):
+        fresh, stale = [
+            DonationReceipt.objects.create(
+                user_profile=self.user_profile, tx_hash=tx_hash, faucet=self.test_faucet
+            )
+            for tx_hash in ("0x0", "0x1")
+        ]
+        DonationReceipt.objects.filter(pk=stale.pk).update(
+            datetime=timezone.now()
+            - datetime.timedelta(minutes=DonationReceipt.MAX_PENDING_DURATION + 1)
+        )
+
+        CeleryTasks.process_chain_donation_receipts(self.test_faucet.chain_id)
+
+        fresh.refresh_from_db()
+        stale.refresh_from_db()
+        self.assertEqual(fresh.status, ClaimReceipt.PENDING)
+        self.assertEqual(stale.status, ClaimReceipt.REJECTED)
+        self.assertFalse(LeaderboardEntry.objects.exists())
+
+
+class TestFaucetSnapshot(APITestCase):
+    def setUp(self) -> None:
+        self.wallet = WalletAccount.objects.create(
+            name="Test Wallet", private_key=test_wallet_key
+        )
+        self.test_faucet = create_test_faucet(self.wallet)
+
+    @patch("faucet.models.Faucet.get_manager_balance", lambda a: int(t_chain_max * 5))
+    @patch("core.models.Chain.get_wallet_balance", lambda a: 10**18)
+    @patch("core.models.Chain.gas_price", 10)
+    @patch("core.models.Chain.block_gas_limit", 30_000_000)
+    def test_refresh_chain_snapshot(self):
+        CeleryTasks.refresh_chain_snapshot(self.test_faucet.chain.pk)
+
+        faucet = Faucet.objects.get(pk=self.test_faucet.pk)
+        self.assertTrue(faucet.snapshot.has_enough_funds)
+        self.assertTrue(faucet.snapshot.has_enough_fees)
+        self.assertEqual(faucet.remaining_claim_number, 5)
+        self.assertEqual(faucet.current_fuel_level, 1)
+        self.assertEqual(faucet.snapshot.block_gas_limit, 30_000_000)
+        self.assertFalse(faucet.needs_funding)
+
+    @patch("faucet.models.Faucet.get_manager_balance", lambda a: 0)
+    @patch("core.models.Chain.get_wallet_balance", lambda a: 0)
+    @patch("core.models.Chain.gas_price", 10)
+    @patch("core.models.Chain.block_gas_limit", None)
+    def test_refresh_chain_snapshot_needs_funding(self):
+        CeleryTasks.refresh_chain_snapshot(self.test_faucet.chain.pk)
+
+        faucet = Faucet.objects.get(pk=self.test_faucet.pk)
+        self.assertFalse(faucet.snapshot.has_enough_funds)
+        self.assertEqual(faucet.remaining_claim_number, 0)
+        self.assertTrue(faucet.needs_funding)
+
+    def test_balance_view_reads_snapshot(self):
+        endpoint = reverse(
+            "FAUCET:faucet-balance", kwargs={"faucet_pk": self.test_faucet.pk}
+        )
+        response = self.client.get(endpoint)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["contract_balance"], 0)
+        self.assertIsNone(response.data["snapshot_updated_at"])
+
+        FaucetSnapshot.objects.create(
+            faucet=self.test_faucet,
+            manager_balance=1000,
+            wallet_balance=2000,
+            has_enough_funds=True,
+            has_enough_fees=True,
+        )
+        with patch("core.utils.Web3Utils.get_balance") as get_balance:
+            response = self.client.get(endpoint)
+            get_balance.assert_not_called()
+        self.assertEqual(response.data["contract_balance"], 1000)
+        self.assertEqual(response.data["wallet_balance"], 2000)
+        self.assertTrue(response.data["has_enough_funds"])
+        self.assertIsNotNone(response.data["snapshot_updated_at"])
+
+
+class TestTransactionBatchPipeline(APITestCase):
+    def setUp(self) -> None:
+        self.wallet = WalletAccount.objects.create(
+            name="Test Wallet", private_key=test_wallet_key
+        )
+        self.test_faucet = create_test_faucet(self.wallet)
+        self.user_profile = create_new_user()
+
+    def create_pending_claims(self, count):
+        for _ in range(count):
+            ClaimReceipt.objects.create(
+                faucet=self.test_faucet,
+                user_profile=self.user_profile,
+                datetime=timezone.now(),
+                amount=100,
+                _status=ClaimReceipt.PENDING,
+            )
+
+    def test_batches_are_pipelined_up_to_the_window(self):
+        GlobalSettings.set("gastap_max_in_flight_batches", "2")
+        self.create_pending_claims(1)
+        CeleryTasks.process_faucet_pending_claims(self.test_faucet.pk)
+        self.create_pending_claims(1)
+        CeleryTasks.process_faucet_pending_claims(self.test_faucet.pk)
+        self.create_pending_claims(1)
+        CeleryTasks.process_faucet_pending_claims(self.test_faucet.pk)
+
+        self.assertEqual(self.test_faucet.batches.count(), 2)
+        self.assertEqual(
+            ClaimReceipt.objects.filter(
+                faucet=self.test_faucet, batch__isnull=True
+            ).count(),
+            1,
+        )
+
+    def test_batch_size_defaults_without_history(self):
+        self.create_pending_claims(3)
+        CeleryTasks.process_faucet_pending_claims(self.test_faucet.pk)
+
+        batch = self.test_faucet.batches.get()
+        self.assertEqual(batch.size_limit, 32)
+        self.assertEqual(batch.size, 3)
+        self.assertEqual(batch.claims.count(), 3)
+
+    def test_batch_size_adapts_to_block_gas_limit(self):
+        FaucetSnapshot.objects.create(
+            faucet=self.test_faucet, block_gas_limit=1_000_000
+        )
+        TransactionBatch.objects.create(
+            faucet=self.test_faucet,
+            _status=ClaimReceipt.VERIFIED,
+            size=10,
+            gas_estimate=21000 + 10 * 30000,
+        )
+        self.create_pending_claims(12)
+        CeleryTasks.process_faucet_pending_claims(self.test_faucet.pk)
+
+        batch = self.test_faucet.batches.latest("pk")
+        self.assertEqual(batch.size_limit, 9)
+        self.assertEqual(batch.size, 9)
+        self.assertEqual(
+            ClaimReceipt.objects.filter(
+                faucet=self.test_faucet, batch__isnull=True
+            ).count(),
+            3,
+        )
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    @patch("faucet.tasks.process_faucet_pending_claims.apply_async")
+    def test_claim_triggers_coalesced_processing(self, apply_async):
+        claim_manager = ClaimManagerFactory(
+            self.test_faucet, self.user_profile
+        ).get_manager()
+        with self.captureOnCommitCallbacks(execute=True):
+            claim_manager.claim(100, address)
+        schedule_faucet_pending_claims(self.test_faucet.pk)
+
+        apply_async.assert_called_once_with((self.test_faucet.pk,), countdown=2)
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    @patch("faucet.tasks.process_batch.delay")
+    @patch("faucet.tasks.process_faucet_pending_claims.apply_async")
+    def test_full_batch_reschedules_itself(self, apply_async, delay):
+        GlobalSettings.set("gastap_max_batch_size", "2")
+        self.create_pending_claims(3)
+        schedule_faucet_pending_claims(self.test_faucet.pk)
+
+        process_faucet_pending_claims(self.test_faucet.pk)
+
+        self.assertEqual(apply_async.call_count, 2)
+        apply_async.assert_called_with((self.test_faucet.pk,), countdown=1)
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    @patch("faucet.tasks.process_batch.apply_async")
+    @patch(
+        "faucet.faucet_manager.fund_manager.EVMFundManager.send_batch",
+        side_effect=FundMangerException.GasPriceTooHigh("Gas price is too high"),
+    )
+    @patch("web3.Web3.is_connected", lambda self: True)
+    def test_failed_send_is_retried_with_backoff(self, send_batch, apply_async):
+        batch = TransactionBatch.objects.create(faucet=self.test_faucet)
+
+        process_batch(batch.pk)
+        process_batch(batch.pk)
+
+        self.assertEqual(send_batch.call_count, 2)
+        self.assertEqual(
+            [call.kwargs["countdown"] for call in apply_async.call_args_list],
+            [5, 10],
+        )
+
+    @patch("web3.Web3.is_connected", lambda self: True)
+    @patch("faucet.faucet_manager.fund_manager.EVMFundManager.replace_stuck_batch")
+    @patch(
+        "faucet.faucet_manager.fund_manager.EVMFundManager.get_batch_status",
+        return_value=None,
+    )
+    def test_stuck_batch_is_replaced(self, get_batch_status, replace_stuck_batch):
+        self.create_pending_claims(1)
+        batch = TransactionBatch.objects.create(
+            faucet=self.test_faucet,
+            tx_hash="0x1",
+            nonce=4,
+            gas_price=10,
+            broadcast_at=timezone.now() - datetime.timedelta(minutes=30),
+        )
+        ClaimReceipt.objects.update(batch=batch)
+
+        CeleryTasks.update_pending_batch_with_tx_hash(batch.pk)
+
+        replace_stuck_batch.assert_called_once()
+        batch.refresh_from_db()
+        self.assertEqual(batch._status, ClaimReceipt.PENDING)
+
+    @patch("web3.Web3.is_connected", lambda self: True)
+    @patch("core.utils.Web3Utils.get_transaction_count", return_value=4)
+    @patch(
+        "faucet.faucet_manager.fund_manager.EVMFundManager.fill_nonce_gap",
+        side_effect=Exception("rpc is down"),
+    )
+    def test_expired_batch_resyncs_nonce(self, fill_nonce_gap, get_transaction_count):
+        chain = self.test_faucet.chain
+        address = Account.from_key(chain.wallet.main_key).address
+        AccountNonce.objects.create(chain=chain, address=address, next_nonce=5)
+        AccountNonce.objects.update(
+            updated_at=timezone.now() - datetime.timedelta(minutes=5)
+        )
+        batch = TransactionBatch.objects.create(faucet=self.test_faucet, nonce=4)
+        TransactionBatch.objects.filter(pk=batch.pk).update(
+            datetime=timezone.now() - datetime.timedelta(days=1)
+        )
+
+        CeleryTasks.process_batch(batch.pk)
+
+        batch.refresh_from_db()
+        self.assertEqual(batch._status, ClaimReceipt.REJECTED)
+        self.assertEqual(AccountNonce.objects.get().next_nonce, 4)
+
+    @patch("web3.Web3.is_connected", lambda self: True)
+    @patch("core.utils.Web3Utils.batch_request")
+    def test_chain_batches_are_checked_in_one_request(self, batch_request):
+        mined_receipt = {"status": "0x1", "gasUsed": "0xc350", "blockNumber": "0xf"}
+        batch_request.return_value = ["0x10", None, mined_receipt, None]
+        self.create_pending_claims(1)
+        replaced_batch = TransactionBatch.objects.create(
+            faucet=self.test_faucet,
+            tx_hash="0x2",
+            nonce=4,
+            replaced_tx_hashes=["0x1"],
+            broadcast_at=timezone.now(),
+        )
+        ClaimReceipt.objects.update(batch=replaced_batch)
+        pending_batch = TransactionBatch.objects.create(
+            faucet=self.test_faucet,
+            tx_hash="0x3",
+            nonce=5,
+            broadcast_at=timezone.now(),
+        )
+
+        CeleryTasks.update_chain_pending_batches(self.test_faucet.chain.pk)
+
+        batch_request.assert_called_once()
+        replaced_batch.refresh_from_db()
+        self.assertEqual(replaced_batch._status, ClaimReceipt.VERIFIED)
+        self.assertEqual(replaced_batch.gas_used, 50000)
+        self.assertEqual(replaced_batch.claims.first()._status, ClaimReceipt.VERIFIED)
+        pending_batch.refresh_from_db()
+        self.assertEqual(pending_batch._status, ClaimReceipt.PENDING)
+
+
+class TestClaimCounter(APITestCase):
+    def setUp(self) -> None:
+        self.wallet = WalletAccount.objects.create(
+            name="Test Wallet", private_key=test_wallet_key
+        )
+        self.test_faucet = create_test_faucet(self.wallet)
+        self.user_profile = create_new_user()
+
+    def create_claim(self, _status=ClaimReceipt.PENDING, batch=None):
+        return ClaimReceipt.objects.create(
+            faucet=self.test_faucet,
+            user_profile=self.user_profile,
+            datetime=timezone.now(),
+            amount=100,
+            _status=_status,
+            batch=batch,
+        )
+
+    @patch("web3.Web3.is_connected", lambda self: True)
+    @patch(
+        "faucet.faucet_manager.fund_manager.EVMFundManager.get_batch_status",
+        return_value=ClaimReceipt.VERIFIED,
+    )
+    def test_verified_batch_increments_counters(self, get_batch_status):
+        batch = TransactionBatch.objects.create(faucet=self.test_faucet, tx_hash="0x1")
+        self.create_claim(batch=batch)
+        self.create_claim(batch=batch)
+
+        CeleryTasks.update_pending_batch_with_tx_hash(batch.pk)
+        # already verified claims are not counted twice
+        CeleryTasks.update_pending_batch_with_tx_hash(batch.pk)
+
+        round_start = RoundCreditStrategy.get_start_of_the_round()
+        self.assertEqual(ClaimCounter.get_count(), 2)
+        self.assertEqual(ClaimCounter.get_count(self.test_faucet), 2)
+        self.assertEqual(ClaimCounter.get_count(self.test_faucet, round_start), 2)
+        self.assertEqual(self.test_faucet.total_claims, 2)
+
+        response = self.client.get(reverse("FAUCET:claims-count"))
+        self.assertEqual(response.data["count"], 2)
+
+    def test_rebuild_claim_counters(self):
+        ClaimCounter.increment(self.test_faucet.pk, None, 5)
+        self.create_claim(ClaimReceipt.VERIFIED)
+        self.create_claim(ClaimReceipt.VERIFIED)
+        self.create_claim(ClaimReceipt.REJECTED)
+
+        call_command("rebuild_claim_counters", stdout=StringIO())
+
+        round_start = RoundCreditStrategy.get_start_of_the_round()
+        self.assertEqual(ClaimCounter.get_count(), 2)
+        self.assertEqual(ClaimCounter.get_count(self.test_faucet), 2)
+        self.assertEqual(ClaimCounter.get_count(self.test_faucet, round_start), 2)
+
+    def test_rebuild_claim_counters_uses_runtime_rounds(self):
+        claim = self.create_claim(ClaimReceipt.VERIFIED)
+        claim.datetime = timezone.now() - datetime.timedelta(days=10)
+        claim.save()
+
+        call_command("rebuild_claim_counters", stdout=StringIO())
+
+        round_start = RoundCreditStrategy.get_round_start(claim.datetime)
+        self.assertEqual(ClaimCounter.get_count(self.test_faucet, round_start), 1)
+
+
+class TestClaimLedger(APITestCase):
+    def setUp(self) -> None:
+        self.wallet = WalletAccount.objects.create(
+            name="Test Wallet", private_key=test_wallet_key
+        )
+        self.test_faucet = create_test_faucet(self.wallet)
+        self.user_profile = create_new_user()
+        self.claim_manager = ClaimManagerFactory(
+            self.test_faucet, self.user_profile
+        ).get_manager()
+
+    def get_ledger(self):
+        return ClaimLedger.objects.get(
+            user_profile=self.user_profile,
+            chain=self.test_faucet.chain,
+            round_start=RoundCreditStrategy.get_start_of_the_round(),
+        )
+
+    def test_ledger_follows_claim_statuses(self):
+        claim = self.claim_manager.claim(100, address)
+        ledger = self.get_ledger()
+        self.assertEqual(ledger.pending_count, 1)
+        self.assertEqual(ledger.claims_count, 1)
+
+        ClaimLedger.update_claims_status(
+            ClaimReceipt.objects.filter(pk=claim.pk), ClaimReceipt.VERIFIED
+        )
+        ledger = self.get_ledger()
+        self.assertEqual(ledger.pending_count, 0)
+        self.assertEqual(ledger.claims_count, 1)
+        self.assertEqual(ledger.claimed_amount, 100)
+        self.assertEqual(self.claim_manager.get_credit_strategy().get_claimed(), 100)
+
+        claim = self.claim_manager.claim(50, address)
+        claim._status = ClaimReceipt.REJECTED
+        claim.save()
+        ledger = self.get_ledger()
+        self.assertEqual(ledger.pending_count, 0)
+        self.assertEqual(ledger.claims_count, 1)
+        self.assertEqual(ledger.claimed_amount, 100)
+
+    def test_round_claim_limit_is_read_from_ledger(self):
+        GlobalSettings.set("gastap_round_claim_limit", "1")
+        claim = self.claim_manager.claim(100, address)
+        claim._status = ClaimReceipt.VERIFIED
+        claim.save()
+
+        with self.assertRaises(AssertionError):
+            self.claim_manager.claim(100, address)
+
+    def test_unitap_pass_is_used_once_per_round(self):
+        claim = self.claim_manager.claim(100, address, ups=[7])
+        claim._status = ClaimReceipt.VERIFIED
+        claim.save()
+
+        with self.assertRaises(AssertionError):
+            self.claim_manager.claim(100, address, ups=[7])
+        self.assertEqual(
+            UnitapPassUsage.get_unused(
+                UnitapPassUsage.get_scope(self.test_faucet), [7, 8]
+            ),
+            [7, 8],
+        )
+        self.assertEqual(
+            UnitapPassUsage.get_unused(
+                UnitapPassUsage.get_scope(self.test_faucet),
+                [7, 8],
+                RoundCreditStrategy.get_start_of_the_round(),
+            ),
+            [8],
+        )
+        self.assertEqual(
+            UnitapPassUsage.get_unused(
+                UnitapPassUsage.get_scope(self.test_faucet),
+                [7, 8],
+                RoundCreditStrategy.get_start_of_the_round(),
+                collection="unitap-pass-base",
+            ),
+            [7, 8],
+        )
+
+    def test_rebuild_claim_ledger(self):
+        ClaimReceipt.objects.create(
+            faucet=self.test_faucet,
+            user_profile=self.user_profile,
+            datetime=timezone.now(),
+            amount=100,
+            _status=ClaimReceipt.VERIFIED,
+        )
+        ClaimReceipt.objects.filter(user_profile=self.user_profile).update(amount=70)
+        ClaimLedger.objects.update(pending_count=3)
+
+        call_command("rebuild_claim_ledger", stdout=StringIO())
+
+        ledger = self.get_ledger()
+        self.assertEqual(ledger.claimed_amount, 70)
+        self.assertEqual(ledger.pending_count, 0)
+        self.assertEqual(ledger.claims_count, 1)
+
+    def test_rebuild_claim_ledger_uses_runtime_rounds(self):
+        claim_datetime = timezone.now() - datetime.timedelta(days=10)
+        for amount in (30, 40):
+            ClaimReceipt.objects.create(
+                faucet=self.test_faucet,
+                user_profile=self.user_profile,
+                datetime=claim_datetime,
+                amount=amount,
+                _status=ClaimReceipt.VERIFIED,
+            )
+
+        call_command("rebuild_claim_ledger", stdout=StringIO())
+
+        ledger = ClaimLedger.objects.get(
+            user_profile=self.user_profile,
+            round_start=RoundCreditStrategy.get_round_start(claim_datetime),
+        )
+        self.assertEqual(ledger.claimed_amount, 70)
+        self.assertEqual(ledger.claims_count, 2)
@@ -50,11 +50,7 @@ urlpatterns = [
         cache_page(60 * 10)(ClaimCountView.as_view()),
         name="claims-count",
     ),
-    path(
-        "faucet/list/",
-        cache_page(60 * 3)(FaucetListView.as_view()),
-        name="faucet-list",
-    ),
+    path("faucet/list/", FaucetListView.as_view(), name="faucet-list"),
     path(
         "faucet/small-list/",
         cache_page(60 * 3)(SmallFaucetListView.as_view()),
@@ -1,16 +1,16 @@
 import datetime
+import hashlib
 import json
 import os
 
 import pytz
 import rest_framework.exceptions
 from django.conf import settings
-from django.contrib.postgres.expressions import ArraySubquery
 from django.core.cache import cache
-from django.db.models import F, FloatField, OuterRef, Subquery, Sum
-from django.db.models.functions import Cast
+from django.db.models import F, Prefetch
 from django.http import FileResponse, Http404, HttpResponse
 from django.urls import reverse
+from django.utils.http import parse_etags
 from rest_framework.generics import (
     ListAPIView,
     ListCreateAPIView,
@@ -19,19 +19,30 @@ from rest_framework.generics import (
 )
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 from rest_framework.views import APIView
 
 from authentication.models import UserProfile
 from core.filters import IsOwnerFilterBackend
 from core.paginations import StandardResultsSetPagination
 from core.validators import address_validator
+from faucet.constants import FAUCET_LIST_CACHE_TIMEOUT
 from faucet.faucet_manager.claim_manager import (
     ClaimManagerFactory,
     LimitedChainClaimManager,
 )
 from faucet.faucet_manager.credit_strategy import RoundCreditStrategy
-from faucet.filters import FaucetFilterBackend
-from faucet.models import ClaimReceipt, DonationReceipt, Faucet, GlobalSettings
+from faucet.filters import FaucetFilterBackend, LeaderboardFaucetFilterBackend
+from faucet.models import (
+    ClaimCounter,
+    ClaimReceipt,
+    DonationReceipt,
+    Faucet,
+    FuelChampion,
+    GlobalSettings,
+    LeaderboardEntry,
+    get_faucet_list_version,
+)
 from faucet.serializers import (
     DonationReceiptSerializer,
     FaucetBalanceSerializer,
@@ -129,18 +140,40 @@ class FaucetListView(ListAPIView):
     """
     list of faucets
 
-    this endpoint returns detailed user specific info if supplied with an address
+    the response is cached until a faucet, chain, snapshot or claim counter changes
+    and clients can poll it with If-None-Match
     """
 
     serializer_class = FaucetSerializer
 
     def get_queryset(self):
-        queryset = Faucet.objects.filter(is_active=True, show_in_gastap=True)
-
-        sorted_queryset = sorted(
-            queryset, key=lambda obj: obj.total_claims_since_last_round, reverse=True
+        return (
+            Faucet.objects.filter(is_active=True, show_in_gastap=True)
+            .select_related("chain", "snapshot")
+            .prefetch_related(
+                Prefetch(
+                    "claim_counters",
+                    queryset=ClaimCounter.objects.filter(round_start=None),
+                    to_attr="all_time_claim_counters",
+                )
+            )
+            .order_by(F("total_claims_since_last_round").desc(nulls_last=True), "pk")
         )
-        return sorted_queryset
+
+    def list(self, request, *args, **kwargs):
+        cache_key = f"gastap_faucet_list_{get_faucet_list_version()}"
+        cached = cache.get(cache_key)
+        if cached is None:
+            serializer = self.get_serializer(self.get_queryset(), many=True)
+            content = json.dumps(serializer.data, cls=JSONEncoder, sort_keys=True)
+            etag = f'"{hashlib.md5(content.encode()).hexdigest()}"'
+            cached = (etag, json.loads(content))
+            cache.set(cache_key, cached, FAUCET_LIST_CACHE_TIMEOUT)
+
+        etag, data = cached
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            return Response(status=304, headers={"ETag": etag})
+        return Response(data, headers={"ETag": etag})
 
 
 class SmallFaucetListView(ListAPIView):
@@ -233,7 +266,10 @@ class FaucetBalanceView(RetrieveAPIView):
         if faucet_pk is None:
             raise Http404("Faucet ID not provided")
         return get_object_or_404(
-            Faucet, pk=faucet_pk, show_in_gastap=True, is_deprecated=False
+            Faucet.objects.select_related("chain", "chain__wallet", "snapshot"),
+            pk=faucet_pk,
+            show_in_gastap=True,
+            is_deprecated=False,
         )
 
 
@@ -241,7 +277,7 @@ class FaucetBalanceListView(ListAPIView):
     serializer_class = FaucetBalanceSerializer
     queryset = Faucet.objects.filter(
         is_active=True, show_in_gastap=True, is_deprecated=False
-    )
+    ).select_related("chain", "chain__wallet", "snapshot")
 
 
 class DonationReceiptView(ListCreateAPIView):
@@ -263,9 +299,9 @@ class DonationReceiptView(ListCreateAPIView):
 
 
 class UserLeaderboardView(RetrieveAPIView):
-    filter_backends = [FaucetFilterBackend]
+    filter_backends = [LeaderboardFaucetFilterBackend]
     permission_classes = [IsAuthenticated]
-    queryset = DonationReceipt.objects.all()
+    queryset = LeaderboardEntry.objects.select_related("user_profile")
     serializer_class = LeaderboardSerializer
 
     def get_user(self) -> UserProfile:
@@ -273,101 +309,28 @@ class UserLeaderboardView(RetrieveAPIView):
 
     def get_object(self):
         queryset = self.filter_queryset(self.get_queryset())
-        queryset = (
-            queryset.filter(status=ClaimReceipt.VERIFIED)
-            .annotate(total_price_float=Cast("total_price", FloatField()))
-            .values("user_profile")
-            .annotate(sum_total_price=Sum("total_price_float"))
-        )
-        user_obj = get_object_or_404(queryset, user_profile=self.get_user().pk)
-        user_rank = (
-            queryset.filter(sum_total_price__gt=user_obj.get("sum_total_price")).count()
-            + 1
-        )
-        user_obj["rank"] = user_rank
-        user_obj["username"] = self.get_user().username
-        interacted_chains = list(
-            DonationReceipt.objects.filter(user_profile=self.get_user())
-            .filter(status=ClaimReceipt.VERIFIED)
-            .values_list("faucet__chain", flat=True)  # TODO fixme
-            .distinct()
-        )
-        user_obj["interacted_chains"] = interacted_chains
-
-        return user_obj
+        entry = get_object_or_404(queryset, user_profile=self.get_user())
+        entry.rank = entry.get_rank()
+        return entry
 
 
 class LeaderboardView(ListAPIView):
     serializer_class = LeaderboardSerializer
     pagination_class = StandardResultsSetPagination
-    queryset = DonationReceipt.objects.all()
-    filter_backends = [FaucetFilterBackend]
-
-    def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
-        donation_receipt = (
-            queryset.filter(status=ClaimReceipt.VERIFIED)
-            .annotate(total_price_float=Cast("total_price", FloatField()))
-            .values("user_profile")
-            .annotate(sum_total_price=Sum("total_price_float"))
-            .order_by("-sum_total_price")
-        )
-        subquery_interacted_chains = (
-            DonationReceipt.objects.filter(user_profile=OuterRef("user_profile"))
-            .filter(status=ClaimReceipt.VERIFIED)
-            .values_list("faucet__chain", flat=True)
-            .distinct()
-        )
-        queryset = donation_receipt.annotate(
-            interacted_chains=ArraySubquery(subquery_interacted_chains)
-        )
-        subquery_username = UserProfile.objects.filter(
-            pk=OuterRef("user_profile")
-        ).values("username")
-        queryset = queryset.annotate(username=Subquery(subquery_username))
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+    queryset = LeaderboardEntry.objects.select_related("user_profile").order_by(
+        "-sum_total_price", "pk"
+    )
+    filter_backends = [LeaderboardFaucetFilterBackend]
 
 
 class FuelChampionView(ListAPIView):
     serializer_class = FuelChampionSerializer
 
     def get_queryset(self):
-        queryset = cache.get("FuelChampionQuerySet")
-        if queryset is not None:
-            return queryset
-        round_datetime = RoundCreditStrategy.get_start_of_the_round()
-        subquery_user_profile = (
-            DonationReceipt.objects.filter(status=ClaimReceipt.VERIFIED)
-            .filter(datetime__gt=round_datetime)
-            .filter(faucet=OuterRef("faucet"))
-            .annotate(float_value=Cast("value", FloatField()))
-            .values("user_profile", "faucet")
-            .annotate(value=Sum("float_value"))
-            .order_by("-value")
-            .values("user_profile")[:1]
-        )
-        username_subquery = UserProfile.objects.filter(
-            pk=OuterRef("user_profile")
-        ).values("username")
-        queryset = (
-            DonationReceipt.objects.values("faucet", "user_profile")
-            .annotate(max_user_profile=Subquery(subquery_user_profile))
-            .filter(max_user_profile__isnull=False)
-            .filter(user_profile=F("max_user_profile"))
-            .annotate(faucet_pk=F("faucet"))
-            .annotate(username=username_subquery)
-            .values("faucet_pk", "username")
-            .distinct()
-        )
-
-        cache.set("FuelChampionQuerySet", queryset, timeout=120)
-        return queryset
+        # a new round has no champions until its first donation is verified
+        return FuelChampion.objects.filter(
+            round_start=RoundCreditStrategy.get_start_of_the_round()
+        ).select_related("user_profile")
 
 
 def artwork_video(request):
@@ -1,7 +1,6 @@
 from authentication.models import UserProfile
 from core.constraints import ConstraintParam, ConstraintVerification
-from core.models import Chain
-from core.utils import NFTClient
+from core.models import NetworkTypes, UnitapPass
 
 
 class HaveUnitapPass(ConstraintVerification):
@@ -14,22 +13,10 @@ class HaveUnitapPass(ConstraintVerification):
 
     def is_observed(self, *args, **kwargs):
         min_balance = self.param_values[ConstraintParam.MINIMUM.name]
-        chain = Chain.objects.get(chain_id=8453)
-        nft_client = NFTClient(chain, "0xA27b7B65b0de0c08b002E6be828731FA865027bB")
-
-        user_addresses = [
-            nft_client.to_checksum_address(wallet.address.lower())
-            for wallet in self.user_profile.wallets.filter(wallet_type=chain.chain_type)
-        ]
-
-        user_balance = sum(
-            int(nft_client.get_number_of_tokens(user_address))
-            for user_address in user_addresses
-        )
-
-        if user_balance >= min_balance:
-            return True
-        return False
+        addresses = self.user_profile.wallets.filter(
+            wallet_type=NetworkTypes.EVM
+        ).values_list("address", flat=True)
+        return UnitapPass.count_owned_by(addresses) >= min_balance
 
 
 class NotHaveUnitapPass(HaveUnitapPass):
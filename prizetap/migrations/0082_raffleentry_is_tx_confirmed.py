@@ -0,0 +1,32 @@
+# Generated by Django 5.1.2 on 2026-10-17 02:45
+
+from django.db import migrations, models
+
+
+def mark_sent_pre_enrollments_confirmed(apps, schema_editor):
+    # pre-enrollment transactions used to be waited on before being saved
+    RaffleEntry = apps.get_model("prizetap", "RaffleEntry")
+    RaffleEntry.objects.filter(pre_enrollment=True, tx_hash__isnull=False).update(
+        is_tx_confirmed=True
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("prizetap", "0081_alter_constraint_name"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="raffleentry",
+            name="is_tx_confirmed",
+            field=models.BooleanField(
+                blank=True,
+                default=False,
+                help_text="pre-enrollment tx_hash is confirmed",
+            ),
+        ),
+        migrations.RunPython(
+            mark_sent_pre_enrollments_confirmed, migrations.RunPython.noop
+        ),
+    ]
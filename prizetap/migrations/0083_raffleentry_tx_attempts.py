@@ -0,0 +1,19 @@
+# Generated by Django 5.1.2 on 2026-10-17 04:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("prizetap", "0082_raffleentry_is_tx_confirmed"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="raffleentry",
+            name="tx_attempts",
+            field=models.PositiveSmallIntegerField(
+                default=0, help_text="pre-enrollment transactions sent for the entry"
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.2 on 2026-10-17 05:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("prizetap", "0083_raffleentry_tx_attempts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="raffleentry",
+            name="tx_sent_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="last pre-enrollment transaction sent at",
+                null=True,
+            ),
+        ),
+    ]
@@ -130,6 +130,12 @@ class Raffle(models.Model):
     def number_of_onchain_entries(self):
         return self.entries.filter(tx_hash__isnull=False).count()
 
+    @property
+    def has_unconfirmed_pre_enrollments(self):
+        return self.entries.filter(
+            pre_enrollment=True, tx_hash__isnull=False, is_tx_confirmed=False
+        ).exists()
+
     @property
     def winners(self):
         winner_entries = self.winner_entries
@@ -155,6 +161,11 @@ class Raffle(models.Model):
 
 
 class RaffleEntry(models.Model):
+    # a pre-enrollment is given up after this many failed transactions
+    MAX_TX_ATTEMPTS = 3
+    # a pre-enrollment transaction without a receipt by then counts as dropped
+    MAX_TX_PENDING_DURATION = 30  # minutes
+
     class Meta:
         unique_together = (("raffle", "user_profile"),)
         verbose_name_plural = "raffle entries"
@@ -176,6 +187,15 @@ class RaffleEntry(models.Model):
     is_winner = models.BooleanField(blank=True, default=False)
     pre_enrollment = models.BooleanField(blank=True, default=False)
     tx_hash = models.CharField(max_length=255, blank=True, null=True)
+    is_tx_confirmed = models.BooleanField(
+        blank=True, default=False, help_text="pre-enrollment tx_hash is confirmed"
+    )
+    tx_attempts = models.PositiveSmallIntegerField(
+        default=0, help_text="pre-enrollment transactions sent for the entry"
+    )
+    tx_sent_at = models.DateTimeField(
+        blank=True, null=True, help_text="last pre-enrollment transaction sent at"
+    )
     claiming_prize_tx = models.CharField(max_length=255, blank=True, null=True)
 
     def __str__(self):
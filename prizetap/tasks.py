@@ -1,18 +1,27 @@
 # import csv
 import logging
 import time
+from collections import Counter, defaultdict
 
-import requests
 from celery import shared_task
+from django.conf import settings
 from django.db import transaction
 from django.db.models import F
+from django.db.models.functions import Coalesce, Lower
 from django.utils import timezone
 from web3 import Web3
 
-from authentication.models import NetworkTypes, UserProfile, Wallet
+from authentication.models import (
+    GitcoinPassportConnection,
+    NetworkTypes,
+    UserProfile,
+    Wallet,
+)
 from brightIDfaucet.settings import DEPLOYMENT_ENV
 from core.helpers import memcache_lock
+from core.request_helper import RequestHelper
 from core.thirdpartyapp import Subgraph
+from core.utils import ConfirmationTracker
 
 from .models import Raffle, RaffleEntry
 from .utils import PrizetapContractClient, VRFClientContractClient
@@ -60,13 +69,14 @@ def set_raffle_random_words(self):
 
 def set_random_words(raffle: Raffle):
     app = "unitap" if DEPLOYMENT_ENV == "main" else "stage_unitap"
-    muon_response = requests.get(
+    muon_response = RequestHelper().request(
+        "GET",
         (
             f"https://shield.unitap.app/v1/?app={app}&method=random-words&"
             f"params[chainId]={raffle.chain.chain_id}"
             f"&params[prizetapRaffle]={raffle.contract}&"
             f"params[raffleId]={raffle.raffleId}"
-        )
+        ),
     )
     muon_response = muon_response.json()
     if muon_response["success"]:
@@ -170,6 +180,10 @@ def request_random_words_for_expired_raffles(self):
         if raffles_queryset.count() > 0:
             for raffle in raffles_queryset:
                 try:
+                    if raffle.has_unconfirmed_pre_enrollments:
+                        # the winners are drawn from the confirmed entries only
+                        print(f"Waiting for the raffle {raffle.name} pre-enrollments")
+                        continue
                     if raffle.number_of_onchain_entries > 0:
                         print(f"Request random words for the raffle {raffle.name}")
                         request_random_words(raffle)
@@ -203,14 +217,23 @@ def set_raffle_ids(self):
             .order_by("id")
         )
         if raffles_queryset.count() > 0:
+            receipts = ConfirmationTracker.get_receipts_by_chain(
+                (raffle.chain, raffle.tx_hash)
+                for raffle in raffles_queryset.select_related("chain")
+            )
             for raffle in raffles_queryset:
+                receipt = receipts.get(raffle.tx_hash)
+                if receipt is None:
+                    # not confirmed yet, it is checked again on the next run
+                    continue
+                if receipt["status"] != 1:
+                    raffle.status = Raffle.Status.REJECTED
+                    raffle.save()
+                    continue
                 try:
                     print(f"Setting the raffle {raffle.name} raffleId")
                     contract_client = PrizetapContractClient(raffle)
 
-                    receipt = contract_client.web3_utils.get_transaction_receipt(
-                        raffle.tx_hash
-                    )
                     log = contract_client.get_raffle_created_log(receipt)
 
                     raffle.raffleId = log["args"]["raffleId"]
@@ -274,22 +297,24 @@ def set_raffle_ids(self):
 
 @shared_task
 def update_prizetap_winning_chance_number():
-    sub = Subgraph()
-    holders = sub.get_unitap_pass_holders()
-    for holder_address, unitap_pass_ids in holders.items():
-        try:
-            user_profile = (
-                Wallet.objects.prefetch_related()
-                .get(address__iexact=holder_address, wallet_type=NetworkTypes.EVM)
-                .user_profile
+    # the Ethereum mainnet passes, the UnitapPass index only follows the Base ones
+    pass_counts = Counter(
+        unitap_pass["owner"].lower() for unitap_pass in Subgraph().iter_unitap_passes()
+    )
+    wallets = (
+        Wallet.objects.annotate(lower_address=Lower("address"))
+        .filter(lower_address__in=pass_counts, wallet_type=NetworkTypes.EVM)
+        .values_list("user_profile", "lower_address")
+    )
+    user_pass_counts = defaultdict(int)
+    for user_profile_id, address in wallets:
+        user_pass_counts[user_profile_id] += pass_counts[address]
+    with transaction.atomic():
+        for user_profile_id, count in user_pass_counts.items():
+            UserProfile.objects.filter(pk=user_profile_id).update(
+                prizetap_winning_chance_number=F("prizetap_winning_chance_number")
+                + count
             )
-            with transaction.atomic():
-                user_profile.prizetap_winning_chance_number = F(
-                    "prizetap_winning_chance_number"
-                ) + len(unitap_pass_ids)
-                user_profile.save(update_fields=("prizetap_winning_chance_number",))
-        except Wallet.DoesNotExist:
-            logging.warning(f"Wallet address: {holder_address} not exists.")
 
 
 @shared_task(bind=True)
@@ -356,6 +381,49 @@ def process_raffles_pre_enrollments(self):
                 raffle.save()
 
 
+def confirm_pre_enrollment_txs():
+    """
+    Mark the entries of confirmed pre-enrollment transactions, the entries of a
+    failed or dropped transaction are released so they are sent again
+    """
+    pending_txs = (
+        RaffleEntry.objects.filter(pre_enrollment=True, is_tx_confirmed=False)
+        .filter(tx_hash__isnull=False)
+        .values_list("raffle_id", "tx_hash")
+        .distinct()
+    )
+    raffles = Raffle.objects.select_related("chain").in_bulk(
+        {raffle_id for raffle_id, _ in pending_txs}
+    )
+    receipts = ConfirmationTracker.get_receipts_by_chain(
+        (raffles[raffle_id].chain, tx_hash) for raffle_id, tx_hash in pending_txs
+    )
+    for tx_hash, receipt in receipts.items():
+        entries = RaffleEntry.objects.filter(pre_enrollment=True, tx_hash=tx_hash)
+        if receipt["status"] == 1:
+            entries.update(is_tx_confirmed=True)
+        else:
+            logging.error(f"Pre-enrollment transaction {tx_hash} failed")
+            # released to be sent again, unless they used up their attempts
+            entries.update(tx_hash=None)
+
+    # a dropped transaction never gets a receipt, without a timeout its entries
+    # would hold the raffle back forever
+    sent_before = timezone.now() - timezone.timedelta(
+        minutes=RaffleEntry.MAX_TX_PENDING_DURATION
+    )
+    dropped_entries = (
+        RaffleEntry.objects.filter(pre_enrollment=True, is_tx_confirmed=False)
+        .filter(tx_hash__isnull=False)
+        .exclude(tx_hash__in=list(receipts))
+        .annotate(sent_at=Coalesce("tx_sent_at", "created_at"))
+        .filter(sent_at__lt=sent_before)
+    )
+    for tx_hash in dropped_entries.values_list("tx_hash", flat=True).distinct():
+        logging.error(f"Pre-enrollment transaction {tx_hash} was dropped")
+    dropped_entries.update(tx_hash=None)
+
+
 @shared_task(bind=True)
 def onchain_pre_enrollments(self):
     id = f"{self.name}-LOCK"
@@ -364,9 +432,11 @@ def onchain_pre_enrollments(self):
         if not acquired:
             print(f"Could not acquire process lock at {self.name}")
             return
+        confirm_pre_enrollment_txs()
         entries_queryset = (
             RaffleEntry.objects.filter(pre_enrollment=True)
             .filter(tx_hash__isnull=True)
+            .filter(tx_attempts__lt=RaffleEntry.MAX_TX_ATTEMPTS)
             .exclude(raffle__deadline__lt=timezone.now())
             .order_by("id")
         )
@@ -397,9 +467,37 @@ def onchain_pre_enrollments(self):
                 with transaction.atomic():
                     for entry in batch_entry:
                         entry.tx_hash = tx_hash
+                        entry.tx_attempts += 1
+                        entry.tx_sent_at = timezone.now()
                         entry.save()
             except Exception as e:
                 logging.error(
                     f"Unable to pre-enroll raffle {first_entry.raffle.pk} entries"
                 )
                 logging.error(e)
+
+
+@shared_task(bind=True)
+def refresh_raffle_entrants_passport_scores(self):
+    """
+    The entrants of the raffles that are not over and check the humanity score
+    are rescored on a tighter budget than the other users
+    """
+    id_ = f"{self.name}-LOCK"
+    with memcache_lock(id_, self.app.oid, lock_expire=600) as acquired:
+        if not acquired:
+            logging.info("Could not acquire process lock")
+            return
+        raffles = Raffle.objects.filter(
+            is_active=True,
+            deadline__gt=timezone.now(),
+            constraints__name="core.HasMinimumHumanityScore",
+        )
+        entrants = RaffleEntry.objects.filter(raffle__in=raffles).values("user_profile")
+        connections = GitcoinPassportConnection.get_stale(
+            settings.GITCOIN_PASSPORT_RAFFLE_SCORE_MAX_AGE
+        ).filter(user_profile__in=entrants)[
+            : settings.GITCOIN_PASSPORT_REFRESH_BATCH_SIZE
+        ]
+        refreshed = GitcoinPassportConnection.refresh_scores(connections)
+        logging.info(f"Refreshed {refreshed} gitcoin passport scores of entrants")
@@ -4,15 +4,26 @@ from unittest.mock import PropertyMock, patch
 
 from django.contrib.auth.models import User
 from django.core.cache import cache
+from django.test import override_settings
 from django.urls import reverse
 from django.utils import timezone
+from eth_abi import encode
+from eth_utils import event_abi_to_log_topic
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.test import APITestCase
+from web3 import Web3
 
-from authentication.models import UserProfile, Wallet
+from authentication.models import GitcoinPassportConnection, UserProfile, Wallet
 from core.models import Chain, NetworkTypes, WalletAccount
+from core.utils import ConfirmationTracker
 
 from .models import Constraint, Raffle, RaffleEntry
+from .tasks import (
+    onchain_pre_enrollments,
+    refresh_raffle_entrants_passport_scores,
+    request_random_words_for_expired_raffles,
+)
+from .utils import PrizetapContractClient
 from .validators import RaffleEnrollmentValidator
 
 # from .utils import PrizetapContractClient
@@ -160,6 +171,248 @@ class RaffleTestCase(BaseTestCase):
         self.assertFalse(self.raffle.is_claimable)
 
 
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class RafflePreEnrollmentTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.raffle = Raffle.objects.create(
+            name="Test Raffle",
+            description="Test Raffle Description",
+            contract=erc20_contract_address,
+            raffleId=1,
+            creator_profile=self.user_profile,
+            prize_amount=1e14,
+            prize_asset="0x0000000000000000000000000000000000000000",
+            prize_name="Test raffle",
+            prize_symbol="Eth",
+            decimals=18,
+            chain=self.chain,
+            deadline=timezone.now() + timezone.timedelta(days=1),
+            max_number_of_entries=2,
+            status=Raffle.Status.VERIFIED,
+        )
+        self.entry = RaffleEntry.objects.create(
+            raffle=self.raffle,
+            user_profile=self.user_profile,
+            user_wallet_address="0xc1cbb2ab97260a8a7d4591045a9fb34ec14e87fb",
+            pre_enrollment=True,
+            tx_hash="0x1",
+            tx_attempts=1,
+        )
+
+    @patch("prizetap.tasks.PrizetapContractClient")
+    @patch(
+        "prizetap.tasks.ConfirmationTracker.get_receipts_by_chain",
+        return_value={"0x1": {"status": 0}},
+    )
+    def test_failed_pre_enrollment_is_sent_again(self, get_receipts, client):
+        client.return_value.batch_participate.return_value = "0x2"
+        onchain_pre_enrollments()
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.tx_hash, "0x2")
+        self.assertEqual(self.entry.tx_attempts, 2)
+
+    @patch("prizetap.tasks.PrizetapContractClient")
+    @patch(
+        "prizetap.tasks.ConfirmationTracker.get_receipts_by_chain",
+        return_value={"0x1": {"status": 0}},
+    )
+    def test_pre_enrollment_attempts_are_capped(self, get_receipts, client):
+        RaffleEntry.objects.update(tx_attempts=RaffleEntry.MAX_TX_ATTEMPTS)
+        onchain_pre_enrollments()
+        self.entry.refresh_from_db()
+        self.assertIsNone(self.entry.tx_hash)
+        client.assert_not_called()
+
+    @patch("prizetap.tasks.PrizetapContractClient")
+    @patch("prizetap.tasks.ConfirmationTracker.get_receipts_by_chain", return_value={})
+    def test_dropped_pre_enrollment_is_sent_again(self, get_receipts, client):
+        client.return_value.batch_participate.return_value = "0x2"
+        onchain_pre_enrollments()
+        client.assert_not_called()
+
+        RaffleEntry.objects.update(
+            tx_sent_at=timezone.now()
+            - timezone.timedelta(minutes=RaffleEntry.MAX_TX_PENDING_DURATION + 1)
+        )
+        onchain_pre_enrollments()
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.tx_hash, "0x2")
+        self.assertEqual(self.entry.tx_attempts, 2)
+
+    @patch("prizetap.tasks.request_random_words")
+    @patch("prizetap.tasks.ConfirmationTracker.get_receipts_by_chain", return_value={})
+    def test_dropped_pre_enrollments_do_not_hold_the_raffle(
+        self, get_receipts, request_random_words
+    ):
+        Raffle.objects.update(deadline=timezone.now())
+        RaffleEntry.objects.create(
+            raffle=self.raffle,
+            user_wallet_address="0x90F8bf6A479f320ead074411a4B0e7944Ea8c9C1",
+            pre_enrollment=True,
+            tx_hash="0x0",
+            is_tx_confirmed=True,
+        )
+        RaffleEntry.objects.filter(pk=self.entry.pk).update(
+            tx_attempts=RaffleEntry.MAX_TX_ATTEMPTS,
+            tx_sent_at=timezone.now()
+            - timezone.timedelta(minutes=RaffleEntry.MAX_TX_PENDING_DURATION + 1),
+        )
+        onchain_pre_enrollments()
+        request_random_words_for_expired_raffles()
+        request_random_words.assert_called_once()
+
+    @patch("prizetap.tasks.request_random_words")
+    def test_random_words_wait_for_confirmed_pre_enrollments(
+        self, request_random_words
+    ):
+        Raffle.objects.update(deadline=timezone.now())
+        request_random_words_for_expired_raffles()
+        request_random_words.assert_not_called()
+
+        RaffleEntry.objects.update(is_tx_confirmed=True)
+        request_random_words_for_expired_raffles()
+        request_random_words.assert_called_once()
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class RaffleCreatedLogTestCase(BaseTestCase):
+    initiator = "0xc1cbb2ab97260a8a7d4591045a9fb34ec14e87fb"
+
+    @patch("web3.Web3.is_connected", lambda self: True)
+    @patch("core.utils.Web3Utils.batch_request")
+    def test_raffle_id_is_decoded_from_a_batched_receipt(self, batch_request):
+        raffle = Raffle.objects.create(
+            name="Test Raffle",
+            description="Test Raffle Description",
+            contract=erc20_contract_address,
+            creator_profile=self.user_profile,
+            prize_amount=1e14,
+            prize_asset="0x0000000000000000000000000000000000000000",
+            prize_name="Test raffle",
+            prize_symbol="Eth",
+            decimals=18,
+            chain=self.chain,
+            deadline=timezone.now() + timezone.timedelta(days=1),
+            max_number_of_entries=2,
+            tx_hash="0x1",
+        )
+        batch_request.return_value = [
+            "0x10",
+            {
+                "status": "0x1",
+                "blockNumber": "0x10",
+                "logs": [
+                    {
+                        "address": erc20_contract_address.lower(),
+                        "topics": [
+                            Web3.to_hex(
+                                event_abi_to_log_topic(
+                                    PrizetapContractClient(raffle)
+                                    .web3_utils.contract.events.RaffleCreated()
+                                    .abi
+                                )
+                            ),
+                            Web3.to_hex(encode(["address"], [self.initiator])),
+                        ],
+                        "data": Web3.to_hex(encode(["uint256"], [7])),
+                        "blockNumber": "0x10",
+                        "logIndex": "0x0",
+                        "transactionIndex": "0x0",
+                        "transactionHash": "0x" + "11" * 32,
+                        "blockHash": "0x" + "22" * 32,
+                        "removed": False,
+                    }
+                ],
+            },
+        ]
+
+        receipt = ConfirmationTracker.for_chain(self.chain).get_receipts(["0x1"])["0x1"]
+        log = PrizetapContractClient(raffle).get_raffle_created_log(receipt)
+
+        self.assertEqual(log["args"]["raffleId"], 7)
+        self.assertEqual(
+            log["args"]["initiator"], Web3.to_checksum_address(self.initiator)
+        )
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class RaffleEntrantsPassportScoreTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.raffle = Raffle.objects.create(
+            name="Test Raffle",
+            description="Test Raffle Description",
+            contract=erc20_contract_address,
+            raffleId=1,
+            creator_profile=self.user_profile,
+            prize_amount=1e14,
+            prize_asset="0x0000000000000000000000000000000000000000",
+            prize_name="Test raffle",
+            prize_symbol="Eth",
+            decimals=18,
+            chain=self.chain,
+            deadline=timezone.now() + timezone.timedelta(days=1),
+            max_number_of_entries=2,
+            status=Raffle.Status.VERIFIED,
+        )
+        self.raffle.constraints.set(
+            [
+                Constraint.objects.create(
+                    name="core.HasMinimumHumanityScore",
+                    title="Gitcoin passport",
+                    description="You have to have a gitcoin passport score.",
+                )
+            ]
+        )
+        self.other_profile = UserProfile.objects.create(
+            user=User.objects.create_user(username="test_2", password="1234"),
+            initial_context_id="test_2",
+            username="test_2",
+        )
+        RaffleEntry.objects.create(
+            raffle=self.raffle, user_profile=self.user_profile, multiplier=1
+        )
+        with patch(
+            "authentication.thirdpartydrivers.GitcoinPassportDriver.submit_passport",
+            return_value="10",
+        ):
+            for user_profile in (self.user_profile, self.other_profile):
+                GitcoinPassportConnection.objects.create(
+                    user_profile=user_profile,
+                    user_wallet_address="0xc1cbb2ab97260a8a7d4591045a9fb34ec14e87fb",
+                )
+        GitcoinPassportConnection.objects.update(
+            scored_at=timezone.now() - timezone.timedelta(hours=2)
+        )
+
+    @patch(
+        "authentication.thirdpartydrivers.GitcoinPassportDriver.submit_passport",
+        return_value="20",
+    )
+    def test_only_entrants_are_refreshed(self, submit_passport):
+        refresh_raffle_entrants_passport_scores()
+        scores = dict(
+            GitcoinPassportConnection.objects.values_list("user_profile", "score")
+        )
+        self.assertEqual(scores[self.user_profile.pk], 20)
+        self.assertEqual(scores[self.other_profile.pk], 10)
+
+        self.raffle.deadline = timezone.now()
+        self.raffle.save()
+        GitcoinPassportConnection.objects.update(
+            scored_at=timezone.now() - timezone.timedelta(hours=2)
+        )
+        refresh_raffle_entrants_passport_scores()
+        self.assertEqual(submit_passport.call_count, 1)
+
+
 @patch.dict(
     "prizetap.constants.CONTRACT_ADDRESSES",
     {
@@ -94,9 +94,8 @@ class PrizetapContractClient:
         func = self.web3_utils.contract.functions.batchParticipate(
             self.raffle.raffleId, participants, multipliers
         )
-        tx_hash = self.web3_utils.contract_txn(func)
-        self.web3_utils.wait_for_transaction_receipt(tx_hash)
-        return tx_hash
+        # confirmed later by confirm_pre_enrollment_txs
+        return self.web3_utils.contract_txn(func)
 
 
 class VRFClientContractClient:
@@ -1,11 +1,9 @@
 import json
 
-from django.core.cache import cache
 from rest_framework.exceptions import PermissionDenied, ValidationError
 
 from authentication.models import UserProfile
-from core.constraints import ConstraintVerification, get_constraint
-from core.utils import cache_constraint_result
+from core.constraints.evaluator import ConstraintEvaluator
 
 from .models import Raffle, RaffleEntry
 
@@ -26,51 +24,16 @@ class RaffleEnrollmentValidator:
             param_values = json.loads(self.raffle.constraint_params)
         except Exception:
             param_values = {}
-        error_messages = dict()
-        result = dict()
-        for c in self.raffle.constraints.all():
-            constraint: ConstraintVerification = get_constraint(c.name)(
-                self.user_profile, obj=self.raffle
-            )
-            constraint.response = c.response
-            try:
-                constraint.param_values = param_values[c.name]
-            except KeyError:
-                pass
-            cdata = self.raffle_data.get(str(c.pk), dict())
-            cache_key = f"prizetap-{self.user_profile.pk}-{self.raffle.pk}-{c.pk}"
-            constraint_data = cache.get(cache_key)
-            if constraint_data is None:
-                """
-                Refactor: this is not good design beacuse info is duplicated with
-                is_observed so we need some design change for in is_observed so
-                if info needed it must return it.
-                or more basical change likes change how constraints logic is.
-                """
-                info = constraint.get_info(
-                    **cdata, from_time=int(self.raffle.start_at.timestamp())
-                )
-                if str(c.pk) in self.raffle.reversed_constraints_list:
-                    is_verified = not constraint.is_observed(
-                        **cdata, from_time=int(self.raffle.start_at.timestamp())
-                    )
-                else:
-                    is_verified = constraint.is_observed(
-                        **cdata,
-                        from_time=int(self.raffle.start_at.timestamp()),
-                        context={"request": self.request},
-                    )
-
-                if constraint.is_cachable:
-                    constraint_data = cache_constraint_result(
-                        cache_key, is_verified, constraint, info
-                    )
-                else:
-                    constraint_data = {"is_verified": is_verified, "info": info}
-
-            if not constraint_data.get("is_verified"):
-                error_messages[c.title] = constraint.response
-            result[c.pk] = constraint_data
+        evaluator = ConstraintEvaluator(
+            self.user_profile,
+            self.raffle,
+            param_values=param_values,
+            data=self.raffle_data,
+            reversed_constraints=self.raffle.reversed_constraints_list,
+            request=self.request,
+            from_time=int(self.raffle.start_at.timestamp()),
+        )
+        result, error_messages = evaluator.evaluate(self.raffle.constraints.all())
         if len(error_messages) and raise_exception:
             raise PermissionDenied(error_messages)
         return result
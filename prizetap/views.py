@@ -190,7 +190,9 @@ class GetRaffleConstraintsView(APIView):
 
     def get(self, request, raffle_pk):
         user_profile = request.user.profile
-        raffle = get_object_or_404(Raffle, pk=raffle_pk)
+        raffle = get_object_or_404(
+            Raffle.objects.prefetch_related("constraints"), pk=raffle_pk
+        )
         raffle_data = request.query_params.get("raffle_data", dict())
         reversed_constraints = raffle.reversed_constraints_list
         response_constraints = []
@@ -202,10 +204,11 @@ class GetRaffleConstraintsView(APIView):
         )
 
         validated_constraints = validator.check_user_constraints(raise_exception=False)
+        constraints = {c.pk: c for c in raffle.constraints.all()}
         for c_pk, data in validated_constraints.items():
             response_constraints.append(
                 {
-                    **ConstraintSerializer(Constraint.objects.get(pk=c_pk)).data,
+                    **ConstraintSerializer(constraints[c_pk]).data,
                     **data,
                     "is_reversed": True if str(c_pk) in reversed_constraints else False,
                 }
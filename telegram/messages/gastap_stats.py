@@ -13,7 +13,7 @@ Here are the available chains for claiming gas tokens:
 Max Claim Amount: {{ faucet.max_claim_amount / (10 ** faucet.chain.decimals) }} {{ faucet.chain.symbol }}  
 Available for: {% if faucet.is_one_time_claim %}One Time{% else %}Weekly{% endif %}
 
-{% if faucet.has_enough_funds %}
+{% if faucet.snapshot.has_enough_funds %}
 🟢 *Status:* Available  
 Fuel Level: {{ faucet.fuel_level }}%
 {% else %}
@@ -30,7 +30,9 @@ class GastapStatsHandler(BaseTelegramMessageHandler):
     message = "Stats of gastap"
 
     def handler(self, message: types.Message):
-        faucets = Faucet.objects.filter(is_active=True, show_in_gastap=True)
+        faucets = Faucet.objects.filter(
+            is_active=True, show_in_gastap=True
+        ).select_related("chain", "snapshot")
 
         # Prepare the template
         template = Template(gastap_text)
@@ -12,6 +12,8 @@ from faucet.models import ClaimReceipt
 
 
 class OncePerMonthVerification(ConstraintVerification):
+    is_campaign_scoped = True
+
     def is_observed(self, *args, **kwargs):
         token_distribution = kwargs["token_distribution"]
         return not token_distribution.claims.filter(
@@ -21,6 +23,8 @@ class OncePerMonthVerification(ConstraintVerification):
 
 
 class OnceInALifeTimeVerification(ConstraintVerification):
+    is_campaign_scoped = True
+
     def is_observed(self, *args, **kwargs):
         token_distribution = kwargs["token_distribution"]
         return not token_distribution.claims.filter(
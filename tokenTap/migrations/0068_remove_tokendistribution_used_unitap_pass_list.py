@@ -0,0 +1,36 @@
+# Generated by Django 5.1.2 on 2026-10-17 03:05
+
+from django.db import migrations
+
+
+def copy_used_unitap_passes(apps, schema_editor):
+    TokenDistribution = apps.get_model("tokenTap", "TokenDistribution")
+    UnitapPassUsage = apps.get_model("core", "UnitapPassUsage")
+    UnitapPassUsage.objects.bulk_create(
+        [
+            UnitapPassUsage(
+                scope=f"tokentap.tokendistribution:{distribution.pk}",
+                pass_id=pass_id,
+            )
+            for distribution in TokenDistribution.objects.exclude(
+                used_unitap_pass_list=[]
+            )
+            for pass_id in set(distribution.used_unitap_pass_list)
+        ],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0011_unitappassusage"),
+        ("tokenTap", "0067_alter_constraint_name"),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_used_unitap_passes, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="tokendistribution",
+            name="used_unitap_pass_list",
+        ),
+    ]
@@ -5,6 +5,7 @@ from celery import shared_task
 from django.utils.timezone import make_aware
 
 from core.helpers import memcache_lock
+from core.utils import ConfirmationTracker
 
 from .models import TokenDistribution
 from .utils import TokentapContractClient
@@ -25,7 +26,21 @@ def set_distribution_id(self):
             .order_by("id")
         )
         if token_distributions_queryset.count() > 0:
+            receipts = ConfirmationTracker.get_receipts_by_chain(
+                (token_distribution.chain, token_distribution.tx_hash)
+                for token_distribution in token_distributions_queryset.select_related(
+                    "chain"
+                )
+            )
             for token_distribution in token_distributions_queryset:
+                receipt = receipts.get(token_distribution.tx_hash)
+                if receipt is None:
+                    # not confirmed yet, it is checked again on the next run
+                    continue
+                if receipt["status"] != 1:
+                    token_distribution.status = TokenDistribution.Status.REJECTED
+                    token_distribution.save()
+                    continue
                 try:
                     print(
                         "Setting the token_distribution "
@@ -33,9 +48,6 @@ def set_distribution_id(self):
                     )
                     contract_client = TokentapContractClient(token_distribution)
 
-                    receipt = contract_client.web3_utils.get_transaction_receipt(
-                        token_distribution.tx_hash
-                    )
                     log = contract_client.get_token_distributed_log(receipt)
 
                     token_distribution.distribution_id = log["args"]["distributionId"]
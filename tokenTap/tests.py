@@ -7,6 +7,7 @@ from django.urls import reverse
 from django.utils import timezone
 
 # from rest_framework.exceptions import ErrorDetail
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.test import APITestCase, override_settings
 
 from authentication.models import UserProfile, Wallet
@@ -16,6 +17,7 @@ from tokenTap.models import Constraint, TokenDistribution, TokenDistributionClai
 
 from .helpers import create_uint32_random_nonce, hash_message, sign_hashed_message
 from .models import GlobalSettings
+from .views import TokenDistributionClaimView
 
 test_wallet_key = "f57fecd11c6034fd2665d622e866f05f9b07f35f253ebd5563e3d7e76ae66809"
 test_rpc_url_private = "http://ganache:7545"
@@ -247,6 +249,21 @@ class TokenDistributionClaimTestCase(APITestCase):
         self.assertEqual(response.data["detail"], "Signature Was Already Created")
         self.assertEqual(response.status_code, 200)
 
+    @patch(
+        "authentication.models.UserProfile.has_unitap_pass",
+        return_value=(True, [1, 2]),
+    )
+    def test_unitap_pass_share_reserves_passes(self, _):
+        self.td.max_number_of_claims = 10
+        self.td.save()
+        view = TokenDistributionClaimView()
+
+        self.assertEqual(
+            view.check_unitap_pass_share(self.td, self.userprofile), (True, [1, 2])
+        )
+        with self.assertRaises(PermissionDenied):
+            view.check_unitap_pass_share(self.td, self.userprofile)
+
     def test_token_distribution_claim_creation(self):
         tdc = TokenDistributionClaim.objects.create(
             user_profile=self.userprofile,
@@ -1,12 +1,10 @@
 import json
 import logging
 
-from django.core.cache import cache
 from rest_framework.exceptions import PermissionDenied
 
 from authentication.models import UserProfile
-from core.constraints import ConstraintVerification, get_constraint
-from core.utils import cache_constraint_result
+from core.constraints.evaluator import ConstraintEvaluator
 
 from .helpers import has_credit_left
 from .models import ClaimReceipt, TokenDistribution
@@ -56,48 +54,16 @@ class TokenDistributionValidator:
         except Exception as e:
             logging.error("Error parsing constraint params", e)
             param_values = {}
-        error_messages = dict()
-        result = dict()
-        for c in self.td.constraints.all():
-            constraint: ConstraintVerification = get_constraint(c.name)(
-                self.user_profile, obj=self.td
-            )
-            constraint.response = c.response
-            try:
-                constraint.param_values = param_values[c.name]
-            except KeyError:
-                pass
-
-            cdata = self.td_data.get(str(c.pk), dict())
-            cache_key = f"tokentap-{self.user_profile.pk}-{self.td.pk}-{c.pk}"
-            constraint_data = cache.get(cache_key)
-            if constraint_data is None:
-                info = constraint.get_info(
-                    **cdata,
-                    token_distribution=self.td,
-                )
-                if str(c.pk) in self.td.reversed_constraints_list:
-                    is_verified = not constraint.is_observed(
-                        **cdata,
-                        token_distribution=self.td,
-                    )
-                else:
-                    is_verified = constraint.is_observed(
-                        **cdata,
-                        token_distribution=self.td,
-                        context={"request": self.request},
-                    )
-
-                if constraint.is_cachable:
-                    constraint_data = cache_constraint_result(
-                        cache_key, is_verified, constraint, info
-                    )
-                else:
-                    constraint_data = {"is_verified": is_verified, "info": info}
-
-            if not constraint_data.get("is_verified"):
-                error_messages[c.title] = constraint.response
-            result[c.pk] = constraint_data
+        evaluator = ConstraintEvaluator(
+            self.user_profile,
+            self.td,
+            param_values=param_values,
+            data=self.td_data,
+            reversed_constraints=self.td.reversed_constraints_list,
+            request=self.request,
+            token_distribution=self.td,
+        )
+        result, error_messages = evaluator.evaluate(self.td.constraints.all())
         if len(error_messages) and raise_exception:
             raise PermissionDenied(error_messages)
         return result
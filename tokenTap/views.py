@@ -13,7 +13,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from authentication.models import UserProfile
-from core.models import Chain, NetworkTypes
+from core.models import Chain, NetworkTypes, UnitapPassUsage
 from core.serializers import ChainSerializer
 from core.swagger import ConstraintProviderSrializerInspector
 from core.views import AbstractConstraintsListView
@@ -64,11 +64,14 @@ class TokenDistributionClaimView(CreateAPIView):
 
         has_unitap_pass, unitap_pass_list = user_profile.has_unitap_pass()
         if has_unitap_pass:
-            used_unitap_passes = set(distribution.used_unitap_pass_list)
-            not_used_unitap_passes = set(unitap_pass_list) - used_unitap_passes
-            if not len(not_used_unitap_passes):
+            # only the passes this claim manages to reserve count, a concurrent
+            # claim may take the ones read as unused
+            reserved_unitap_passes = UnitapPassUsage.reserve(
+                UnitapPassUsage.get_scope(distribution), unitap_pass_list
+            )
+            if not reserved_unitap_passes:
                 raise PermissionDenied("You use all your unitap passes")
-            return has_unitap_pass, list(not_used_unitap_passes)
+            return True, reserved_unitap_passes
 
         if distribution.claims.filter(is_unitap_pass_share=False).count() >= (
             distribution.max_number_of_claims
@@ -100,7 +103,25 @@ class TokenDistributionClaimView(CreateAPIView):
             ),
         },
     )
+    def evaluate_constraints(self, request):
+        """
+        Evaluate the constraints before the distribution is locked, the check under
+        the lock runs them sequentially and reads the cached results
+        """
+        token_distribution = TokenDistribution.objects.filter(
+            pk=self.kwargs["pk"]
+        ).first()
+        if token_distribution is None:
+            return
+        TokenDistributionValidator(
+            token_distribution,
+            request.user.profile,
+            request.query_params.get("td_data", dict()),
+            request=request,
+        ).check_user_permissions(raise_exception=False)
+
     def post(self, request, *args, **kwargs):
+        self.evaluate_constraints(request)
         with transaction.atomic():
             user_profile = request.user.profile
             token_distribution = TokenDistribution.objects.select_for_update().get(
@@ -140,7 +161,7 @@ class TokenDistributionClaimView(CreateAPIView):
             )
             validator.is_valid()
 
-            is_unitap_pass_user, user_unitap_pass_list = self.check_unitap_pass_share(
+            is_unitap_pass_user, _ = self.check_unitap_pass_share(
                 token_distribution, user_profile
             )
 
@@ -163,9 +184,6 @@ class TokenDistributionClaimView(CreateAPIView):
                     user_wallet_address=user_wallet_address,
                     is_unitap_pass_share=is_unitap_pass_user,
                 )
-                # TODO: be careful about race condition
-                token_distribution.used_unitap_pass_list.extend(user_unitap_pass_list)
-                token_distribution.save(update_fields=["used_unitap_pass_list"])
 
         return Response(
             {
@@ -181,7 +199,9 @@ class GetTokenDistributionConstraintsView(APIView):
 
     def get(self, request, td_id):
         user_profile = request.user.profile
-        td = get_object_or_404(TokenDistribution, pk=td_id)
+        td = get_object_or_404(
+            TokenDistribution.objects.prefetch_related("constraints"), pk=td_id
+        )
         td_data = request.query_params.get("td_data", dict())
 
         reversed_constraints = td.reversed_constraints_list
@@ -191,10 +211,11 @@ class GetTokenDistributionConstraintsView(APIView):
             td, user_profile, td_data, request=request
         )
         validated_constraints = validator.check_user_permissions(raise_exception=False)
+        constraints = {c.pk: c for c in td.constraints.all()}
         for c_pk, data in validated_constraints.items():
             response_constraints.append(
                 {
-                    **ConstraintSerializer(Constraint.objects.get(pk=c_pk)).data,
+                    **ConstraintSerializer(constraints[c_pk]).data,
                     **data,
                     "is_reversed": True if str(c_pk) in reversed_constraints else False,
                 }